@@ -2,13 +2,19 @@
 # ==============================================================================
 # Imports
 # ==============================================================================
+import os
 import re
 import sys
 import pytest
+import socket
+import hashlib
+import itertools
+import threading
 import openstack
 import pytest_rpc.helpers as helpers
-from time import sleep
 from warnings import warn
+from collections import namedtuple, OrderedDict
+from multiprocessing.pool import ThreadPool
 from openstack.exceptions import ConfigException
 from paramiko import SSHClient, AutoAddPolicy, HostKeys
 from paramiko.ssh_exception import NoValidConnectionsError
@@ -33,6 +39,51 @@ semantic_pattern = (r'^([0-9]|[1-9][0-9]*)\.'
                     r'(?:\.[0-9A-Za-z-]+)*))?(?:\+[0-9A-Za-z-]+)?$')
 semantic_regex = re.compile(semantic_pattern)
 
+# Static OpenStack facts and variables from Ansible.
+_default_os_properties = {
+    'image_name': 'Cirros-0.3.5',
+    'cirros_image': 'Cirros-0.3.5',
+    'ubuntu_image': 'Ubuntu 16.04',
+    'network_name': 'GATEWAY_NET',
+    'private_net': 'PRIVATE_NET',
+    'test_network': 'TEST-VXLAN',
+    'gateway_network_subnet': 'GATEWAY_NET_SUBNET',
+    'private_network_subnet': 'PRIVATE_NET_SUBNET',
+    'flavor': 'm1.tiny',
+    'tiny_flavor': 'm1.tiny',
+    'small_flavor': 'm1.small',
+    'zone': 'nova',
+    'key_name': 'rpc_support',
+    'public_key_path': '/root/.ssh/rpc_support.pub',
+    'private_key_path': '/root/.ssh/rpc_support',
+    'security_group': 'rpc-support',
+    'os_version_file_path': '/etc/openstack-release',
+    'os_version_ini_path': '/etc/openstack-release.ini',
+    'os_inventory_path': '/etc/openstack_deploy/openstack_inventory.json',
+    'os_version': '99.99.99',   # Indicates that the version is unset.
+    'os_version_major': 99,
+    'os_version_minor': 99,
+    'os_version_patch': 99,
+    'os_version_codename': 'master'  # Master branch for missing version
+}
+
+# Properties of a server which is on and running.
+server_active_props = {'status': 'ACTIVE',
+                       'OS-EXT-STS:power_state': '1',
+                       'OS-EXT-STS:vm_state': 'active'}
+
+# The outcome of creating a single server with the batch factory.
+ServerBatchResult = namedtuple('ServerBatchResult', ('server', 'error'))
+
+# Layout of the phase timing table printed in the terminal summary.
+phase_summary_rows = 15
+phase_table_format = '{:<48} {:>6} {:>9} {:>8} {:>8} {:>8} {:>8} {:>8}'
+phase_row_format = ('{:<48} {:>6} {:>8.2f}s {:>7.2f}s {:>7.2f}s {:>7.2f}s '
+                    '{:>7.2f}s {:>7.2f}s')
+
+# Key under which pytest-xdist workers hand their phase spans to the controller.
+phase_spans_key = 'rpc_phase_spans'
+
 # Needed for Python 2.7 and 3.x compatibility
 if sys.version_info.major == 3:
     # noinspection PyShadowingBuiltins
@@ -40,43 +91,200 @@ if sys.version_info.major == 3:
 
 
 # ==============================================================================
-# Fixtures
+# Hooks
 # ==============================================================================
-@pytest.fixture
-def openstack_properties():
-    """This fixture returns a dictionary of OpenStack facts and variables from
-    Ansible which can be used to manipulate OpenStack objects. (i.e. create
-    server instances)
+def pytest_addoption(parser):
+    """Add options to control the behavior of the pytest-rpc fixtures."""
+
+    group = parser.getgroup('rpc', 'pytest-rpc')
+    group.addoption('--rpc-background-teardown',
+                    action='store_true',
+                    default=False,
+                    help='Delete OpenStack objects created by the factory '
+                         'fixtures in a background thread instead of blocking '
+                         'test teardown. Deletions are drained before the '
+                         'session ends.')
+    group.addoption('--rpc-server-pool-size',
+                    action='store',
+                    type=int,
+                    default=0,
+                    help='Number of warm Cirros servers to keep in a session '
+                         'pool for the "tiny_cirros_server" fixture. '
+                         '(Default: 0, which disables the pool)')
+    group.addoption('--rpc-server-pool-reset',
+                    action='store',
+                    choices=('reboot', 'rebuild'),
+                    default='reboot',
+                    help='How pooled servers are reset before they are leased '
+                         'again. (Default: reboot)')
+    group.addoption('--rpc-floating-ip-pool-size',
+                    action='store',
+                    type=int,
+                    default=0,
+                    help='Number of floating IPs to allocate up front for a '
+                         'session pool which servers created with "auto_ip" '
+                         'lease from and return to. (Default: 0, which '
+                         'disables the pool)')
+    group.addoption('--rpc-host-facts',
+                    action='store',
+                    default=None,
+                    metavar='path',
+                    help='JSON file for saving probed host facts (e.g. the '
+                         'cinder major version) so that later runs against '
+                         'the same deployment can skip the probes.')
+    group.addoption('--rpc-phase-timings',
+                    action='store_true',
+                    default=False,
+                    help='Time the phases of the pytest-rpc fixtures and '
+                         'helpers (e.g. server boot, property waits, SSH '
+                         'connects) and print the slowest phases at the end '
+                         'of the session.')
+    group.addoption('--rpc-timings',
+                    action='store',
+                    default=None,
+                    metavar='path',
+                    help='JSON file for saving the phase timings of the '
+                         'session so that runs can be compared. Implies '
+                         '"--rpc-phase-timings".')
+
+
+def pytest_configure(config):
+    """Register the markers understood by the pytest-rpc fixtures and enable
+    phase timing when requested."""
+
+    config.addinivalue_line('markers',
+                            'destructive: the test modifies its server in ways '
+                            'that prevent reuse, so it never receives a server '
+                            'from the warm server pool.')
+
+    helpers.phase_timer.enabled = bool(
+        config.getoption('rpc_phase_timings') or
+        config.getoption('rpc_timings')
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Attribute the phases timed while a test runs to its node ID."""
+
+    helpers.phase_timer.nodeid = item.nodeid
+
+    yield
+
+    helpers.phase_timer.nodeid = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    """Record the phases timed while setting up or tearing down fixtures which
+    outlive a single test as session phases rather than charging them to the
+    test which happened to set them up or tear them down."""
+
+    if fixturedef.scope == 'function':
+        yield
+        return
+
+    timer = helpers.phase_timer
+    saved = [timer.nodeid]
+
+    def _restore():
+        timer.nodeid = saved[0]
+
+    # Finalizers run in reverse order so this one runs after the teardown.
+    fixturedef.addfinalizer(_restore)
+    timer.nodeid = None
+
+    yield
+
+    _restore()
+
+    def _detach():
+        saved[0] = timer.nodeid
+        timer.nodeid = None
+
+    fixturedef.addfinalizer(_detach)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print the phases with the most total time and the slowest individual
+    phases when phase timing is enabled."""
+
+    timer = helpers.phase_timer
+
+    if not timer.enabled or not timer.spans:
+        return
+
+    tr = terminalreporter
+    tr.write_sep('=', 'rpc phase timings')
+    tr.write_line(phase_table_format.format('phase',
+                                            'count',
+                                            'total',
+                                            'mean',
+                                            'p50',
+                                            'p90',
+                                            'p99',
+                                            'max'))
+
+    for stats in list(timer.summary().values())[:phase_summary_rows]:
+        tr.write_line(phase_row_format.format(*stats))
+
+    tr.write_sep('-', 'slowest phases')
+
+    for span in timer.slowest(phase_summary_rows):
+        tr.write_line('{:>9.2f}s  {}  {}'.format(span.duration,
+                                                 span.phase,
+                                                 span.nodeid or '(session)'))
+
+
+def pytest_sessionfinish(session):
+    """Save the phase timings to the '--rpc-timings' file. Under pytest-xdist
+    the workers hand their spans to the controller which merges them and
+    saves the file once. (see 'pytest_testnodedown')"""
+
+    config = session.config
+    timer = helpers.phase_timer
+    workeroutput = getattr(config, 'workeroutput',
+                           getattr(config, 'slaveoutput', None))
+
+    if workeroutput is not None:
+        if timer.enabled:
+            workeroutput[phase_spans_key] = [list(s) for s in timer.spans]
+        return
+
+    path = config.getoption('rpc_timings')
+
+    if path and timer.spans:
+        timer.save(path)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Merge the phase timings of a finished pytest-xdist worker into the
+    timings of the controller."""
+
+    workeroutput = getattr(node, 'workeroutput',
+                           getattr(node, 'slaveoutput', {}))
+
+    for span in workeroutput.get(phase_spans_key, []):
+        span = helpers.PhaseSpan(*span)
+        helpers.phase_timer.record(span.phase,
+                                   span.start,
+                                   span.duration,
+                                   span.nodeid)
+
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+def _parse_openstack_properties():
+    """Build the dictionary of OpenStack facts and variables from Ansible,
+    including the version information read from the OpenStack version file.
 
     Returns:
         dict: a static dictionary of data about OpenStack.
     """
 
-    os_properties = {
-        'image_name': 'Cirros-0.3.5',
-        'cirros_image': 'Cirros-0.3.5',
-        'ubuntu_image': 'Ubuntu 16.04',
-        'network_name': 'GATEWAY_NET',
-        'private_net': 'PRIVATE_NET',
-        'test_network': 'TEST-VXLAN',
-        'gateway_network_subnet': 'GATEWAY_NET_SUBNET',
-        'private_network_subnet': 'PRIVATE_NET_SUBNET',
-        'flavor': 'm1.tiny',
-        'tiny_flavor': 'm1.tiny',
-        'small_flavor': 'm1.small',
-        'zone': 'nova',
-        'key_name': 'rpc_support',
-        'public_key_path': '/root/.ssh/rpc_support.pub',
-        'private_key_path': '/root/.ssh/rpc_support',
-        'security_group': 'rpc-support',
-        'os_version_file_path': '/etc/openstack-release',
-        'os_version_ini_path': '/etc/openstack-release.ini',
-        'os_version': '99.99.99',   # Indicates that the version is unset.
-        'os_version_major': 99,
-        'os_version_minor': 99,
-        'os_version_patch': 99,
-        'os_version_codename': 'master'  # Master branch for missing version
-    }
+    os_properties = dict(_default_os_properties)
 
     # Retrieve OpenStack version information
     try:
@@ -89,22 +297,80 @@ def openstack_properties():
         os_properties['os_version'] = \
             os_version_ini.get('default',
                                'DISTRIB_RELEASE').replace('"', '').lstrip('r')
-        os_properties['os_version_major'] = \
-            int(semantic_regex.match(os_properties['os_version']).group(1))
-        os_properties['os_version_minor'] = \
-            int(semantic_regex.match(os_properties['os_version']).group(2))
-        os_properties['os_version_patch'] = \
-            int(semantic_regex.match(os_properties['os_version']).group(3))
+        os_version_match = semantic_regex.match(os_properties['os_version'])
+        os_properties['os_version_major'] = int(os_version_match.group(1))
+        os_properties['os_version_minor'] = int(os_version_match.group(2))
+        os_properties['os_version_patch'] = int(os_version_match.group(3))
     except (IOError, OSError, NoOptionError, NoSectionError, AttributeError):
         warn(UserWarning("Failed to parse OpenStack version file!"))
 
     return os_properties
 
 
-@pytest.fixture
-def os_api_conn():
-    """Provide an authorized API connection to the 'default' cloud on the
-    OpenStack infrastructure.
+def _make_openstack_properties_cache():
+    """Build the function used by the 'openstack_session_properties' fixture.
+    The OpenStack version file is parsed on first use and again only when its
+    modification time changes, so a missing file warns once.
+
+    Returns:
+        def: A function which returns the shared dictionary of data about
+            OpenStack.
+    """
+
+    cache = {'mtime': None, 'properties': None}
+    lock = threading.Lock()
+
+    def _get():
+        ini_path = _default_os_properties['os_version_ini_path']
+
+        try:
+            mtime = os.stat(ini_path).st_mtime
+        except (IOError, OSError):
+            mtime = None
+
+        with lock:
+            if cache['properties'] is None or cache['mtime'] != mtime:
+                cache['properties'] = _parse_openstack_properties()
+                cache['mtime'] = mtime
+
+            return cache['properties']
+
+    return _get
+
+
+def _deployment_fingerprint(openstack_properties):
+    """Identify the deployment under test so that saved host facts are not
+    reused against another deployment. The fingerprint covers the deployment
+    host name, the OpenStack version and the OpenStack-Ansible inventory, if
+    present, so rebuilt containers also change it.
+
+    Args:
+        openstack_properties (dict): OpenStack facts and variables from Ansible.
+
+    Returns:
+        str: A hex digest identifying the deployment.
+    """
+
+    digest = hashlib.sha1()
+
+    for part in (socket.gethostname(),
+                 openstack_properties['os_version'],
+                 openstack_properties['os_version_codename']):
+        digest.update('{}\n'.format(part).encode('utf-8'))
+
+    try:
+        with open(openstack_properties['os_inventory_path'], 'rb') as f:
+            digest.update(f.read())
+    except (IOError, OSError):
+        pass    # Not an OpenStack-Ansible deployment host.
+
+    return digest.hexdigest()
+
+
+def _connect_to_cloud():
+    """Create an authorized API connection to the 'default' cloud on the
+    OpenStack infrastructure. The current test fails if the cloud is not
+    configured.
 
     Returns:
         openstack.connection.Connection: https://bit.ly/2LqgiiT
@@ -120,27 +386,249 @@ def os_api_conn():
         pytest.fail(err_msg, True)
 
 
-@pytest.fixture
-def create_server(os_api_conn, openstack_properties):
-    """Create OpenStack server instances with automatic teardown after each
-    test.
+def _reset_server(os_api_conn, server, mode):
+    """Reset a pooled server so that it can be leased to another test.
 
     Args:
         os_api_conn (openstack.connection.Connection): An authorized API
             connection to the 'default' cloud on the OpenStack infrastructure.
-        openstack_properties (dict): OpenStack facts and variables from Ansible
-            which can be used to manipulate OpenStack objects.
+        server (openstack.compute.v2.server.Server): The server to reset.
+        mode (str): Either 'reboot' (hard reboot) or 'rebuild' (rebuild from
+            the original image).
 
     Returns:
-        def: A factory function object.
+        bool: Whether the server is running and reachable after the reset.
+    """
+
+    if mode == 'rebuild':
+        os_api_conn.rebuild_server(server.id,
+                                   server['image']['id'],
+                                   wait=True,
+                                   timeout=600)
+    else:
+        os_api_conn.compute.reboot_server(server.id, 'HARD')
+
+    # The task state is cleared once the reboot or rebuild has completed.
+    expected_props = dict(server_active_props)
+    expected_props['OS-EXT-STS:task_state'] = 'None'
+
+    healthy = helpers.expect_os_properties(
+        os_api_conn=os_api_conn,
+        os_service='server',
+        os_object=server,
+        expected_props=expected_props,
+        show_warnings=False,
+        retry_policy=helpers.RetryPolicy(retries=None,
+                                         max_sleep=10,
+                                         deadline=600)
+    )
+
+    if healthy and server.get('accessIPv4'):
+        healthy = helpers.ping_from_mnaio(server['accessIPv4'])
+
+    return healthy
+
+
+def _delete_floating_ips(os_api_conn, floating_ips):
+    """Delete floating IPs one by one and report each deletion.
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+        floating_ips (list of munch.Munch): The floating IPs to delete.
+
+    Returns:
+        collections.OrderedDict of {str: OsObjectDeleteResult}: Delete results
+            keyed by floating IP ID.
+    """
+
+    results = OrderedDict()
+
+    for floating_ip in floating_ips:
+        try:
+            found = os_api_conn.delete_floating_ip(floating_ip.id)
+        except Exception as e:
+            results[floating_ip.id] = \
+                helpers.OsObjectDeleteResult(floating_ip.id, True, False, e)
+        else:
+            results[floating_ip.id] = \
+                helpers.OsObjectDeleteResult(floating_ip.id, found, found, None)
+
+    return results
+
+
+def _server_addresses(server):
+    """Collect every IP address of an OpenStack server.
+
+    Args:
+        server (openstack.compute.v2.server.Server): The server.
+
+    Returns:
+        list of str: The fixed and floating IP addresses of the server.
+    """
+
+    addresses = [server.get(k) for k in ('accessIPv4',
+                                         'access_ipv4',
+                                         'public_v4',
+                                         'private_v4')]
+
+    for network in (server.get('addresses') or {}).values():
+        addresses.extend(a.get('addr') for a in network)
+
+    return [a for a in addresses if a]
+
+
+def _report_deletions(os_service, results, raise_errors=True):
+    """Warn about OpenStack objects which could not be deleted.
+
+    Args:
+        os_service (str): The service the objects belong to.
+        results (collections.OrderedDict): Results from
+            'pytest_rpc.helpers.delete_os_objects'.
+        raise_errors (bool): Flag for re-raising the first delete error after
+            all problems have been reported.
 
     Raises:
-        openstack.connection.exceptions.OpenStackCloudException: A server could
-            not be deleted in teardown.
-        UserWarning: Server not present when clean-up attempted in teardown.
+        openstack.connection.exceptions.OpenStackCloudException: An object
+            could not be deleted.
+        UserWarning: Object not present when clean-up attempted.
     """
 
-    servers = []  # Track inventory of server instances for teardown.
+    errors = []
+
+    for result in results.values():
+        if result.error is not None:
+            errors.append(result.error)
+            warn(UserWarning("Failed to delete {}! ID: {}\n"
+                             "{}".format(os_service, result.id, result.error)))
+        elif not result.found:
+            warn(UserWarning("Attempted to delete non-existent {}!"
+                             " ID: {}".format(os_service, result.id)))
+        elif result.deleted is False:
+            warn(UserWarning("Timed out waiting for {} deletion!"
+                             " ID: {}".format(os_service, result.id)))
+
+    if errors and raise_errors:
+        raise errors[0]
+
+
+def _make_server_factory(os_api_conn,
+                         os_api_conn_manager,
+                         openstack_properties,
+                         servers,
+                         floating_ip_pool=None,
+                         os_resource_resolver=None,
+                         floating_ips=None):
+    """Build the factory function used by the 'create_server' fixture.
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+        os_api_conn_manager (pytest_rpc.helpers.OsConnectionManager): Provides
+            pooled API connections for concurrent server creation.
+        openstack_properties (dict): OpenStack facts and variables from Ansible
+            which can be used to manipulate OpenStack objects.
+        servers (list): Inventory of server instances which the factory
+            appends to for teardown.
+        floating_ip_pool (pytest_rpc.helpers.FloatingIpPool): The pool to
+            lease floating IPs from. (None to create a floating IP per server)
+        os_resource_resolver (pytest_rpc.helpers.OsResourceResolver): Resolves
+            names of flavors, images, networks and security groups before
+            they are passed to the API. (None to let the API resolve them)
+        floating_ips (dict): Inventory of floating IPs created without a
+            floating IP pool, keyed by server ID. When given, the factory
+            never deletes unattached floating IPs it did not create, so it
+            can run alongside tests creating their own.
+
+    Returns:
+        def: A factory function object with a 'batch' attribute.
+    """
+
+    def _server_args(flavor,
+                     network,
+                     key_name,
+                     security_groups,
+                     image,
+                     timeout,
+                     boot_volume,
+                     availability_zone):
+        """Build the arguments for creating an OpenStack instance.
+
+        Returns:
+            dict: Keyword arguments for 'create_server' minus 'name' and 'wait'.
+
+        Raises:
+            RuntimeError: Mutually exclusive required arguments 'boot_volume' or
+                'image' are not set properly!
+        """
+
+        if os_resource_resolver is not None:
+            flavor = os_resource_resolver.resolve('flavor', flavor)
+            image = os_resource_resolver.resolve('image', image)
+
+            if isinstance(network, list):
+                network = os_resource_resolver.resolve_all('network', network)
+            else:
+                network = os_resource_resolver.resolve('network', network)
+
+            # Security groups are always passed to nova by name or ID. No
+            # security groups are passed through unchanged.
+            if isinstance(security_groups, (str, type(u''))):
+                security_groups = [security_groups]
+
+            if security_groups:
+                security_groups = [
+                    g['id'] if isinstance(g, dict) else g
+                    for g in os_resource_resolver.resolve_all(
+                        'security_group', security_groups
+                    )
+                ]
+
+        # Configure mutually exclusive arguments.
+        if image is not None and boot_volume is None:
+            server_args = {'image': image}
+        elif boot_volume is not None and image is None:
+            server_args = {'boot_volume': boot_volume}
+        else:
+            raise RuntimeError("Mutually exclusive required arguments "
+                               "'boot_volume' or 'image' are not set properly!")
+
+        if availability_zone:
+            server_args['availability_zone'] = availability_zone
+
+        server_args.update({'flavor': flavor,
+                            'auto_ip': False,
+                            'network': network,
+                            'timeout': timeout,
+                            'key_name': key_name,
+                            'security_groups': security_groups})
+
+        return server_args
+
+    def _attach_floating_ip(conn, server):
+        """Lease or create a floating IP address and attach it to the given
+        server.
+
+        Args:
+            conn (openstack.connection.Connection): The API connection to use.
+            server (openstack.compute.v2.server.Server): The server to attach
+                the floating IP address to.
+        """
+
+        if floating_ip_pool is not None:
+            floating_ip = floating_ip_pool.lease(server, conn)
+        else:
+            floating_ip = conn.create_floating_ip(
+                wait=True,
+                server=server,
+                network=openstack_properties['network_name'],
+                timeout=600
+            )
+            if floating_ips is not None:
+                floating_ips[server.id] = floating_ip
+
+        server['accessIPv4'] = floating_ip.floating_ip_address
+        server['access_ipv4'] = floating_ip.floating_ip_address
 
     def _factory(flavor,
                  network,
@@ -153,7 +641,8 @@ def create_server(os_api_conn, openstack_properties):
                  boot_volume=None,
                  show_warnings=True,
                  skip_teardown=False,
-                 availability_zone=None):
+                 availability_zone=None,
+                 retry_policy=None):
         """Create an OpenStack instance.
 
         Note: this function uses an exponential back-off for retries which means
@@ -187,6 +676,8 @@ def create_server(os_api_conn, openstack_properties):
                 instance.
             availability_zone (str): Name of the availability zone for instance
                 placement.
+            retry_policy (pytest_rpc.helpers.RetryPolicy): A validation retry
+                policy which takes precedence over 'retries'.
 
         Returns:
             openstack.compute.v2.server.Server: FYI, this class is not visible
@@ -217,92 +708,485 @@ def create_server(os_api_conn, openstack_properties):
             See https://bit.ly/2EDWA2S for more details.
         """
 
-        # Configure mutually exclusive arguments.
-        if image is not None and boot_volume is None:
-            extra_args = {'image': image}
-        elif boot_volume is not None and image is None:
-            extra_args = {'boot_volume': boot_volume}
-        else:
-            raise RuntimeError("Mutually exclusive required arguments "
-                               "'boot_volume' or 'image' are not set properly!")
+        with helpers.timed_phase('create_server'):
+            server_args = _server_args(flavor,
+                                       network,
+                                       key_name,
+                                       security_groups,
+                                       image,
+                                       timeout,
+                                       boot_volume,
+                                       availability_zone)
+
+            with helpers.timed_phase('boot'):
+                temp_server = os_api_conn.create_server(
+                    wait=True,
+                    name="test_server_{}".format(
+                        helpers.generate_random_string()
+                    ),
+                    **server_args
+                )
 
-        if availability_zone:
-            extra_args['availability_zone'] = availability_zone
-
-        temp_server = os_api_conn.create_server(
-            wait=True,
-            name="test_server_{}".format(helpers.generate_random_string()),
-            flavor=flavor,
-            auto_ip=False,
-            network=network,
-            timeout=timeout,
-            key_name=key_name,
-            security_groups=security_groups,
-            **extra_args
-        )
+            # Verify that the server is on and running.
+            assert helpers.expect_os_properties(
+                retries=retries,
+                retry_policy=retry_policy,
+                os_object=temp_server,
+                os_service='server',
+                os_api_conn=os_api_conn,
+                show_warnings=show_warnings,
+                expected_props=server_active_props
+            )
 
-        # Sometimes the OpenStack object is not fully built even after waiting.
-        sleep(2)
+            # Create floating IP address and attach to test server.
+            if auto_ip:
+                with helpers.timed_phase('floating_ip'):
+                    # TODO: The 'auto_ip' feature of 'create_server' is broken.
+                    #   (ASC-1416)
+                    # Delete all unattached floating IPs.
+                    if floating_ip_pool is None and floating_ips is None:
+                        os_api_conn.delete_unattached_floating_ips(retry=3)
 
-        shared_args = {'retries': retries,
-                       'os_object': temp_server,
-                       'os_service': 'server',
-                       'os_api_conn': os_api_conn,
-                       'show_warnings': show_warnings}
+                    _attach_floating_ip(os_api_conn, temp_server)
 
-        # Verify that the server is on and running.
-        assert helpers.expect_os_property(os_prop_name='status',
-                                          expected_value='ACTIVE',
-                                          **shared_args)
+        if not skip_teardown:
+            servers.append(temp_server)  # Add server to inventory for teardown.
 
-        assert helpers.expect_os_property(os_prop_name='OS-EXT-STS:power_state',
-                                          expected_value='1',
-                                          **shared_args)
+        return temp_server
 
-        assert helpers.expect_os_property(os_prop_name='OS-EXT-STS:vm_state',
-                                          expected_value='active',
-                                          **shared_args)
+    def _batch(count,
+               flavor,
+               network,
+               key_name,
+               security_groups,
+               image=None,
+               auto_ip=True,
+               timeout=600,
+               boot_volume=None,
+               show_warnings=True,
+               skip_teardown=False,
+               availability_zone=None,
+               retry_policy=None,
+               max_workers=5,
+               retries=None):
+        """Create several OpenStack instances concurrently.
+
+        All boot requests are submitted through a bounded pool of worker
+        threads (each borrowing an API connection), the instances are waited
+        on together with a single 'list' API call per poll and floating IPs
+        are attached in parallel. Every server that was submitted is
+        registered for teardown even if it later fails.
 
-        # Create floating IP address and attach to test server.
-        if auto_ip:
-            # TODO: The 'auto_ip' feature of 'create_server' is broken.
-            #   (ASC-1416)
-            # Delete all unattached floating IPs.
-            os_api_conn.delete_unattached_floating_ips(retry=3)
+        Args:
+            count (int): The number of instances to create.
+            flavor (openstack.compute.v2.flavor.Flavor): The flavor property as
+                returned from server. (https://bit.ly/2Lxwqzv)
+                Name or OpenStack ID is also acceptable.
+            network (openstack.network.v2.network.Network): Network dict or name
+                or ID to attach the servers to. (https://bit.ly/2A104IL)
+            key_name (str): The name of an associated keypair.
+            security_groups(list): A list of security group names.
+            image (openstack.image.v2.image.Image): The image property as
+                returned from server. image is required unless boot_volume is
+                given. Name or OpenStack ID is also acceptable.
+                (https://bit.ly/2UXESvW)
+            auto_ip (bool): Flag for specifying whether a floating IP should be
+                attached to the instances automatically.
+            timeout (int): Seconds to wait for all the instances to become
+                active, defaults to 600.
+            boot_volume (openstack.image.v2.volume.Volume): Volume to boot from.
+                Name or OpenStack ID is also acceptable.
+                (https://bit.ly/2ReINW7)
+            show_warnings (bool): Flag for displaying warnings while attempting
+                validate servers.(VERY NOISY!)
+            skip_teardown (bool): Skip automatic teardown for these server
+                instances.
+            availability_zone (str): Name of the availability zone for instance
+                placement.
+            retry_policy (pytest_rpc.helpers.RetryPolicy): A validation retry
+                policy which takes precedence over 'timeout' and 'retries'.
+            max_workers (int): The maximum number of concurrent API requests.
+            retries (int): The maximum number of validation polls for the
+                whole batch. The wait is still bounded by 'timeout'. (None to
+                poll until 'timeout' elapses)
 
-            floating_ip = os_api_conn.create_floating_ip(
-                wait=True,
-                server=temp_server,
-                network=openstack_properties['network_name'],
-                timeout=600
-            )
+        Returns:
+            list of ServerBatchResult: One result per requested instance in
+                request order. Failed instances have an 'error' set.
 
-            temp_server['accessIPv4'] = floating_ip.floating_ip_address
-            temp_server['access_ipv4'] = floating_ip.floating_ip_address
+        Raises:
+            RuntimeError: Mutually exclusive required arguments 'boot_volume' or
+                'image' are not set properly!
+        """
 
-        if not skip_teardown:
-            servers.append(temp_server)  # Add server to inventory for teardown.
+        server_args = _server_args(flavor,
+                                   network,
+                                   key_name,
+                                   security_groups,
+                                   image,
+                                   timeout,
+                                   boot_volume,
+                                   availability_zone)
+        retry_policy = retry_policy or helpers.RetryPolicy(retries=retries,
+                                                           max_sleep=10,
+                                                           deadline=timeout)
+
+        def _submit(_):
+            try:
+                with os_api_conn_manager.checkout() as conn:
+                    temp_server = conn.create_server(
+                        wait=False,
+                        name="test_server_{}".format(
+                            helpers.generate_random_string()
+                        ),
+                        **server_args
+                    )
+            except Exception as e:
+                return ServerBatchResult(None, e)
+
+            if not skip_teardown:
+                servers.append(temp_server)  # Add server to inventory.
+
+            return ServerBatchResult(temp_server, None)
+
+        def _attach(result):
+            if result.error is not None:
+                return result
 
-        return temp_server
+            try:
+                with os_api_conn_manager.checkout() as conn:
+                    _attach_floating_ip(conn, result.server)
+            except Exception as e:
+                return ServerBatchResult(result.server, e)
 
-    yield _factory
+            return result
+
+        with helpers.timed_phase('create_server.batch'):
+            pool = ThreadPool(max(1, min(count, max_workers)))
+
+            try:
+                with helpers.timed_phase('submit'):
+                    results = pool.map(helpers.phase_timer.bind(_submit),
+                                       range(count))
+
+                # Verify that the servers are on and running.
+                with helpers.timed_phase('wait'):
+                    wait_results = helpers.wait_for_os_objects(
+                        os_api_conn=os_api_conn,
+                        os_service='server',
+                        os_objects=[r.server for r in results
+                                    if r.error is None],
+                        expected_props=server_active_props,
+                        failure_props={'status': 'ERROR'},
+                        show_warnings=show_warnings,
+                        retry_policy=retry_policy
+                    )
+
+                for index, result in enumerate(results):
+                    if result.error is not None:
+                        continue
+
+                    wait_result = wait_results[result.server.id]
+                    if not wait_result.ready:
+                        results[index] = ServerBatchResult(
+                            result.server,
+                            RuntimeError("Server '{}' failed to become active! "
+                                         "Last observed state: {}".format(
+                                             result.server.id,
+                                             wait_result.state))
+                        )
+
+                # Create floating IP addresses and attach to test servers.
+                if auto_ip:
+                    with helpers.timed_phase('floating_ip'):
+                        if floating_ip_pool is None and floating_ips is None:
+                            os_api_conn.delete_unattached_floating_ips(retry=3)
+                        results = pool.map(
+                            helpers.phase_timer.bind(_attach), results
+                        )
+            finally:
+                pool.close()
+                pool.join()
+
+        return results
+
+    _factory.batch = _batch
+
+    return _factory
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture(scope='session')
+def openstack_session_properties():
+    """This fixture returns a function which provides the dictionary of
+    OpenStack facts and variables from Ansible. The data is parsed once per
+    session and only re-read when the OpenStack version file changes.
+
+    Note: the dictionary returned by the function is shared by the whole
+    session and MUST NOT be modified. Use the 'openstack_properties' fixture
+    for a per-test copy.
+
+    Returns:
+        def: A function which returns the shared dictionary of data about
+            OpenStack.
+    """
+
+    return _make_openstack_properties_cache()
+
+
+@pytest.fixture
+def openstack_properties(openstack_session_properties):
+    """This fixture returns a dictionary of OpenStack facts and variables from
+    Ansible which can be used to manipulate OpenStack objects. (i.e. create
+    server instances)
+
+    Args:
+        openstack_session_properties (def): Provides the OpenStack data
+            cached for the session.
+
+    Returns:
+        dict: a static dictionary of data about OpenStack. (A copy which the
+            test is free to modify)
+    """
+
+    return dict(openstack_session_properties())
+
+
+@pytest.fixture(scope='session')
+def os_api_conn_manager():
+    """Provide a manager of API connections to the 'default' cloud on the
+    OpenStack infrastructure which authenticates once per session and reuses
+    the keystone token. Use 'checkout()' from worker threads to borrow a
+    connection from a bounded pool.
+
+    Returns:
+        pytest_rpc.helpers.OsConnectionManager: The connection manager.
+    """
+
+    manager = helpers.OsConnectionManager(_connect_to_cloud)
+
+    yield manager
 
     # Teardown
-    for server in servers:
-        if not os_api_conn.delete_server(name_or_id=server.id, wait=True):
-            warn(UserWarning("Attempted to delete non-existent server!"
-                             " ID: {}".format(server.id)))
+    manager.close()
+
+
+@pytest.fixture(scope='session')
+def os_api_session_conn(os_api_conn_manager):
+    """Provide an authorized API connection to the 'default' cloud on the
+    OpenStack infrastructure which is shared by the whole session.
+
+    Args:
+        os_api_conn_manager (pytest_rpc.helpers.OsConnectionManager): The
+            session connection manager.
+
+    Returns:
+        openstack.connection.Connection: https://bit.ly/2LqgiiT
+    """
+
+    return os_api_conn_manager.get()
 
 
 @pytest.fixture
-def create_volume(os_api_conn, openstack_properties):
+def os_api_conn(os_api_session_conn, os_api_conn_manager):
+    """Provide an authorized API connection to the 'default' cloud on the
+    OpenStack infrastructure. The shared keystone token is re-authenticated
+    before each test if it is about to expire.
+
+    Args:
+        os_api_session_conn (openstack.connection.Connection): The session
+            API connection.
+        os_api_conn_manager (pytest_rpc.helpers.OsConnectionManager): The
+            session connection manager.
+
+    Returns:
+        openstack.connection.Connection: https://bit.ly/2LqgiiT
+    """
+
+    os_api_conn_manager.refresh_if_expiring()
+
+    return os_api_session_conn
+
+
+@pytest.fixture(scope='session')
+def os_resource_resolver(os_api_conn_manager):
+    """Provide a session cache which resolves names and IDs of flavors,
+    images, networks, subnets and security groups with one 'list' API call per
+    resource type.
+
+    Note: tests which create or delete these resources should call
+    'os_resource_resolver.invalidate(resource_type)' afterwards.
+
+    Args:
+        os_api_conn_manager (pytest_rpc.helpers.OsConnectionManager): The
+            session connection manager.
+
+    Returns:
+        pytest_rpc.helpers.OsResourceResolver: The resolver.
+    """
+
+    return helpers.OsResourceResolver(os_api_conn_manager.connect())
+
+
+@pytest.fixture(scope='session')
+def os_object_reaper(request, os_api_conn_manager):
+    """Provide a background reaper for OpenStack objects when the
+    '--rpc-background-teardown' option is given. All deletions are drained and
+    problems are reported before the session ends.
+
+    Args:
+        os_api_conn_manager (pytest_rpc.helpers.OsConnectionManager): The
+            session connection manager.
+
+    Returns:
+        pytest_rpc.helpers.OsObjectReaper: The reaper or None if background
+            teardown is disabled.
+    """
+
+    if not request.config.getoption('rpc_background_teardown'):
+        yield None
+        return
+
+    reaper = helpers.OsObjectReaper(os_api_conn_manager.connect(),
+                                    os_api_conn_manager=os_api_conn_manager)
+
+    yield reaper
+
+    # Teardown
+    for os_service, results in reaper.close():
+        _report_deletions(os_service, results, raise_errors=False)
+
+
+@pytest.fixture(scope='session')
+def floating_ip_pool(request,
+                     os_api_conn_manager,
+                     openstack_session_properties):
+    """Provide a session pool of pre-allocated floating IPs when the
+    '--rpc-floating-ip-pool-size' option is greater than zero. Every floating
+    IP in the pool is released when the session ends.
+
+    Args:
+        os_api_conn_manager (pytest_rpc.helpers.OsConnectionManager): The
+            session connection manager.
+        openstack_session_properties (def): Provides the OpenStack data
+            cached for the session.
+
+    Returns:
+        pytest_rpc.helpers.FloatingIpPool: The floating IP pool or None if the
+            pool is disabled.
+    """
+
+    size = request.config.getoption('rpc_floating_ip_pool_size')
+
+    if not size:
+        yield None
+        return
+
+    network = openstack_session_properties()['network_name']
+    pool = helpers.FloatingIpPool(os_api_conn_manager.connect(),
+                                  network,
+                                  size,
+                                  os_api_conn_manager=os_api_conn_manager)
+
+    for error in pool.start():
+        warn(UserWarning('Failed to allocate floating IP: {}'.format(error)))
+
+    yield pool
+
+    # Teardown
+    _report_deletions('floating_ip', pool.close(), raise_errors=False)
+
+
+@pytest.fixture
+def create_server(os_api_conn,
+                  os_api_conn_manager,
+                  openstack_properties,
+                  os_object_reaper,
+                  floating_ip_pool,
+                  os_resource_resolver,
+                  ssh_connection_pool):
+    """Create OpenStack server instances with automatic teardown after each
+    test.
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+        os_api_conn_manager (pytest_rpc.helpers.OsConnectionManager): Provides
+            pooled API connections for concurrent server creation.
+        openstack_properties (dict): OpenStack facts and variables from Ansible
+            which can be used to manipulate OpenStack objects.
+        os_object_reaper (pytest_rpc.helpers.OsObjectReaper): Background
+            reaper used for teardown when enabled.
+        floating_ip_pool (pytest_rpc.helpers.FloatingIpPool): The pool floating
+            IPs are leased from when enabled.
+        os_resource_resolver (pytest_rpc.helpers.OsResourceResolver): Resolves
+            resource names before they are passed to the API.
+        ssh_connection_pool (pytest_rpc.helpers.SshConnectionPool): Pooled
+            SSH connections to deleted servers are closed in teardown.
+
+    Returns:
+        def: A factory function object. Use 'create_server.batch(count, ...)'
+            to create several servers concurrently.
+
+    Raises:
+        openstack.connection.exceptions.OpenStackCloudException: A server could
+            not be deleted in teardown.
+        UserWarning: Server not present when clean-up attempted in teardown.
+    """
+
+    servers = []  # Track inventory of server instances for teardown.
+
+    yield _make_server_factory(os_api_conn,
+                               os_api_conn_manager,
+                               openstack_properties,
+                               servers,
+                               floating_ip_pool,
+                               os_resource_resolver)
+
+    # Teardown
+    with helpers.timed_phase('create_server.teardown'):
+        ssh_connection_pool.evict(
+            itertools.chain.from_iterable(_server_addresses(server)
+                                          for server in servers)
+        )
+
+        if floating_ip_pool is not None:
+            for server in servers:
+                floating_ip_pool.release(server, os_api_conn)
+
+        if os_object_reaper is not None:
+            os_object_reaper.submit('server', servers)
+        else:
+            _report_deletions('server',
+                              helpers.delete_os_objects(
+                                  os_api_conn,
+                                  'server',
+                                  servers,
+                                  os_api_conn_manager=os_api_conn_manager
+                              ))
+
+
+@pytest.fixture
+def create_volume(os_api_conn,
+                  os_api_conn_manager,
+                  openstack_properties,
+                  os_object_reaper,
+                  os_resource_resolver):
     """Create OpenStack volumes with automatic teardown after each test.
 
     Args:
         os_api_conn (openstack.connection.Connection): An authorized API
             connection to the 'default' cloud on the OpenStack infrastructure.
+        os_api_conn_manager (pytest_rpc.helpers.OsConnectionManager): Provides
+            pooled API connections for concurrent volume deletion.
         openstack_properties (dict): OpenStack facts and variables from Ansible
             which can be used to manipulate OpenStack objects.
+        os_object_reaper (pytest_rpc.helpers.OsObjectReaper): Background
+            reaper used for teardown when enabled.
+        os_resource_resolver (pytest_rpc.helpers.OsResourceResolver): Resolves
+            image names before they are passed to the API.
 
     Returns:
         def: A factory function object.
@@ -320,7 +1204,8 @@ def create_volume(os_api_conn, openstack_properties):
                  timeout=600,
                  bootable=False,
                  show_warnings=True,
-                 skip_teardown=False):
+                 skip_teardown=False,
+                 retry_policy=None):
         """Create an OpenStack volume.
 
         Args:
@@ -335,6 +1220,8 @@ def create_volume(os_api_conn, openstack_properties):
                 validate server.(VERY NOISY!)
             skip_teardown (bool): Skip automatic teardown for this server
                 instance.
+            retry_policy (pytest_rpc.helpers.RetryPolicy): A validation retry
+                policy which takes precedence over 'retries'.
 
         Returns:
             openstack.compute.v2.server.Server: FYI, this class is not visible
@@ -348,23 +1235,29 @@ def create_volume(os_api_conn, openstack_properties):
                 exceeded.
         """
 
-        temp_volume = os_api_conn.create_volume(
-            size=size,
-            wait=True,
-            name="test_volume_{}".format(helpers.generate_random_string()),
-            image=image,
-            timeout=timeout,
-            bootable=bootable
-        )
+        with helpers.timed_phase('create_volume'):
+            with helpers.timed_phase('create'):
+                temp_volume = os_api_conn.create_volume(
+                    size=size,
+                    wait=True,
+                    name="test_volume_{}".format(
+                        helpers.generate_random_string()
+                    ),
+                    image=os_resource_resolver.resolve('image', image),
+                    timeout=timeout,
+                    bootable=bootable
+                )
 
-        # Verify that the volume is available.
-        assert helpers.expect_os_property(retries=retries,
-                                          os_object=temp_volume,
-                                          os_service='volume',
-                                          os_api_conn=os_api_conn,
-                                          os_prop_name='status',
-                                          show_warnings=show_warnings,
-                                          expected_value='available')
+            # Verify that the volume is available.
+            assert helpers.expect_os_properties(
+                retries=retries,
+                retry_policy=retry_policy,
+                os_object=temp_volume,
+                os_service='volume',
+                os_api_conn=os_api_conn,
+                show_warnings=show_warnings,
+                expected_props={'status': 'available'}
+            )
 
         if not skip_teardown:
             volumes.append(temp_volume)  # Add volume to inventory for teardown.
@@ -374,17 +1267,76 @@ def create_volume(os_api_conn, openstack_properties):
     yield _factory
 
     # Teardown
-    for volume in volumes:
-        os_api_conn.delete_volume(name_or_id=volume.id, wait=True)
+    with helpers.timed_phase('create_volume.teardown'):
+        if os_object_reaper is not None:
+            os_object_reaper.submit('volume', volumes)
+        else:
+            _report_deletions('volume',
+                              helpers.delete_os_objects(
+                                  os_api_conn,
+                                  'volume',
+                                  volumes,
+                                  os_api_conn_manager=os_api_conn_manager
+                              ))
+
+
+@pytest.fixture(scope='session')
+def host_facts(request, openstack_session_properties):
+    """Provide a session cache of facts about testinfra hosts which are
+    expensive to probe, such as the cinder major version, the container
+    inventory and the OpenStack release. Facts saved by an earlier run are
+    only reused against the same deployment.
+
+    Example:
+        >>> host_facts.get(host, 'cinder_major_version')
+        3
+
+    Args:
+        openstack_session_properties (def): Provides the OpenStack data
+            cached for the session.
+
+    Returns:
+        pytest_rpc.helpers.HostFacts: The host facts cache.
+    """
+
+    facts = helpers.HostFacts(
+        request.config.getoption('rpc_host_facts'),
+        fingerprint=_deployment_fingerprint(openstack_session_properties())
+    )
+
+    yield facts
+
+    # Teardown
+    facts.save()
+
+
+@pytest.fixture(scope='session')
+def ssh_connection_pool():
+    """Provide a session pool of authenticated SSH connections so that tests
+    connecting to the same server many times with 'ssh_connect(...,
+    reuse=True)' only pay for the SSH handshake once.
+
+    Returns:
+        pytest_rpc.helpers.SshConnectionPool: The SSH connection pool.
+    """
+
+    pool = helpers.SshConnectionPool()
+
+    yield pool
+
+    # Teardown
+    pool.close()
 
 
 @pytest.fixture
-def ssh_connect(openstack_properties):
+def ssh_connect(openstack_properties, ssh_connection_pool):
     """Create a connection to a server via SSH.
 
     Args:
         openstack_properties (dict): OpenStack facts and variables from Ansible
             which can be used to manipulate OpenStack objects.
+        ssh_connection_pool (pytest_rpc.helpers.SshConnectionPool): The
+            session pool of reusable SSH connections.
 
     Returns:
         def: A factory function object.
@@ -396,7 +1348,9 @@ def ssh_connect(openstack_properties):
                  username,
                  retries=10,
                  key_filename=None,
-                 auth_timeout=180):
+                 auth_timeout=180,
+                 retry_policy=None,
+                 reuse=False):
         """Connect to a server via SSH.
 
         Note: this function uses an exponential back-off for retries which means
@@ -413,6 +1367,13 @@ def ssh_connect(openstack_properties):
                 is to use the 'rpc_support' key.
             auth_timeout (float): An optional timeout (in seconds) to wait for
                 an authentication response.
+            retry_policy (pytest_rpc.helpers.RetryPolicy): A retry policy which
+                takes precedence over 'retries'.
+            reuse (bool): Flag for handing back a live pooled connection to the
+                same server, user and key. Pooled connections are shared,
+                closed when 'create_server' deletes the server and otherwise
+                at the end of the session. (Default is a private connection
+                which is closed after the test)
 
         Returns:
             paramiko.client.SSHClient: A client already connected to the target
@@ -430,28 +1391,49 @@ def ssh_connect(openstack_properties):
             socket.error: If a socket error occurred while connecting.
         """
 
-        temp_connection = SSHClient()
-        temp_connection.set_missing_host_key_policy(AutoAddPolicy())
-
-        for attempt in range(1, retries + 1):
-            try:
-                temp_connection.connect(
-                    hostname=hostname,
-                    username=username,
-                    key_filename=(
-                        key_filename or openstack_properties['private_key_path']
-                    ),
-                    auth_timeout=auth_timeout
-                )
-            except NoValidConnectionsError:
-                if attempt != retries + 1:
-                    sleep(attempt)
+        key_filename = key_filename or openstack_properties['private_key_path']
+
+        with helpers.timed_phase('ssh_connect'):
+            if reuse:
+                temp_connection = ssh_connection_pool.get(hostname,
+                                                          username,
+                                                          key_filename)
+                if temp_connection is not None:
+                    return temp_connection
+
+            temp_connection = SSHClient()
+            temp_connection.set_missing_host_key_policy(AutoAddPolicy())
+
+            retry_policy = helpers.RetryPolicy.resolve(retries, retry_policy)
+            connect_error = None
+
+            for _ in retry_policy.attempts():
+                try:
+                    with helpers.timed_phase('connect'):
+                        temp_connection.connect(
+                            hostname=hostname,
+                            username=username,
+                            key_filename=key_filename,
+                            auth_timeout=auth_timeout
+                        )
+                except NoValidConnectionsError as e:
+                    connect_error = e
                 else:
-                    raise   # Re-raise
+                    connect_error = None
+                    break
+
+            if connect_error is not None:
+                raise connect_error
 
-        connections.append(temp_connection)
+            if reuse:
+                ssh_connection_pool.put(hostname,
+                                        username,
+                                        key_filename,
+                                        temp_connection)
+            else:
+                connections.append(temp_connection)
 
-        return temp_connection
+            return temp_connection
 
     yield _factory
 
@@ -462,14 +1444,120 @@ def ssh_connect(openstack_properties):
     HostKeys().clear()  # Clear the 'known_hosts' file.
 
 
+@pytest.fixture(scope='session')
+def cirros_server_pool(request,
+                       os_api_conn_manager,
+                       openstack_session_properties,
+                       floating_ip_pool,
+                       os_resource_resolver,
+                       ssh_connection_pool):
+    """Provide a session pool of warm 'm1.tiny' Cirros servers when the
+    '--rpc-server-pool-size' option is greater than zero. The pool is filled
+    in the background and every server is deleted when the session ends.
+
+    Args:
+        os_api_conn_manager (pytest_rpc.helpers.OsConnectionManager): The
+            session connection manager.
+        openstack_session_properties (def): Provides the OpenStack data
+            cached for the session.
+        floating_ip_pool (pytest_rpc.helpers.FloatingIpPool): The pool floating
+            IPs are leased from when enabled.
+        os_resource_resolver (pytest_rpc.helpers.OsResourceResolver): Resolves
+            resource names before they are passed to the API.
+        ssh_connection_pool (pytest_rpc.helpers.SshConnectionPool): Pooled
+            SSH connections to discarded servers are closed.
+
+    Returns:
+        pytest_rpc.helpers.ServerPool: The server pool or None if the pool is
+            disabled.
+    """
+
+    size = request.config.getoption('rpc_server_pool_size')
+    reset_mode = request.config.getoption('rpc_server_pool_reset')
+
+    if not size:
+        yield None
+        return
+
+    openstack_properties = dict(openstack_session_properties())
+    floating_ips = {}   # Floating IPs created for pooled servers.
+
+    def _create():
+        # Each background worker creates its server on its own connection.
+        # Passing 'floating_ips' keeps the factory from sweeping unattached
+        # floating IPs which concurrent tests have yet to attach.
+        with os_api_conn_manager.checkout() as conn:
+            factory = _make_server_factory(conn,
+                                           os_api_conn_manager,
+                                           openstack_properties,
+                                           [],
+                                           floating_ip_pool,
+                                           os_resource_resolver,
+                                           floating_ips)
+
+            return factory(
+                image=openstack_properties['cirros_image'],
+                flavor=openstack_properties['tiny_flavor'],
+                network=openstack_properties['test_network'],
+                key_name=openstack_properties['key_name'],
+                show_warnings=False,
+                skip_teardown=True,
+                security_groups=[openstack_properties['security_group']]
+            )
+
+    def _reset(server):
+        with os_api_conn_manager.checkout() as conn:
+            return _reset_server(conn, server, reset_mode)
+
+    def _discard(server):
+        ssh_connection_pool.evict(_server_addresses(server))
+
+        with os_api_conn_manager.checkout() as conn:
+            if floating_ip_pool is not None:
+                floating_ip_pool.release(server, conn)
+            helpers.delete_os_objects(conn, 'server', [server], wait=False)
+
+            floating_ip = floating_ips.pop(server.id, None)
+            if floating_ip is not None:
+                conn.delete_floating_ip(floating_ip.id)
+
+    pool = helpers.ServerPool(_create, _reset, _discard, size)
+    pool.start()
+
+    yield pool
+
+    # Teardown
+    _report_deletions('server',
+                      helpers.delete_os_objects(
+                          os_api_conn_manager.get(),
+                          'server',
+                          pool.close(),
+                          os_api_conn_manager=os_api_conn_manager
+                      ),
+                      raise_errors=False)
+    _report_deletions('floating_ip',
+                      _delete_floating_ips(os_api_conn_manager.get(),
+                                           list(floating_ips.values())),
+                      raise_errors=False)
+
+
 @pytest.fixture
-def tiny_cirros_server(create_server, openstack_properties):
+def tiny_cirros_server(request,
+                       create_server,
+                       openstack_properties,
+                       cirros_server_pool):
     """Create an 'm1.tiny' server instance with a Cirros image.
 
+    When the warm server pool is enabled the server is leased from the pool
+    and returned to it after the test, unless the test is marked as
+    'destructive'.
+
     Args:
         create_server (def): A factory function for generating servers.
         openstack_properties(dict): OpenStack facts and variables from Ansible
             which can be used to manipulate OpenStack objects.
+        cirros_server_pool (pytest_rpc.helpers.ServerPool): The warm server
+            pool or None if the pool is disabled.
 
     Returns:
         openstack.compute.v2.server.Server: FYI, this class is not visible
@@ -477,22 +1565,35 @@ def tiny_cirros_server(create_server, openstack_properties):
             (https://bit.ly/2rMu7iQ)
     """
 
-    return create_server(
-        image=openstack_properties['cirros_image'],
-        flavor=openstack_properties['tiny_flavor'],
-        network=openstack_properties['test_network'],
-        key_name=openstack_properties['key_name'],
-        show_warnings=False,
-        security_groups=[openstack_properties['security_group']]
-    )
+    if (cirros_server_pool is None or
+            request.node.get_closest_marker('destructive')):
+        yield create_server(
+            image=openstack_properties['cirros_image'],
+            flavor=openstack_properties['tiny_flavor'],
+            network=openstack_properties['test_network'],
+            key_name=openstack_properties['key_name'],
+            show_warnings=False,
+            security_groups=[openstack_properties['security_group']]
+        )
+        return
+
+    server = cirros_server_pool.lease()
+
+    yield server
+
+    # Teardown
+    cirros_server_pool.release(server)
 
 
 @pytest.fixture
-def small_ubuntu_server(create_server, openstack_properties):
-    """Create a 'm1.small' server instance with an Ubuntu image.
+def small_ubuntu_server(create_server, os_api_conn, openstack_properties):
+    """Create a 'm1.small' server instance with an Ubuntu image. The fixture
+    waits until the guest accepts SSH connections and cloud-init has finished.
 
     Args:
         create_server (def): A factory function for generating servers.
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
         openstack_properties(dict): OpenStack facts and variables from Ansible
             which can be used to manipulate OpenStack objects.
 
@@ -511,6 +1612,74 @@ def small_ubuntu_server(create_server, openstack_properties):
         security_groups=[openstack_properties['security_group']]
     )
 
-    sleep(120)  # OS boot takes a very long time.
+    # OS boot takes a very long time.
+    assert helpers.wait_for_guest_ready(temp_server['accessIPv4'],
+                                        os_api_conn=os_api_conn,
+                                        server=temp_server)
 
     return temp_server
+
+
+@pytest.fixture(scope='session')
+def container_shell():
+    """Provide persistent bash sessions inside containers so that tests
+    running many short commands only pay for 'lxc-attach' and environment
+    setup once per container.
+
+    Returns:
+        def: A factory function object.
+    """
+
+    shells = {}  # Track inventory of shells for reuse and teardown.
+    lock = threading.Lock()
+
+    def _factory(run_on_host,
+                 container_type=None,
+                 container_name=None,
+                 setup=None,
+                 timeout=60):
+        """Retrieve the shell for a container, opening it on first use.
+
+        Args:
+            run_on_host (testinfra.Host): Testinfra host object to attach to
+                the container from.
+            container_type (str): The container type to resolve through the
+                container inventory of the host. (e.g. 'swift')
+            container_name (str): The exact name of the container. Takes
+                precedence over 'container_type'.
+            setup (str): Command to run once when the session starts. (e.g.
+                pytest_rpc.helpers.swift_env_setup)
+            timeout (int): Default seconds to wait for a command to finish.
+
+        Returns:
+            pytest_rpc.helpers.ContainerShell: The container shell.
+
+        Raises:
+            RuntimeError: No container matches the container type.
+        """
+
+        if container_name is None:
+            inventory = helpers.get_container_inventory(run_on_host)
+            container_name = inventory.resolve(container_type)
+
+            if container_name is None:
+                raise RuntimeError("No '{}' container found!".format(
+                    container_type
+                ))
+
+        key = (run_on_host, container_name, setup)
+
+        with lock:
+            if key not in shells:
+                shells[key] = helpers.ContainerShell(run_on_host,
+                                                     container_name,
+                                                     setup=setup,
+                                                     timeout=timeout)
+
+            return shells[key]
+
+    yield _factory
+
+    # Teardown
+    for shell in shells.values():
+        shell.close()
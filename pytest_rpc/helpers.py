@@ -3,135 +3,3720 @@
 # Imports
 # ==============================================================================
 import re
+import json
+import errno
+import select
+import struct
 import uuid
-from time import sleep
+import socket
+import random
+import base64
+import itertools
+import threading
+from array import array
+from functools import wraps
+from contextlib import contextmanager
+from time import sleep, time
+from datetime import datetime
 from warnings import warn
 from pprint import pformat
+from collections import namedtuple, OrderedDict, deque
 from platform import system
-from subprocess import call
+from subprocess import Popen, PIPE, STDOUT
+from multiprocessing.pool import ThreadPool
 from packaging.version import Version, InvalidVersion
 
+# Shakes tiny fist at Python 2.7!
+try:
+    # noinspection PyCompatibility
+    from Queue import Queue, Empty
+except ImportError:
+    # noinspection PyCompatibility
+    from queue import Queue, Empty
+
 
 # ==============================================================================
-# Helpers
+# Globals
 # ==============================================================================
-def expect_os_property(os_api_conn,
-                       os_service,
-                       os_object,
-                       os_prop_name,
-                       expected_value,
-                       retries=10,
-                       show_warnings=True,
-                       case_insensitive=True,
-                       only_extended_props=False):
-    """Test whether an OpenStack object property matches an expected value.
+# Logged to the console by cloud-init once the guest has finished booting.
+cloud_init_finished_regex = re.compile(r'Cloud-init v\. \S+ finished')
+
+# Separates the blocks of swift-recon output.
+swift_recon_delimiter_regex = re.compile(r'^={79}')
+
+# Lines of interest within the blocks of swift-recon output.
+swift_recon_header_regex = re.compile(
+    r'^--> Starting reconnaissance on (\d+) hosts? \((\w+)\)'
+)
+swift_recon_check_regex = re.compile(
+    r'^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] (?:Checking )?(.*?)\s*$'
+)
+swift_recon_match_regex = re.compile(
+    r'^(\d+)/(\d+) hosts matched, (\d+) error'
+)
+
+# Packet counts and round trip times reported by ping.
+ping_packets_regex = re.compile(
+    r'(\d+) packets transmitted, (\d+) (?:packets )?received'
+)
+ping_rtt_regex = re.compile(r'min/avg/max\S* = ([\d.]+)/([\d.]+)/([\d.]+)')
+
+# Payload of the ICMP echo requests sent by the reachability probes.
+icmp_echo_payload = b'pytest-rpc-probe'
+
+# Flags which swift-ring-builder can show for a device.
+swift_ring_device_flags = ('DEL',)
+
+# Characters of the previously scanned console log to scan again.
+console_scan_overlap = 256
+
+# Container inventories keyed by testinfra host.
+_container_inventories = {}
+_container_inventories_lock = threading.Lock()
+
+# Backends which have been warned about not supporting a container shell.
+_container_shell_warnings = set()
+_container_shell_warnings_lock = threading.Lock()
+
+# Prepares the environment for running swift commands on the swift container.
+swift_env_setup = (". ~/openrc ; "
+                   ". /openstack/venvs/swift-*/bin/activate")
+
+# OpenStack services checked by version discovery and their SDK proxies.
+os_version_services = OrderedDict([('cinder', 'block_storage'),
+                                   ('nova', 'compute'),
+                                   ('neutron', 'network'),
+                                   ('glance', 'image'),
+                                   ('swift', 'object_store')])
+
+# Bytes read from an SSH channel at a time and seconds to wait for more.
+ssh_read_size = 32768
+ssh_poll_interval = 0.01
+
+
+# ==============================================================================
+# Classes
+# ==============================================================================
+OsObjectWaitResult = namedtuple('OsObjectWaitResult',
+                                ('id', 'ready', 'elapsed', 'attempts', 'state'))
+OsObjectWaitResult.__doc__ = """The outcome of waiting on a single OpenStack
+object.
+
+Attributes:
+    id (str): The OpenStack object ID.
+    ready (bool): Whether the object reached the expected state.
+    elapsed (float): Seconds from the start of the wait until the object
+        reached the expected state (or until the wait gave up).
+    attempts (int): The number of polls performed for the object.
+    state (munch.Munch): The last observed state of the object. (None if the
+        object was never observed)
+"""
+
+
+class RetryPolicy(object):
+    """A retry policy shared by the helpers and fixtures that poll for state.
+
+    The policy controls how many attempts are made, how long to sleep between
+    attempts and the total wall-clock time that may be spent retrying.
+
+    Strategies:
+        fibonacci: Sleep times follow the fibonacci sequence scaled by
+            'interval'. (https://bit.ly/1ee23o9)
+        exponential: Sleep times double after every attempt starting from
+            'interval'. Full jitter is applied by default so that many
+            concurrent pollers do not move in lockstep.
+        fixed: Sleep for 'interval' seconds between every attempt.
+
+    Example:
+        >>> policy = RetryPolicy(retries=20,
+        >>>                      strategy=RetryPolicy.EXPONENTIAL,
+        >>>                      max_sleep=30,
+        >>>                      deadline=600)
+        >>> for attempt in policy.attempts():
+        >>>     if check_something():
+        >>>         break
+    """
+
+    FIBONACCI = 'fibonacci'
+    EXPONENTIAL = 'exponential'
+    FIXED = 'fixed'
+    STRATEGIES = (FIBONACCI, EXPONENTIAL, FIXED)
+
+    def __init__(self,
+                 retries=10,
+                 strategy=FIBONACCI,
+                 interval=1,
+                 max_sleep=None,
+                 deadline=None,
+                 jitter=None):
+        """Create a retry policy.
+
+        Args:
+            retries (int): The maximum number of attempts. (None for no limit,
+                in which case a 'deadline' is required)
+            strategy (str): The back-off strategy to use. ('fibonacci',
+                'exponential' or 'fixed')
+            interval (float): The base number of seconds to sleep between
+                attempts.
+            max_sleep (float): The maximum number of seconds for any single
+                sleep. (None for no limit)
+            deadline (float): The maximum number of seconds that may elapse
+                across all attempts. (None for no limit)
+            jitter (bool): Flag for randomizing each sleep between zero and the
+                computed back-off. (Defaults to True for the 'exponential'
+                strategy and False otherwise)
+
+        Raises:
+            RuntimeError: Invalid strategy specified.
+            RuntimeError: Neither 'retries' nor 'deadline' were specified.
+        """
+
+        if strategy not in self.STRATEGIES:
+            raise RuntimeError("Invalid '{}' retry strategy "
+                               "specified!".format(strategy))
+        if retries is None and deadline is None:
+            raise RuntimeError("Either 'retries' or 'deadline' must be "
+                               "specified!")
+
+        self.retries = retries
+        self.strategy = strategy
+        self.interval = interval
+        self.max_sleep = max_sleep
+        self.deadline = deadline
+        self.jitter = strategy == self.EXPONENTIAL if jitter is None else jitter
+
+    def __repr__(self):
+        return ('RetryPolicy(retries={0.retries}, strategy={0.strategy!r}, '
+                'interval={0.interval}, max_sleep={0.max_sleep}, '
+                'deadline={0.deadline}, jitter={0.jitter})'.format(self))
+
+    def backoff(self, attempt):
+        """Calculate the number of seconds to sleep after a failed attempt.
+
+        Args:
+            attempt (int): The number of the attempt that failed. (1-based)
+
+        Returns:
+            float: Seconds to sleep before the next attempt.
+        """
+
+        if self.strategy == self.FIBONACCI:
+            previous, current = 0, 1
+            for _ in range(1, attempt):
+                previous, current = current, previous + current
+            delay = self.interval * current
+        elif self.strategy == self.EXPONENTIAL:
+            delay = self.interval * (2 ** min(attempt - 1, 32))
+        else:
+            delay = self.interval
+
+        if self.max_sleep is not None:
+            delay = min(delay, self.max_sleep)
+
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        return delay
+
+    def attempts(self):
+        """Generate attempt numbers, sleeping between them according to the
+        policy. Iteration stops once the retries or the deadline are exhausted.
+        No sleep occurs after the final attempt.
+
+        Yields:
+            int: The current attempt number. (1-based)
+        """
+
+        start = time()
+
+        if self.retries is None:
+            attempts = itertools.count(1)
+        else:
+            attempts = range(1, self.retries + 1)
+
+        for attempt in attempts:
+            yield attempt
+
+            if attempt == self.retries:
+                break
+
+            delay = self.backoff(attempt)
+
+            if self.deadline is not None:
+                remaining = self.deadline - (time() - start)
+                if remaining <= 0:
+                    break
+                delay = min(delay, remaining)
+
+            with timed_phase('retry_sleep'):
+                sleep(delay)
+
+    @classmethod
+    def resolve(cls, retries=10, retry_policy=None):
+        """Return the given retry policy or build the default policy.
+
+        Args:
+            retries (int): The maximum number of attempts for the default
+                policy.
+            retry_policy (RetryPolicy): An explicit retry policy which takes
+                precedence over 'retries'.
+
+        Returns:
+            RetryPolicy: The retry policy to use.
+        """
+
+        return retry_policy or cls(retries=retries)
+
+
+PhaseSpan = namedtuple('PhaseSpan', ('nodeid', 'phase', 'start', 'duration'))
+PhaseSpan.__doc__ = """A single timed phase of a fixture or helper.
+
+Attributes:
+    nodeid (str): The node ID of the test which was running when the phase
+        started. (None outside of a test)
+    phase (str): The phase name. Nested phases are joined with '/'.
+        (e.g. 'create_server/expect_os_properties.server')
+    start (float): When the phase started. (seconds since the epoch)
+    duration (float): Seconds spent in the phase.
+"""
+
+PhaseStats = namedtuple('PhaseStats', ('phase',
+                                       'count',
+                                       'total',
+                                       'mean',
+                                       'p50',
+                                       'p90',
+                                       'p99',
+                                       'max'))
+PhaseStats.__doc__ = """Aggregated durations of every span of a phase.
+
+Attributes:
+    phase (str): The phase name.
+    count (int): The number of spans recorded for the phase.
+    total (float): Seconds spent in the phase across all spans.
+    mean (float): The mean span duration in seconds.
+    p50 (float): The median span duration in seconds.
+    p90 (float): The 90th percentile span duration in seconds.
+    p99 (float): The 99th percentile span duration in seconds.
+    max (float): The longest span duration in seconds.
+"""
+
+
+class PhaseTimer(object):
+    """Records how long the phases of fixtures and helpers take and which test
+    was running at the time.
+
+    Recording is disabled by default so that an untimed session only pays for
+    an attribute check per phase. A phase opened while another phase is open
+    on the same thread is recorded under the '/' joined names of both.
+
+    The node ID is kept per thread so that phases timed by background
+    threads (e.g. a 'ServerPool' filling itself) are recorded as session
+    phases rather than charged to whichever test happens to be running.
+    Work submitted to a thread pool on behalf of a test should be wrapped
+    with 'bind' to keep the test's node ID.
+
+    Example:
+        >>> timer = PhaseTimer(enabled=True)
+        >>> with timer.span('create_server'):
+        >>>     with timer.span('boot'):
+        >>>         pass
+        >>> timer.summary()['create_server/boot'].count
+        1
+    """
+
+    def __init__(self, enabled=False):
+        """Create a phase timer.
+
+        Args:
+            enabled (bool): Flag for recording spans.
+        """
+
+        self.enabled = enabled
+        self._spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def nodeid(self):
+        """str: The node ID of the test running on the current thread. (None
+        outside of a test)"""
+
+        return getattr(self._local, 'nodeid', None)
+
+    @nodeid.setter
+    def nodeid(self, nodeid):
+        self._local.nodeid = nodeid
+
+    @property
+    def spans(self):
+        """list of PhaseSpan: Every recorded span in the order they ended."""
+
+        with self._lock:
+            return list(self._spans)
+
+    @contextmanager
+    def span(self, phase):
+        """Time the enclosed block as a phase. The span is recorded even if
+        the block raises.
+
+        Args:
+            phase (str): The phase name.
+        """
+
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._local.__dict__.setdefault('stack', [])
+        stack.append(phase)
+        nodeid = self.nodeid
+        start = time()
+
+        try:
+            yield
+        finally:
+            duration = time() - start
+            path = '/'.join(stack)
+            stack.pop()
+            self.record(path, start, duration, nodeid)
+
+    def bind(self, func):
+        """Wrap a function so that the phases it times on another thread are
+        attributed to the test running on the calling thread.
+
+        Example:
+            >>> results = pool.map(phase_timer.bind(_submit), range(count))
+
+        Args:
+            func (callable): The function to run on another thread.
+
+        Returns:
+            callable: The wrapped function.
+        """
+
+        nodeid = self.nodeid
+
+        @wraps(func)
+        def _bound(*args, **kwargs):
+            previous = self.nodeid
+            self.nodeid = nodeid
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.nodeid = previous
+
+        return _bound
+
+    def record(self, phase, start, duration, nodeid=None):
+        """Record a span which was timed elsewhere.
+
+        Args:
+            phase (str): The phase name.
+            start (float): When the phase started. (seconds since the epoch)
+            duration (float): Seconds spent in the phase.
+            nodeid (str): The node ID of the test the span belongs to.
+        """
+
+        with self._lock:
+            self._spans.append(PhaseSpan(nodeid, phase, start, duration))
+
+    def reset(self):
+        """Discard every recorded span."""
+
+        with self._lock:
+            del self._spans[:]
+
+    def summary(self):
+        """Aggregate the recorded spans per phase.
+
+        Returns:
+            OrderedDict: Statistics keyed by phase with the most total time
+                first. ({str: PhaseStats})
+        """
+
+        durations = {}
+
+        for span in self.spans:
+            durations.setdefault(span.phase, []).append(span.duration)
+
+        stats = []
+
+        for phase, values in durations.items():
+            values.sort()
+            total = sum(values)
+            stats.append(PhaseStats(phase=phase,
+                                    count=len(values),
+                                    total=total,
+                                    mean=total / len(values),
+                                    p50=_percentile(values, 50),
+                                    p90=_percentile(values, 90),
+                                    p99=_percentile(values, 99),
+                                    max=values[-1]))
+
+        stats.sort(key=lambda s: s.total, reverse=True)
+
+        return OrderedDict((s.phase, s) for s in stats)
+
+    def slowest(self, count=10):
+        """Find the longest individual spans.
+
+        Args:
+            count (int): The maximum number of spans to return.
+
+        Returns:
+            list of PhaseSpan: The longest spans, longest first.
+        """
+
+        spans = sorted(self.spans, key=lambda s: s.duration, reverse=True)
+
+        return spans[:count]
+
+    def save(self, path):
+        """Save the per phase statistics and every span to a JSON file so that
+        runs can be compared.
+
+        Args:
+            path (str): The JSON file to write.
+        """
+
+        data = OrderedDict([
+            ('phases', [s._asdict() for s in self.summary().values()]),
+            ('spans', [s._asdict() for s in self.spans])
+        ])
+
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+# The recorder used by the fixtures and helpers of this plugin.
+phase_timer = PhaseTimer()
+
+
+OsObjectDeleteResult = namedtuple('OsObjectDeleteResult',
+                                  ('id', 'found', 'deleted', 'error'))
+OsObjectDeleteResult.__doc__ = """The outcome of deleting a single OpenStack
+object.
+
+Attributes:
+    id (str): The OpenStack object ID.
+    found (bool): Whether the object existed when the delete was requested.
+    deleted (bool): Whether the object disappeared before the wait timed out.
+        (None if the deletion was not waited on)
+    error (Exception): The error raised by the delete request. (None if the
+        request succeeded)
+"""
+
+
+SshCommandResult = namedtuple('SshCommandResult', ('command',
+                                                   'exit_status',
+                                                   'stdout',
+                                                   'stderr',
+                                                   'elapsed',
+                                                   'truncated',
+                                                   'timed_out'))
+SshCommandResult.__doc__ = """The outcome of a command executed over SSH.
+
+Attributes:
+    command (str): The command which was executed.
+    exit_status (int): The exit status of the command. (-1 if the command did
+        not finish or the channel could not be opened)
+    stdout (str): The standard output of the command.
+    stderr (str): The standard error of the command.
+    elapsed (float): Seconds from opening the channel until the command
+        finished.
+    truncated (bool): Whether any output beyond 'max_output' was discarded.
+    timed_out (bool): Whether the command was abandoned after the timeout.
+"""
+
+
+OsServiceVersion = namedtuple('OsServiceVersion', ('service',
+                                                   'service_type',
+                                                   'api_version',
+                                                   'min_microversion',
+                                                   'max_microversion',
+                                                   'url',
+                                                   'error'))
+OsServiceVersion.__doc__ = """The API version of an OpenStack service as
+discovered from its version document.
+
+Attributes:
+    service (str): The service name. (e.g. 'cinder')
+    service_type (str): The service type. (e.g. 'block-storage')
+    api_version (tuple of int): The API version. (e.g. (3, 0), None if
+        discovery failed)
+    min_microversion (tuple of int): The minimum supported microversion.
+        (None if the service does not support microversions)
+    max_microversion (tuple of int): The maximum supported microversion.
+        (None if the service does not support microversions)
+    url (str): The versioned endpoint URL.
+    error (Exception): The error raised by discovery or None if successful.
+"""
+
+
+PingResult = namedtuple('PingResult', ('host',
+                                       'reachable',
+                                       'sent',
+                                       'received',
+                                       'loss',
+                                       'rtt_min',
+                                       'rtt_avg',
+                                       'rtt_max',
+                                       'attempts',
+                                       'method',
+                                       'output'))
+PingResult.__doc__ = """The outcome of pinging a single host.
+
+Packet and round trip statistics are those of the last attempt, which is the
+successful attempt for a reachable host.
+
+Attributes:
+    host (str): The hostname or IP address which was pinged.
+    reachable (bool): Whether the host answered.
+    sent (int): Packets sent by the last attempt.
+    received (int): Packets received by the last attempt.
+    loss (float): Packet loss of the last attempt as a percentage.
+    rtt_min (float): Minimum round trip time in milliseconds. (None if no
+        packets were received)
+    rtt_avg (float): Average round trip time in milliseconds. (None if no
+        packets were received)
+    rtt_max (float): Maximum round trip time in milliseconds. (None if no
+        packets were received)
+    attempts (int): The number of attempts made for the host.
+    method (str): How the host was probed. ('icmp', 'tcp' or 'subprocess')
+    output (str): The captured output of the last attempt.
+"""
+
+
+ContainerCommandResult = namedtuple('ContainerCommandResult', ('command',
+                                                               'rc',
+                                                               'stdout',
+                                                               'stderr'))
+ContainerCommandResult.__doc__ = """The outcome of a single command from a
+batch executed on a container.
+
+Attributes:
+    command (str): The command which was executed.
+    rc (int): The exit status of the command. (None if the batch ended before
+        the command finished)
+    stdout (str): The standard output of the command.
+    stderr (str): The standard error of the command.
+"""
+
+
+ContainerInfo = namedtuple('ContainerInfo', ('name', 'state'))
+ContainerInfo.__doc__ = """An LXC container on a host.
+
+Attributes:
+    name (str): The container name.
+    state (str): The container state. (e.g. 'RUNNING', None if unknown)
+"""
+
+
+class ContainerInventory(object):
+    """A cache of the LXC containers on a host which maps container types to
+    concrete container names.
+
+    The inventory is filled by a single 'lxc-ls' call on first use and can be
+    invalidated when it goes stale. (e.g. a container was rebuilt)
+
+    Container types are resolved deterministically. Names following the
+    OpenStack-Ansible convention '<host>_<type>_container-<id>' are preferred
+    over plain substring matches, running containers are preferred over
+    stopped ones and ties are broken by name. For example, 'nova_api' does
+    not resolve to 'infra1_nova_api_metadata_container-1a2b3c4d' while
+    'infra1_nova_api_container-5e6f7a8b' exists.
+
+    Example:
+        >>> inventory = get_container_inventory(host)
+        >>> inventory.resolve('utility')
+        'infra1_utility_container-9c5b8a2d'
+    """
+
+    def __init__(self, run_on_host):
+        """Create a container inventory.
+
+        Args:
+            run_on_host (testinfra.Host): Testinfra host object to list the
+                containers on.
+        """
+
+        self.run_on_host = run_on_host
+        self._containers = None
+        self._lock = threading.Lock()
+
+    @property
+    def containers(self):
+        """list of ContainerInfo: Every container on the host."""
+
+        with self._lock:
+            if self._containers is None:
+                self._containers = self._list_containers()
+
+            return list(self._containers)
+
+    def invalidate(self):
+        """Discard the cached inventory so that the next lookup lists the
+        containers again."""
+
+        with self._lock:
+            self._containers = None
+
+    def resolve(self, container_type):
+        """Resolve a container type to a single container name.
+
+        Args:
+            container_type (str): The container type. (e.g. 'utility')
+
+        Returns:
+            str: The best matching container name or None if no container
+                matches.
+        """
+
+        names = self.resolve_all(container_type)
+
+        return names[0] if names else None
+
+    def resolve_all(self, container_type):
+        """Resolve a container type to every matching container name.
+
+        Args:
+            container_type (str): The container type. (e.g. 'galera')
+
+        Returns:
+            list of str: Matching container names, best match first.
+        """
+
+        exact_regex = re.compile(r'(?:^|_){}_container(?:-|$)'.format(
+            re.escape(container_type)
+        ))
+        matches = []
+
+        for container in self.containers:
+            if exact_regex.search(container.name):
+                tier = 0
+            elif container_type in container.name:
+                tier = 1
+            else:
+                continue
+
+            running = container.state in (None, 'RUNNING')
+            matches.append((tier, not running, container.name))
+
+        return [name for _, _, name in sorted(matches)]
+
+    def _list_containers(self):
+        """List the containers on the host.
+
+        Returns:
+            list of ContainerInfo: Every container on the host.
+        """
+
+        result = self.run_on_host.run('lxc-ls --fancy '
+                                      '--fancy-format name,state')
+
+        if result.rc == 0:
+            containers = []
+            for line in result.stdout.splitlines()[1:]:   # Skip the header.
+                fields = line.split()
+                if len(fields) >= 2:
+                    containers.append(ContainerInfo(fields[0], fields[1]))
+            return containers
+
+        # Fall back for versions of LXC without fancy output.
+        result = self.run_on_host.run('lxc-ls -1')
+
+        return [ContainerInfo(name, None) for name in result.stdout.split()]
+
+
+class ContainerShell(object):
+    """A long-lived bash session attached to a container which runs commands
+    without paying for 'lxc-attach', bash startup and environment setup on
+    every command.
+
+    The session is opened over the backend of the testinfra host. Local hosts
+    use a subprocess, paramiko hosts use a channel on the existing SSH
+    transport and ssh hosts use an 'ssh' subprocess built by the backend
+    (sharing its control master). Other backends, such as ansible, cannot
+    stream a session and fall back to one attach per command.
+
+    Every command runs in a subshell of the session so that it sees the
+    environment prepared by 'setup' but cannot change or exit the session.
+    Output is framed by per-session sentinels on stdout and stderr. The
+    session is restarted on the next command if its process dies.
+
+    Example:
+        >>> shell = ContainerShell(host, 'infra1_swift_proxy_container-1a2b',
+        ...                        setup=swift_env_setup)
+        >>> shell.run('swift-recon -r').rc
+        0
+        >>> shell.close()
+    """
+
+    def __init__(self,
+                 run_on_host,
+                 container_name,
+                 setup=None,
+                 timeout=60,
+                 persistent=None):
+        """Create a container shell. The session is opened on first use.
+
+        Args:
+            run_on_host (testinfra.Host): Testinfra host object to attach to
+                the container from.
+            container_name (str): The exact name of the container.
+            setup (str): Command to run once when the session starts. (e.g.
+                sourcing '~/openrc')
+            timeout (int): Default seconds to wait for a command to finish.
+            persistent (bool): True to require a persistent session, False to
+                always attach per command. (None uses a persistent session
+                when the backend supports one and warns once per backend
+                otherwise)
+
+        Raises:
+            RuntimeError: A persistent session is required but the backend
+                does not support one.
+        """
+
+        backend_name = getattr(run_on_host.backend, 'NAME', None)
+        supported = _ShellSession.supports(run_on_host.backend)
+
+        if persistent and not supported:
+            raise RuntimeError("The '{}' testinfra backend does not support a "
+                               "persistent container shell!"
+                               "".format(backend_name))
+        elif persistent is None and not supported:
+            with _container_shell_warnings_lock:
+                first = backend_name not in _container_shell_warnings
+                _container_shell_warnings.add(backend_name)
+            if first:
+                warn(UserWarning("The '{}' testinfra backend does not support "
+                                 "a persistent container shell; commands "
+                                 "will attach to the container one at a "
+                                 "time.".format(backend_name)))
+
+        self.run_on_host = run_on_host
+        self.container_name = container_name
+        self.setup = setup
+        self.timeout = timeout
+        self._persistent = supported if persistent is None else persistent
+        self._delimiter = 'pytest-rpc-{}'.format(uuid.uuid4().hex)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._session = None
+
+    @property
+    def persistent(self):
+        """bool: Whether commands run in a persistent session."""
+
+        return self._persistent
+
+    def run(self, command, timeout=None):
+        """Run a command in the session.
+
+        Args:
+            command (str): The bash command to run.
+            timeout (int): Seconds to wait for the command to finish.
+                (defaults to the timeout of the shell)
+
+        Returns:
+            ContainerCommandResult: The result of the command. The exit status
+                is None if the command timed out or the session died, in
+                which case the session is restarted on the next command.
+        """
+
+        if not self.persistent:
+            return run_on_container_batch([command],
+                                          None,
+                                          self.run_on_host,
+                                          setup=self.setup,
+                                          container_name=self.container_name)[0]
+
+        with self._lock:
+            if self._session is None or not self._session.alive:
+                self._restart()
+
+            index = next(self._counter)
+            encoded = base64.b64encode(_text(command).encode('utf-8'))
+            self._session.write(
+                "echo '{0} start {1}' ; echo '{0} start {1}' >&2\n"
+                "( eval \"$(echo {2} | base64 -d)\" ) < /dev/null\n"
+                "printf '\\n{0} end {1} %d\\n' $? ; "
+                "printf '\\n{0} end {1}\\n' >&2\n".format(
+                    self._delimiter, index, encoded.decode('ascii')
+                )
+            )
+
+            deadline = time() + (timeout or self.timeout)
+            stdout, rc = self._read(self._session.stdout, index, deadline)
+            stderr, _ = self._read(self._session.stderr, index, deadline)
+
+            if rc is None:
+                self._close_session()
+
+            return ContainerCommandResult(command, rc, stdout, stderr)
+
+    def close(self):
+        """Close the session."""
+
+        with self._lock:
+            self._close_session()
+
+    def _restart(self):
+        """Open a new session, closing the previous one if any."""
+
+        self._close_session()
+
+        attach = 'lxc-attach -n {} -- bash --noprofile --norc'.format(
+            self.container_name
+        )
+        self._session = _ShellSession(self.run_on_host.backend, attach)
+
+        if self.setup:
+            self._session.write('{} > /dev/null 2>&1\n'.format(self.setup))
+
+    def _close_session(self):
+        """Close the current session if any."""
+
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _read(self, lines, index, deadline):
+        """Read the framed output of a command from a stream.
+
+        Args:
+            lines (Queue): Lines of the stream. (None once the stream closes)
+            index (int): The index of the command.
+            deadline (float): Epoch time to give up at.
+
+        Returns:
+            tuple of (str, int): The output of the command and the exit status
+                from the end sentinel. (None if the sentinel was not seen)
+        """
+
+        start = '{} start {}\n'.format(self._delimiter, index)
+        end = '{} end {}'.format(self._delimiter, index)
+        output = []
+        started = False
+
+        while True:
+            try:
+                line = lines.get(timeout=max(0, deadline - time()))
+            except Empty:
+                line = None
+
+            if line is None:
+                return ''.join(output), None
+            elif not started:
+                started = line == start
+            elif line.startswith(end):
+                rc = line[len(end):].strip()
+                # Drop the newline which precedes the end sentinel.
+                return ''.join(output)[:-1], int(rc) if rc else None
+            else:
+                output.append(line)
+
+
+class _ShellSession(object):
+    """A bash process started through a testinfra backend with its output
+    streams read into queues by background threads."""
+
+    def __init__(self, backend, command):
+        """Start the process.
+
+        Args:
+            backend (testinfra.backend.base.BaseBackend): A local, paramiko or
+                ssh testinfra backend.
+            command (str): The command to start.
+        """
+
+        command = backend.get_command(command)
+        self.stdout = Queue()
+        self.stderr = Queue()
+
+        if backend.NAME in ('ssh', 'safe-ssh'):
+            # Wrap the command exactly as the backend does for 'run'.
+            ssh_command, ssh_args = backend._build_ssh_command(command)
+            command = backend.quote(' '.join(ssh_command), *ssh_args)
+
+        if backend.NAME == 'paramiko':
+            self._channel = backend.client.get_transport().open_session()
+            self._channel.exec_command(command)
+            self._process = None
+            self._stdin = self._channel.makefile('wb')
+            streams = (self._channel.makefile('rb'),
+                       self._channel.makefile_stderr('rb'))
+        else:
+            self._channel = None
+            self._process = Popen(command,
+                                  shell=True,
+                                  stdin=PIPE,
+                                  stdout=PIPE,
+                                  stderr=PIPE)
+            self._stdin = self._process.stdin
+            streams = (self._process.stdout, self._process.stderr)
+
+        for stream, lines in zip(streams, (self.stdout, self.stderr)):
+            reader = threading.Thread(target=self._pump, args=(stream, lines))
+            reader.daemon = True
+            reader.start()
+
+    @staticmethod
+    def supports(backend):
+        """Check whether a session can be started through a backend.
+
+        Args:
+            backend (testinfra.backend.base.BaseBackend): A testinfra backend.
+
+        Returns:
+            bool: Whether the backend can stream a session.
+        """
+
+        name = getattr(backend, 'NAME', None)
+
+        if name in ('ssh', 'safe-ssh'):
+            return hasattr(backend, '_build_ssh_command')
+
+        return name in ('local', 'paramiko')
+
+    @property
+    def alive(self):
+        """bool: Whether the process is still running."""
+
+        if self._process is not None:
+            return self._process.poll() is None
+
+        return not self._channel.exit_status_ready()
+
+    def write(self, data):
+        """Write to the standard input of the process.
+
+        Args:
+            data (str): The data to write.
+        """
+
+        try:
+            self._stdin.write(data.encode('utf-8'))
+            self._stdin.flush()
+        except (IOError, OSError, socket.error):
+            pass    # The process died; reading reports it.
+
+    def close(self):
+        """Stop the process."""
+
+        try:
+            self._stdin.close()
+        except (IOError, OSError, socket.error):
+            pass
+
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+        else:
+            self._channel.close()
+
+    @staticmethod
+    def _pump(stream, lines):
+        """Copy the lines of a stream into a queue until the stream closes.
+
+        Args:
+            stream (file): The stream to read.
+            lines (Queue): The queue to put decoded lines on.
+        """
+
+        try:
+            for line in iter(stream.readline, b''):
+                if not line:
+                    break
+                lines.put(line.decode('utf-8', 'replace'))
+        except (IOError, OSError, ValueError, socket.error):
+            pass
+        finally:
+            lines.put(None)
+
+
+class HostFacts(object):
+    """A cache of facts about testinfra hosts which are expensive to probe.
+    (e.g. the cinder major version)
+
+    Facts are probed lazily on first access. Concurrent callers asking for the
+    same fact of the same host wait for a single probe. Facts which are plain
+    data can be saved to a JSON file and loaded again by a later run against
+    the same deployment. The file records a fingerprint of the deployment and
+    is ignored when loaded with a different fingerprint.
+
+    The container inventory keeps its own cache (see
+    'get_container_inventory'), so it is looked up there on every access
+    rather than copied into this cache.
+
+    Example:
+        >>> facts = HostFacts('/tmp/host_facts.json', fingerprint='1a2b3c')
+        >>> facts.get(host, 'cinder_major_version')
+        3
+        >>> facts.save()
+    """
+
+    # Facts which are plain data and can be saved between runs.
+    persistent = ('cinder_major_version', 'openstack_release')
+
+    # Facts which are cached by their probe and not by this cache.
+    self_cached = ('container_inventory',)
+
+    # Values returned by probes which failed. They are returned to the caller
+    # but never cached or saved, so the fact is probed again next time.
+    failed_values = (None, -1)
+
+    def __init__(self, path=None, probes=None, fingerprint=None):
+        """Create a host facts cache.
+
+        Args:
+            path (str): JSON file to load facts from and save facts to. (no
+                persistence if None)
+            probes (dict): Functions taking a testinfra host which probe
+                each fact, keyed by fact name. (defaults to the built-in
+                facts)
+            fingerprint (str): Identifies the deployment the facts belong to.
+                Saved facts with a different fingerprint are discarded.
+        """
+
+        self.path = path
+        self.fingerprint = fingerprint
+        self.probes = probes or {
+            'cinder_major_version': get_cinder_major_version,
+            'openstack_release': get_openstack_release,
+            'container_inventory': get_container_inventory
+        }
+        self._facts = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+        if path is not None:
+            self._load()
+
+    def get(self, run_on_host, fact):
+        """Retrieve a fact about a host, probing it on first access.
+
+        Args:
+            run_on_host (testinfra.Host): Testinfra host object to probe.
+            fact (str): The name of the fact. (e.g. 'openstack_release')
+
+        Returns:
+            object: The value of the fact. (a failed probe's value is not
+                cached, see 'failed_values')
+
+        Raises:
+            RuntimeError: The fact is unknown.
+        """
+
+        if fact not in self.probes:
+            raise RuntimeError("Unknown host fact '{}'!".format(fact))
+        elif fact in self.self_cached:
+            return self.probes[fact](run_on_host)
+
+        host_id = run_on_host.backend.get_pytest_id()
+
+        with self._lock:
+            facts = self._facts.setdefault(host_id, {})
+            if fact in facts:
+                return facts[fact]
+            lock = self._locks.setdefault((host_id, fact), threading.Lock())
+
+        with lock:
+            with self._lock:
+                if fact in facts:   # Probed by a concurrent caller.
+                    return facts[fact]
+
+            value = self.probes[fact](run_on_host)
+
+            if value not in self.failed_values:
+                with self._lock:
+                    facts[fact] = value
+
+        return value
+
+    def invalidate(self, run_on_host=None, fact=None):
+        """Discard cached facts so that they are probed again.
+
+        Args:
+            run_on_host (testinfra.Host): The host to discard facts of. (all
+                hosts if None)
+            fact (str): The fact to discard. (all facts if None)
+        """
+
+        if fact is None or fact == 'container_inventory':
+            invalidate_container_inventory(run_on_host)
+
+        with self._lock:
+            if run_on_host is None:
+                hosts = list(self._facts.values())
+            else:
+                hosts = [self._facts.get(run_on_host.backend.get_pytest_id(),
+                                         {})]
+
+            for facts in hosts:
+                for name in list(facts):
+                    if fact is None or name == fact:
+                        del facts[name]
+
+    def save(self):
+        """Save the persistent facts and the deployment fingerprint to the
+        JSON file, if any."""
+
+        if self.path is None:
+            return
+
+        with self._lock:
+            hosts = {host_id: {k: v for k, v in facts.items()
+                               if k in self.persistent and
+                               v not in self.failed_values}
+                     for host_id, facts in self._facts.items()}
+
+        with open(self.path, 'w') as f:
+            json.dump({'fingerprint': self.fingerprint, 'hosts': hosts},
+                      f,
+                      indent=2,
+                      sort_keys=True)
+
+    def _load(self):
+        """Load saved facts from the JSON file unless they belong to another
+        deployment."""
+
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return  # Start with an empty cache.
+
+        if not isinstance(data, dict) or 'hosts' not in data:
+            warn(UserWarning("Ignoring host facts file '{}' with an unknown "
+                             "format.".format(self.path)))
+        elif data.get('fingerprint') != self.fingerprint:
+            warn(UserWarning("Ignoring host facts file '{}' which was saved "
+                             "for a different deployment.".format(self.path)))
+        else:
+            self._facts = data['hosts']
+
+
+class OsConnectionManager(object):
+    """Hand out OpenStack API connections that share a single keystone token.
+
+    The first connection authenticates against keystone and its auth plugin is
+    shared with every connection created afterwards, so the token is reused
+    until it nears expiry. The expiry is checked whenever a connection is
+    handed out and by 'refresh_if_expiring'. 'get' returns the primary
+    connection for the test thread. Worker threads borrow a connection with
+    'checkout' so that concurrent API requests do not share an HTTP session.
+    Returned connections are reused by later workers, so at most 'max_size'
+    worker connections are ever created no matter how many short-lived
+    threads ask for one.
+
+    Example:
+        >>> manager = OsConnectionManager(
+        >>>     lambda: openstack.connect(cloud='default')
+        >>> )
+        >>> os_api_conn = manager.get()
+        >>> with manager.checkout() as worker_conn:
+        >>>     worker_conn.list_servers()
+    """
+
+    def __init__(self, connect, expiry_margin=300, max_size=10):
+        """Create a connection manager.
+
+        Args:
+            connect (def): A function which returns a new, unauthenticated
+                'openstack.connection.Connection'.
+            expiry_margin (int): Seconds before token expiry at which the
+                shared token is discarded and re-authenticated.
+            max_size (int): The maximum number of connections checked out at
+                once. Further checkouts wait for a connection to be returned.
+        """
+
+        self.expiry_margin = expiry_margin
+        self.max_size = max_size
+        self._connect = connect
+        self._auth = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, max_size))
+        self._primary = None
+        self._idle = []
+        self._connections = []
+
+    def connect(self):
+        """Create a new connection which shares the keystone token.
+
+        Returns:
+            openstack.connection.Connection: https://bit.ly/2LqgiiT
+        """
+
+        os_api_conn = self._connect()
+
+        with self._lock:
+            if self._auth is None:
+                self._auth = os_api_conn.session.auth
+            else:
+                os_api_conn.session.auth = self._auth
+            self._connections.append(os_api_conn)
+
+        return os_api_conn
+
+    def get(self):
+        """Return the primary connection, creating it if needed. Worker
+        threads should use 'checkout' instead.
+
+        Returns:
+            openstack.connection.Connection: https://bit.ly/2LqgiiT
+        """
+
+        with self._lock:
+            os_api_conn = self._primary
+
+        if os_api_conn is None:
+            os_api_conn = self.connect()
+            with self._lock:
+                if self._primary is None:
+                    self._primary = os_api_conn
+                else:   # Created concurrently; keep the first for reuse.
+                    self._idle.append(os_api_conn)
+                    os_api_conn = self._primary
+
+        self.refresh_if_expiring()
+
+        return os_api_conn
+
+    @contextmanager
+    def checkout(self):
+        """Borrow a connection for the enclosed block. The connection is
+        returned to the manager for reuse when the block exits. Blocks while
+        'max_size' connections are checked out.
+
+        Yields:
+            openstack.connection.Connection: https://bit.ly/2LqgiiT
+        """
+
+        self._slots.acquire()
+        os_api_conn = None
+
+        try:
+            with self._lock:
+                if self._idle:
+                    os_api_conn = self._idle.pop()
+
+            if os_api_conn is None:
+                os_api_conn = self.connect()
+
+            self.refresh_if_expiring()
+
+            yield os_api_conn
+        finally:
+            if os_api_conn is not None:
+                with self._lock:
+                    self._idle.append(os_api_conn)
+            self._slots.release()
+
+    def close(self):
+        """Close every connection created by the manager."""
+
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._primary = None
+            self._idle = []
+
+        for os_api_conn in connections:
+            close = getattr(os_api_conn, 'close', None)
+            if close is not None:
+                close()
+
+    def refresh_if_expiring(self):
+        """Discard the shared token if it expires within the expiry margin so
+        that the next API request re-authenticates."""
+
+        auth_ref = getattr(self._auth, 'auth_ref', None)
+
+        if auth_ref is not None and \
+                auth_ref.will_expire_soon(self.expiry_margin):
+            self._auth.invalidate()
+
+
+class OsResourceResolver(object):
+    """A cache which resolves names and IDs of flavors, images, networks,
+    subnets and security groups to their OpenStack objects.
+
+    Each resource type is prefetched and indexed by name and ID with a single
+    'list' API call on first use. A name or ID which is not in the index
+    triggers one refresh of that type. Tests which create or delete these
+    resources should invalidate the affected type.
+
+    Example:
+        >>> resolver = OsResourceResolver(os_api_conn)
+        >>> flavor = resolver.resolve('flavor', 'm1.tiny')
+        >>> resolver.invalidate('network')
+    """
+
+    # The resource types which can be resolved.
+    resource_types = ('flavor', 'image', 'network', 'subnet', 'security_group')
+
+    def __init__(self, os_api_conn):
+        """Create a resolver.
+
+        Args:
+            os_api_conn (openstack.connection.Connection): An authorized API
+                connection to the 'default' cloud on the OpenStack
+                infrastructure.
+        """
+
+        self.os_api_conn = os_api_conn
+        self._indexes = {}
+        self._locks = dict((t, threading.Lock()) for t in self.resource_types)
+
+    def resolve(self, resource_type, name_or_id):
+        """Resolve a name or ID to an OpenStack object.
+
+        Args:
+            resource_type (str): The resource type. (e.g. 'flavor')
+            name_or_id (str): The name or ID of the resource. Objects are
+                returned unchanged.
+
+        Returns:
+            munch.Munch: The resolved object. The name or ID is returned
+                unchanged if it is unknown or the name is ambiguous so that
+                the API reports the problem as usual.
+
+        Raises:
+            RuntimeError: Invalid resource type specified.
+        """
+
+        if resource_type not in self.resource_types:
+            raise RuntimeError("Invalid '{}' resource type "
+                               "specified!".format(resource_type))
+
+        if not isinstance(name_or_id, (str, type(u''))):
+            return name_or_id
+
+        by_id, by_name = self._index(resource_type)
+
+        if name_or_id not in by_id and name_or_id not in by_name:
+            # The resource may have been created since the index was built.
+            by_id, by_name = self._index(resource_type, refresh=True)
+
+        if name_or_id in by_id:
+            return by_id[name_or_id]
+
+        matches = by_name.get(name_or_id, [])
+
+        return matches[0] if len(matches) == 1 else name_or_id
+
+    def resolve_all(self, resource_type, names_or_ids):
+        """Resolve several names or IDs to OpenStack objects.
+
+        Args:
+            resource_type (str): The resource type. (e.g. 'security_group')
+            names_or_ids (list of str): The names or IDs of the resources.
+
+        Returns:
+            list: The resolved objects in the order given.
+        """
+
+        return [self.resolve(resource_type, n) for n in names_or_ids]
+
+    def invalidate(self, resource_type=None):
+        """Discard the index of a resource type so that it is listed again.
+
+        Args:
+            resource_type (str): The resource type to discard. (all types if
+                None)
+        """
+
+        for t in [resource_type] if resource_type else self.resource_types:
+            with self._locks[t]:
+                self._indexes.pop(t, None)
+
+    def _index(self, resource_type, refresh=False):
+        """Retrieve the index of a resource type, listing it if necessary.
+
+        Args:
+            resource_type (str): The resource type.
+            refresh (bool): Flag for listing the resource type again.
+
+        Returns:
+            tuple of (dict, dict): Objects keyed by ID and lists of objects
+                keyed by name.
+        """
+
+        with self._locks[resource_type]:
+            if refresh or resource_type not in self._indexes:
+                list_method = getattr(self.os_api_conn,
+                                      'list_{}s'.format(resource_type))
+                by_id = {}
+                by_name = {}
+
+                for os_object in list_method():
+                    by_id[os_object['id']] = os_object
+                    by_name.setdefault(os_object.get('name'),
+                                       []).append(os_object)
+
+                self._indexes[resource_type] = (by_id, by_name)
+
+            return self._indexes[resource_type]
+
+
+class ServerPool(object):
+    """A pool of warm OpenStack servers which tests lease and return.
+
+    Servers are created in the background until the pool holds 'size' servers.
+    A returned server is reset in the background before it can be leased
+    again. Servers which fail to reset are discarded and replaced.
+
+    Example:
+        >>> pool = ServerPool(create=lambda: create_server(...),
+        >>>                   reset=lambda server: reboot(server),
+        >>>                   discard=lambda server: delete(server),
+        >>>                   size=2)
+        >>> pool.start()
+        >>> server = pool.lease()
+        >>> pool.release(server)
+        >>> remaining = pool.close()
+    """
+
+    def __init__(self, create, reset, discard, size):
+        """Create a server pool.
+
+        Args:
+            create (def): A function which returns a new, running server.
+            reset (def): A function which accepts a server and restores it to a
+                clean state. Returns whether the server is healthy.
+            discard (def): A function which accepts a server that can no longer
+                be used and deletes it.
+            size (int): The number of servers to keep in the pool.
+        """
+
+        self.size = size
+        self._create = create
+        self._reset = reset
+        self._discard = discard
+        self._idle = []
+        self._servers = OrderedDict()   # Every server owned by the pool.
+        self._pending = 0   # Creations and resets in progress.
+        self._errors = []
+        self._closed = False
+        self._cond = threading.Condition()
+        self._workers = ThreadPool(max(1, size))
+
+    def start(self):
+        """Begin filling the pool in the background."""
+
+        with self._cond:
+            deficit = self.size - len(self._servers) - self._pending
+            self._pending += max(0, deficit)
+
+        for _ in range(deficit):
+            self._workers.apply_async(self._fill)
+
+    def lease(self, timeout=None):
+        """Take a warm server from the pool, waiting for one if necessary.
+
+        Args:
+            timeout (float): Seconds to wait for a server. (None for no limit)
+
+        Returns:
+            openstack.compute.v2.server.Server: A running server.
+
+        Raises:
+            RuntimeError: The pool is closed, no server can be produced or the
+                timeout expired.
+        """
+
+        deadline = None if timeout is None else time() + timeout
+
+        with self._cond:
+            while not self._idle:
+                if self._closed:
+                    raise RuntimeError("The server pool is closed!")
+                if not self._pending:
+                    raise RuntimeError("The server pool has no servers! "
+                                       "Errors: {}".format(self._errors))
+
+                remaining = None if deadline is None else deadline - time()
+                if remaining is not None and remaining <= 0:
+                    raise RuntimeError("Timed out waiting for a server from "
+                                       "the pool!")
+                self._cond.wait(remaining)
+
+            return self._idle.pop(0)
+
+    def release(self, server):
+        """Return a leased server to the pool. The server is reset in the
+        background before it can be leased again.
+
+        Args:
+            server (openstack.compute.v2.server.Server): A leased server.
+        """
+
+        with self._cond:
+            self._pending += 1
+
+        self._workers.apply_async(self._recycle, (server,))
+
+    def close(self):
+        """Stop the pool and wait for background work to finish.
+
+        Returns:
+            list of openstack.compute.v2.server.Server: Every server still
+                owned by the pool which the caller must delete.
+        """
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        self._workers.close()
+        self._workers.join()
+
+        with self._cond:
+            servers = list(self._servers.values())
+            self._servers.clear()
+            del self._idle[:]
+
+        return servers
+
+    @property
+    def errors(self):
+        """list of Exception: Errors raised while creating or resetting."""
+
+        with self._cond:
+            return list(self._errors)
+
+    def _fill(self):
+        """Create a server and add it to the idle servers."""
+
+        with self._cond:
+            if self._closed:
+                self._pending -= 1
+                self._cond.notify_all()
+                return
+
+        try:
+            server = self._create()
+        except Exception as e:
+            with self._cond:
+                self._errors.append(e)
+                self._pending -= 1
+                self._cond.notify_all()
+            return
+
+        with self._cond:
+            self._servers[server.id] = server
+            self._idle.append(server)
+            self._pending -= 1
+            self._cond.notify_all()
+
+    def _recycle(self, server):
+        """Reset a returned server or replace it if the reset fails."""
+
+        try:
+            healthy = self._reset(server)
+        except Exception as e:
+            healthy = False
+            with self._cond:
+                self._errors.append(e)
+
+        if healthy:
+            with self._cond:
+                self._idle.append(server)
+                self._pending -= 1
+                self._cond.notify_all()
+            return
+
+        with self._cond:
+            self._servers.pop(server.id, None)
+
+        try:
+            self._discard(server)
+        except Exception as e:
+            with self._cond:
+                self._errors.append(e)
+
+        self._fill()
+
+
+class FloatingIpPool(object):
+    """A pool of pre-allocated floating IP addresses which are leased to
+    servers and returned instead of being released.
+
+    Addresses are allocated in bulk up front (and on demand once the pool is
+    exhausted), attached to the port of a server when leased and detached
+    when returned. Every address owned by the pool is released when the pool
+    is closed, so concurrent test workers never delete each other's
+    addresses.
+
+    Example:
+        >>> pool = FloatingIpPool(os_api_conn, 'GATEWAY_NET', size=10)
+        >>> pool.start()
+        >>> floating_ip = pool.lease(server)
+        >>> pool.release(server)
+        >>> results = pool.close()
+    """
+
+    def __init__(self,
+                 os_api_conn,
+                 network,
+                 size,
+                 max_workers=5,
+                 os_api_conn_manager=None):
+        """Create a floating IP pool.
+
+        Args:
+            os_api_conn (openstack.connection.Connection): An authorized API
+                connection to the 'default' cloud on the OpenStack
+                infrastructure.
+            network (str): Name or ID of the network to allocate addresses
+                from.
+            size (int): The number of addresses to allocate up front.
+            max_workers (int): The maximum number of concurrent API requests.
+            os_api_conn_manager (OsConnectionManager): Provides a connection
+                for each concurrent API request. (all requests share
+                'os_api_conn' if None)
+        """
+
+        self.os_api_conn = os_api_conn
+        self.os_api_conn_manager = os_api_conn_manager
+        self.network = network
+        self.size = size
+        self.max_workers = max_workers
+        self._available = []
+        self._owned = OrderedDict()     # Every address owned by the pool.
+        self._leases = {}               # Leased addresses keyed by server ID.
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Allocate the addresses up front.
+
+        Returns:
+            list of Exception: Errors raised while allocating addresses.
+        """
+
+        with self._lock:
+            deficit = self.size - len(self._owned)
+
+        if deficit <= 0:
+            return []
+
+        def _allocate(_):
+            try:
+                with _worker_connection(self.os_api_conn,
+                                        self.os_api_conn_manager) as conn:
+                    floating_ip = conn.create_floating_ip(network=self.network)
+            except Exception as e:
+                return e
+
+            with self._lock:
+                self._owned[floating_ip.id] = floating_ip
+                self._available.append(floating_ip)
+
+        pool = ThreadPool(max(1, min(deficit, self.max_workers)))
+
+        try:
+            errors = pool.map(_allocate, range(deficit))
+        finally:
+            pool.close()
+            pool.join()
+
+        return [e for e in errors if e is not None]
+
+    def lease(self, server, os_api_conn=None, timeout=600):
+        """Attach a floating IP address from the pool to a server.
+
+        Args:
+            server (openstack.compute.v2.server.Server): The server to attach
+                the address to.
+            os_api_conn (openstack.connection.Connection): The API connection
+                to use. (defaults to the connection of the pool)
+            timeout (int): Seconds to wait for the address to be attached.
+
+        Returns:
+            munch.Munch: The attached floating IP.
+        """
+
+        conn = os_api_conn or self.os_api_conn
+
+        with self._lock:
+            floating_ip = self._available.pop(0) if self._available else None
+
+        if floating_ip is None:     # Exhausted, so grow the pool.
+            floating_ip = conn.create_floating_ip(network=self.network)
+            with self._lock:
+                self._owned[floating_ip.id] = floating_ip
+
+        try:
+            conn.add_ip_list(server,
+                             [floating_ip.floating_ip_address],
+                             wait=True,
+                             timeout=timeout)
+        except Exception:
+            with self._lock:
+                self._available.append(floating_ip)
+            raise
+
+        with self._lock:
+            self._leases.setdefault(server.id, []).append(floating_ip)
+
+        return floating_ip
+
+    def release(self, server, os_api_conn=None):
+        """Detach the addresses leased to a server and return them to the
+        pool. Addresses which cannot be detached are kept out of the pool
+        until it is closed.
+
+        Args:
+            server (openstack.compute.v2.server.Server): The server the
+                addresses were leased to.
+            os_api_conn (openstack.connection.Connection): The API connection
+                to use. (defaults to the connection of the pool)
+        """
+
+        conn = os_api_conn or self.os_api_conn
+
+        with self._lock:
+            floating_ips = self._leases.pop(server.id, [])
+
+        for floating_ip in floating_ips:
+            try:
+                conn.detach_ip_from_server(server_id=server.id,
+                                           floating_ip_id=floating_ip.id)
+            except Exception:
+                continue
+
+            with self._lock:
+                self._available.append(floating_ip)
+
+    def close(self):
+        """Release every address owned by the pool.
+
+        Returns:
+            collections.OrderedDict of {str: OsObjectDeleteResult}: Delete
+                results keyed by floating IP ID.
+        """
+
+        with self._lock:
+            floating_ips = list(self._owned.values())
+            self._owned.clear()
+            self._available = []
+            self._leases.clear()
+
+        def _delete(floating_ip):
+            try:
+                with _worker_connection(self.os_api_conn,
+                                        self.os_api_conn_manager) as conn:
+                    found = conn.delete_floating_ip(floating_ip.id)
+            except Exception as e:
+                return OsObjectDeleteResult(floating_ip.id, True, False, e)
+
+            return OsObjectDeleteResult(floating_ip.id, found, found, None)
+
+        if not floating_ips:
+            return OrderedDict()
+
+        pool = ThreadPool(max(1, min(len(floating_ips), self.max_workers)))
+
+        try:
+            return OrderedDict((r.id, r) for r in pool.map(_delete,
+                                                           floating_ips))
+        finally:
+            pool.close()
+            pool.join()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._available)
+
+
+class ConsoleLogScanner(object):
+    """Scan the console log of an OpenStack server for a marker, searching
+    only the portion of the log which was not scanned by a previous call.
+
+    Progress is tracked by content rather than by offset because nova caps
+    the console output and drops the head of the log once the cap is reached.
+    The tail seen by the previous scan is located in the newly fetched log
+    and the search resumes from there. If the tail is no longer present the
+    whole fetched log is searched.
+
+    Example:
+        >>> scanner = ConsoleLogScanner(os_api_conn, server)
+        >>> while not scanner.scan():
+        >>>     sleep(5)
+    """
+
+    def __init__(self, os_api_conn, server, marker=None, length=None):
+        """Create a console log scanner.
+
+        Args:
+            os_api_conn (openstack.connection.Connection): An authorized API
+                connection to the 'default' cloud on the OpenStack
+                infrastructure.
+            server (openstack.compute.v2.server.Server): The server to scan.
+            marker (str or re.SRE_Pattern): The text or compiled regular
+                expression to look for. (Defaults to the cloud-init "finished"
+                message)
+            length (int): The number of lines to fetch from the end of the
+                log on each scan. Lines scrolled past between two scans are
+                not searched. (None fetches the whole log)
+        """
+
+        if marker is None:
+            marker = cloud_init_finished_regex
+        elif not hasattr(marker, 'search'):
+            marker = re.compile(re.escape(marker))
+
+        self.os_api_conn = os_api_conn
+        self.server = server
+        self.marker = marker
+        self.length = length
+        self.found = False
+        self._tail = ''
+
+    def scan(self):
+        """Fetch the console log and search the unscanned portion for the
+        marker.
+
+        Returns:
+            bool: Whether the marker has been found.
+        """
+
+        if self.found:
+            return True
+
+        if self.length is None:
+            console_log = self.os_api_conn.get_server_console(self.server)
+        else:
+            console_log = self.os_api_conn.get_server_console(
+                self.server,
+                length=self.length
+            )
+        console_log = console_log or ''
+
+        # Resume at the first occurrence of the previous tail, which is never
+        # past its true position. The tail itself is searched again so that a
+        # marker split across two fetches is still found.
+        start = console_log.find(self._tail) if self._tail else 0
+        self.found = self.marker.search(console_log, max(0, start)) is not None
+        self._tail = console_log[-console_scan_overlap:]
+
+        return self.found
+
+
+class SshConnectionPool(object):
+    """A pool of authenticated SSH connections keyed by (host, user, key).
+
+    A pooled connection is checked with a keepalive before it is handed back.
+    Connections which have been idle for too long or which exceed the pool
+    size (least recently used first) are closed.
+
+    Example:
+        >>> pool = SshConnectionPool(max_size=8)
+        >>> client = pool.get('10.0.0.5', 'cirros', '/root/.ssh/rpc_support')
+        >>> if client is None:
+        >>>     client = connect(...)
+        >>>     pool.put('10.0.0.5', 'cirros', '/root/.ssh/rpc_support', client)
+        >>> pool.close()
+    """
+
+    def __init__(self, max_size=16, max_idle=600, keepalive_timeout=5):
+        """Create an SSH connection pool.
+
+        Args:
+            max_size (int): The maximum number of pooled connections.
+            max_idle (float): Seconds a connection may go unused before it is
+                closed. (None for no limit)
+            keepalive_timeout (float): Seconds to wait for the keepalive check.
+        """
+
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.keepalive_timeout = keepalive_timeout
+        self._connections = OrderedDict()   # Least recently used first.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._connections)
+
+    def get(self, hostname, username, key_filename):
+        """Return a live pooled connection.
+
+        Args:
+            hostname (str): The server the connection is for.
+            username (str): The user the connection is authenticated as.
+            key_filename (str): The filename, or list of filenames, of the
+                private key(s) used for authentication.
+
+        Returns:
+            paramiko.client.SSHClient: A live client or None if the pool has no
+                live connection for the given key.
+        """
+
+        key = self._key(hostname, username, key_filename)
+
+        with self._lock:
+            expired = self._evict_idle()
+            client, _ = self._connections.pop(key, (None, None))
+
+        self._close_all(expired)
+
+        if client is None:
+            return None
+        elif not self._is_alive(client):
+            client.close()
+            return None
+
+        with self._lock:
+            self._connections[key] = (client, time())
+
+        return client
+
+    def put(self, hostname, username, key_filename, client):
+        """Add a connection to the pool.
+
+        Args:
+            hostname (str): The server the connection is for.
+            username (str): The user the connection is authenticated as.
+            key_filename (str): The filename, or list of filenames, of the
+                private key(s) used for authentication.
+            client (paramiko.client.SSHClient): A connected client.
+        """
+
+        key = self._key(hostname, username, key_filename)
+        evicted = []
+
+        with self._lock:
+            previous, _ = self._connections.pop(key, (None, None))
+            if previous is not None and previous is not client:
+                evicted.append(previous)
+
+            self._connections[key] = (client, time())
+
+            while len(self._connections) > self.max_size:
+                evicted.append(self._connections.popitem(last=False)[1][0])
+
+        self._close_all(evicted)
+
+    def evict(self, hostnames):
+        """Close every pooled connection to the given hosts, e.g. because the
+        server was deleted and its address may be reused.
+
+        Args:
+            hostnames (list of str): The hosts to close connections to.
+
+        Returns:
+            int: The number of connections closed.
+        """
+
+        hostnames = set(hostnames)
+
+        with self._lock:
+            keys = [k for k in self._connections if k[0] in hostnames]
+            clients = [self._connections.pop(k)[0] for k in keys]
+
+        self._close_all(clients)
+
+        return len(clients)
+
+    def close(self):
+        """Close every pooled connection."""
+
+        with self._lock:
+            clients = [c for c, _ in self._connections.values()]
+            self._connections.clear()
+
+        self._close_all(clients)
+
+    @staticmethod
+    def _key(hostname, username, key_filename):
+        """Build a hashable pool key."""
+
+        if isinstance(key_filename, list):
+            key_filename = tuple(key_filename)
+
+        return hostname, username, key_filename
+
+    def _evict_idle(self):
+        """Remove connections idle for longer than 'max_idle'. Must be called
+        while holding the lock.
+
+        Returns:
+            list of paramiko.client.SSHClient: The removed clients.
+        """
+
+        if self.max_idle is None:
+            return []
+
+        cutoff = time() - self.max_idle
+        expired = [k for k, (_, used) in self._connections.items()
+                   if used < cutoff]
+
+        return [self._connections.pop(k)[0] for k in expired]
+
+    def _is_alive(self, client):
+        """Check a connection with a keepalive and a channel round trip.
+
+        Args:
+            client (paramiko.client.SSHClient): The client to check.
+
+        Returns:
+            bool: Whether the connection is usable.
+        """
+
+        transport = client.get_transport()
+
+        if transport is None or not transport.is_active():
+            return False
+
+        try:
+            transport.send_ignore()
+            transport.open_session(timeout=self.keepalive_timeout).close()
+        except Exception:
+            return False
+
+        return True
+
+    @staticmethod
+    def _close_all(clients):
+        """Close the given clients, ignoring errors."""
+
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+class OsObjectReaper(object):
+    """Delete OpenStack objects in a background thread so that the caller does
+    not block on deletions.
+
+    Deletions are submitted in batches and executed with 'delete_os_objects'.
+    The results are held until 'drain' is called so that problems can be
+    reported from the main thread.
+
+    Example:
+        >>> reaper = OsObjectReaper(os_api_conn)
+        >>> reaper.submit('server', servers)
+        >>> for os_service, results in reaper.drain():
+        >>>     report(os_service, results)
+        >>> reaper.close()
+    """
+
+    def __init__(self,
+                 os_api_conn,
+                 timeout=180,
+                 max_workers=10,
+                 os_api_conn_manager=None):
+        """Create a reaper.
+
+        Args:
+            os_api_conn (openstack.connection.Connection): An authorized API
+                connection to the 'default' cloud on the OpenStack
+                infrastructure.
+            timeout (int): Seconds to wait for each batch of deletions.
+            max_workers (int): The maximum number of concurrent API requests.
+            os_api_conn_manager (OsConnectionManager): Provides a connection
+                for each concurrent API request. (all requests share
+                'os_api_conn' if None)
+        """
+
+        self.os_api_conn = os_api_conn
+        self.os_api_conn_manager = os_api_conn_manager
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._results = []
+        self._thread = None
+
+    def submit(self, os_service, os_objects):
+        """Queue OpenStack objects for deletion.
+
+        Args:
+            os_service (str): The service the objects belong to.
+                (e.g. 'server', 'volume')
+            os_objects (list of munch.Munch): The OpenStack objects to delete.
+        """
+
+        if not os_objects:
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name='os-object-reaper')
+                self._thread.daemon = True
+                self._thread.start()
+
+        self._queue.put((os_service, list(os_objects)))
+
+    def drain(self):
+        """Block until every queued deletion has finished.
+
+        Returns:
+            list of (str, collections.OrderedDict): The service name and the
+                'delete_os_objects' results for every batch completed since
+                the last drain.
+        """
+
+        self._queue.join()
+
+        with self._lock:
+            results, self._results = self._results, []
+
+        return results
+
+    def close(self):
+        """Drain the queue and stop the background thread.
+
+        Returns:
+            list of (str, collections.OrderedDict): See 'drain'.
+        """
+
+        results = self.drain()
+
+        with self._lock:
+            thread, self._thread = self._thread, None
+
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+        return results
+
+    def _run(self):
+        """Execute queued deletions until a stop sentinel is received."""
+
+        while True:
+            item = self._queue.get()
+
+            try:
+                if item is None:
+                    return
+
+                os_service, os_objects = item
+
+                try:
+                    results = delete_os_objects(
+                        self.os_api_conn,
+                        os_service,
+                        os_objects,
+                        timeout=self.timeout,
+                        max_workers=self.max_workers,
+                        os_api_conn_manager=self.os_api_conn_manager
+                    )
+                except Exception as e:
+                    results = OrderedDict(
+                        (o.id, OsObjectDeleteResult(o.id, True, False, e))
+                        for o in os_objects
+                    )
+
+                with self._lock:
+                    self._results.append((os_service, results))
+            finally:
+                self._queue.task_done()
+
+
+class SwiftReconCheck(object):
+    """A single check from swift-recon output.
+
+    Example:
+        >>> check = SwiftReconCheck('ring md5sums', None, 3, 3, 0)
+        >>> check.healthy
+        True
+    """
+
+    __slots__ = ('name',
+                 'timestamp',
+                 'matched',
+                 'total',
+                 'errors',
+                 'details')
+
+    def __init__(self,
+                 name,
+                 timestamp,
+                 matched=None,
+                 total=None,
+                 errors=None,
+                 details=None):
+        """Create a swift-recon check.
+
+        Args:
+            name (str): The check name. (e.g. 'ring md5sums')
+            timestamp (datetime): When the check ran.
+            matched (int): Hosts which matched. (None if not reported)
+            total (int): Hosts which were checked. (None if not reported)
+            errors (int): Hosts which could not be checked. (None if not
+                reported)
+            details (list of str): Every other line of the check. (e.g.
+                per-host errors or statistics)
+        """
+
+        self.name = name
+        self.timestamp = timestamp
+        self.matched = matched
+        self.total = total
+        self.errors = errors
+        self.details = details or []
+
+    @property
+    def healthy(self):
+        """bool: Whether every host matched without errors. (None if the
+        check does not report matches)"""
+
+        if self.matched is None:
+            return None
+
+        return self.matched == self.total and self.errors == 0
+
+    def __eq__(self, other):
+        return (isinstance(other, SwiftReconCheck) and
+                all(getattr(self, a) == getattr(other, a)
+                    for a in self.__slots__))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'SwiftReconCheck({})'.format(
+            ', '.join('{}={!r}'.format(a, getattr(self, a))
+                      for a in self.__slots__)
+        )
+
+
+class SwiftReconReport(object):
+    """The checks from a swift-recon run.
+
+    Example:
+        >>> report = parse_swift_recon_report(run_on_swift(
+        ...     'swift-recon --md5', host).stdout)
+        >>> report.all_healthy()
+        True
+    """
+
+    __slots__ = ('hosts', 'server_type', 'checks')
+
+    def __init__(self, hosts=None, server_type=None, checks=None):
+        """Create a swift-recon report.
+
+        Args:
+            hosts (int): The number of hosts checked. (None if not reported)
+            server_type (str): The type of server checked. (e.g. 'object')
+            checks (list of SwiftReconCheck): The checks in order.
+        """
+
+        self.hosts = hosts
+        self.server_type = server_type
+        self.checks = checks or []
+
+    def get(self, name):
+        """Retrieve a check by name.
+
+        Args:
+            name (str): The check name. (e.g. 'ring md5sums')
+
+        Returns:
+            SwiftReconCheck: The first check with the name or None if there
+                is no such check.
+        """
+
+        return next((c for c in self.checks if c.name == name), None)
+
+    def unhealthy(self):
+        """Retrieve the checks where some hosts did not match or had errors.
+
+        Returns:
+            list of SwiftReconCheck: The unhealthy checks.
+        """
+
+        return [c for c in self.checks if c.healthy is False]
+
+    def all_healthy(self):
+        """Determine whether every check which reports matches is healthy.
+
+        Returns:
+            bool: True if no check is unhealthy.
+        """
+
+        return not self.unhealthy()
+
+
+SwiftRingDevice = namedtuple('SwiftRingDevice', ('id',
+                                                 'region',
+                                                 'zone',
+                                                 'ip',
+                                                 'port',
+                                                 'replication_ip',
+                                                 'replication_port',
+                                                 'name',
+                                                 'weight',
+                                                 'partitions',
+                                                 'balance',
+                                                 'flags',
+                                                 'meta'))
+SwiftRingDevice.__doc__ = """A device from the device table of a swift ring.
+
+Attributes:
+    id (int): The device ID.
+    region (int): The region of the device.
+    zone (int): The zone of the device.
+    ip (str): The IP address of the storage server.
+    port (int): The port of the storage server.
+    replication_ip (str): The IP address used for replication.
+    replication_port (int): The port used for replication.
+    name (str): The device name. (e.g. 'sdc')
+    weight (float): The device weight.
+    partitions (int): The number of partitions assigned to the device.
+    balance (float): The balance of the device as a percentage.
+    flags (str): The device flags. (e.g. 'DEL', empty if none)
+    meta (str): The device metadata. (empty if none)
+"""
+
+
+class SwiftRingDevices(object):
+    """The device table of a swift ring stored by column.
+
+    Numeric columns are stored as arrays so that rings with thousands of
+    devices stay compact. Rows are available as SwiftRingDevice tuples.
+
+    Example:
+        >>> devices = parse_swift_ring(output).devices
+        >>> devices.devices_per_zone()
+        OrderedDict([((1, 1), 3), ((1, 2), 3), ((1, 3), 3)])
+        >>> devices.max_balance()
+        0.78
+    """
+
+    __slots__ = SwiftRingDevice._fields
+
+    def __init__(self):
+        """Create an empty device table."""
+
+        self.id = array('l')
+        self.region = array('l')
+        self.zone = array('l')
+        self.ip = []
+        self.port = array('l')
+        self.replication_ip = []
+        self.replication_port = array('l')
+        self.name = []
+        self.weight = array('d')
+        self.partitions = array('l')
+        self.balance = array('d')
+        self.flags = []
+        self.meta = []
+
+    def append(self, device):
+        """Add a device to the table.
+
+        Args:
+            device (SwiftRingDevice): The device to add.
+        """
+
+        for column, value in zip(self.__slots__, device):
+            getattr(self, column).append(value)
+
+    def __len__(self):
+        return len(self.id)
+
+    def __getitem__(self, index):
+        return SwiftRingDevice(*(getattr(self, c)[index]
+                                 for c in self.__slots__))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def devices_per_zone(self):
+        """Count the devices in each zone.
+
+        Returns:
+            OrderedDict: Device counts keyed by (region, zone), sorted.
+                ({(int, int): int})
+        """
+
+        counts = {}
+
+        for key in zip(self.region, self.zone):
+            counts[key] = counts.get(key, 0) + 1
+
+        return OrderedDict(sorted(counts.items()))
+
+    def max_balance(self):
+        """Determine the largest absolute device balance.
+
+        Returns:
+            float: The largest absolute balance as a percentage. (0.0 if there
+                are no devices)
+        """
+
+        return max([abs(b) for b in self.balance] or [0.0])
+
+
+SwiftRing = namedtuple('SwiftRing', ('summary', 'devices'))
+SwiftRing.__doc__ = """A swift ring as reported by swift-ring-builder.
+
+Attributes:
+    summary (dict of {str: float}): Swift ring data from the summary line.
+        (e.g. {'partitions': 256.0, 'balance': 0.78}, empty if not found)
+    devices (SwiftRingDevices): The device table.
+"""
+
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+def timed_phase(phase):
+    """Time the enclosed block as a phase of the running test when phase
+    timing is enabled. (see 'PhaseTimer')
+
+    Example:
+        >>> with timed_phase('boot'):
+        >>>     conn.create_server(...)
+
+    Args:
+        phase (str): The phase name.
+
+    Returns:
+        contextmanager: A context manager which records the span on exit.
+    """
+
+    return phase_timer.span(phase)
+
+
+def _text(command):
+    """Decode a byte string command as UTF-8 so that commands are combined and
+    encoded the same way whether they were given as byte strings or unicode.
+    (a plain 'str' is a byte string on Python 2)
+
+    Args:
+        command (str): The command.
+
+    Returns:
+        str: The command as unicode.
+    """
+
+    if isinstance(command, bytes):
+        return command.decode('utf-8')
+
+    return command
+
+
+@contextmanager
+def _worker_connection(os_api_conn, os_api_conn_manager=None):
+    """Provide the API connection for a single thread pool worker.
+
+    Args:
+        os_api_conn (openstack.connection.Connection): The connection to use
+            when there is no connection manager.
+        os_api_conn_manager (OsConnectionManager): The manager to borrow a
+            connection from for the enclosed block.
+
+    Yields:
+        openstack.connection.Connection: https://bit.ly/2LqgiiT
+    """
+
+    if os_api_conn_manager is None:
+        yield os_api_conn
+    else:
+        with os_api_conn_manager.checkout() as conn:
+            yield conn
+
+
+def _percentile(sorted_values, percent):
+    """Calculate a percentile by linear interpolation between the closest
+    ranks.
+
+    Args:
+        sorted_values (list of float): The values in ascending order.
+        percent (float): The percentile to calculate. (0 to 100)
+
+    Returns:
+        float: The percentile or None if there are no values.
+    """
+
+    if not sorted_values:
+        return None
+
+    rank = (len(sorted_values) - 1) * percent / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+
+    return (sorted_values[lower] +
+            (sorted_values[upper] - sorted_values[lower]) * (rank - lower))
+
+
+def expect_os_property(os_api_conn,
+                       os_service,
+                       os_object,
+                       os_prop_name,
+                       expected_value,
+                       retries=10,
+                       show_warnings=True,
+                       case_insensitive=True,
+                       only_extended_props=False,
+                       retry_policy=None):
+    """Test whether an OpenStack object property matches an expected value.
+
+    Note: this function uses an exponential back-off for retries which means the
+    more retries specified the longer the wait between each retry. The total
+    wait time is on the fibonacci sequence. (https://bit.ly/1ee23o9)
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+        os_service (str): The service to inspect for object state.
+            (e.g. 'server', 'network', 'floating_ip')
+        os_object (munch.Munch): The OpenStack object to inspect. (Note: this
+            can also OpenStack resource types: https://bit.ly/2R7yjbi)
+        os_prop_name (str): The name of the OpenStack object property to
+            inspect.
+        expected_value (str): The expected value for the given property.
+        retries (int): The maximum number of retry attempts.
+        show_warnings (bool): Flag for displaying warnings while attempting
+            validate properties.(VERY NOISY!)
+        case_insensitive (bool): Flag for controlling whether to match case
+            sensitive or not for the 'expected_value'.
+        only_extended_props (bool): Flag for forcing searching of ONLY extended
+            OpenStack properties on the given OpenStack object.
+        retry_policy (RetryPolicy): A retry policy which takes precedence over
+            'retries'.
+
+    Returns:
+        bool: Whether the property matched the expected value.
+
+    Raises:
+        RuntimeError: Invalid service specified.
+        RuntimeError: The property was not found on the given object.
+    """
+
+    return expect_os_properties(os_api_conn=os_api_conn,
+                                os_service=os_service,
+                                os_object=os_object,
+                                expected_props={os_prop_name: expected_value},
+                                retries=retries,
+                                show_warnings=show_warnings,
+                                case_insensitive=case_insensitive,
+                                only_extended_props=only_extended_props,
+                                retry_policy=retry_policy)
+
+
+def expect_os_properties(os_api_conn,
+                         os_service,
+                         os_object,
+                         expected_props,
+                         retries=10,
+                         show_warnings=True,
+                         case_insensitive=True,
+                         only_extended_props=False,
+                         retry_policy=None):
+    """Test whether several OpenStack object properties match their expected
+    values. The object is retrieved only once per attempt and every expected
+    property is checked against that single response.
+
+    Note: this function uses an exponential back-off for retries which means the
+    more retries specified the longer the wait between each retry. The total
+    wait time is on the fibonacci sequence. (https://bit.ly/1ee23o9)
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+        os_service (str): The service to inspect for object state.
+            (e.g. 'server', 'network', 'floating_ip')
+        os_object (munch.Munch): The OpenStack object to inspect. (Note: this
+            can also OpenStack resource types: https://bit.ly/2R7yjbi)
+        expected_props (dict): A mapping of OpenStack object property names to
+            their expected values. (e.g. {'status': 'ACTIVE'})
+        retries (int): The maximum number of retry attempts.
+        show_warnings (bool): Flag for displaying warnings while attempting
+            validate properties.(VERY NOISY!)
+        case_insensitive (bool): Flag for controlling whether to match case
+            sensitive or not for the expected values.
+        only_extended_props (bool): Flag for forcing searching of ONLY extended
+            OpenStack properties on the given OpenStack object.
+        retry_policy (RetryPolicy): A retry policy which takes precedence over
+            'retries'.
+
+    Returns:
+        bool: Whether all the properties matched their expected values.
+
+    Raises:
+        RuntimeError: Invalid service specified.
+        RuntimeError: A property was not found on the given object.
+    """
+
+    try:
+        get_service_method = getattr(os_api_conn, "get_{}".format(os_service))
+    except AttributeError:
+        raise RuntimeError("Invalid '{}' service specified!".format(os_service))
+
+    retry_policy = RetryPolicy.resolve(retries, retry_policy)
+
+    with timed_phase('expect_os_properties.{}'.format(os_service)):
+        for attempt in retry_policy.attempts():
+            result = get_service_method(os_object.id)
+
+            mismatches = _match_os_properties(result,
+                                              expected_props,
+                                              case_insensitive,
+                                              only_extended_props)
+
+            if not mismatches:
+                return True
+            elif show_warnings:
+                for os_prop_name, expected_value, actual_value in mismatches:
+                    warning_message = (
+                        "Validation attempt: #{}\n"
+                        "Object ID: '{}'\n"
+                        "Property name: '{}'\n"
+                        "Expected value: '{}'\n"
+                        "Actual value: '{}'".format(
+                            attempt,
+                            os_object.id,
+                            os_prop_name,
+                            expected_value,
+                            actual_value
+                        )
+                    )
+                    warn(UserWarning(warning_message))
+
+    return False
+
+
+def _get_os_property(os_object_state, os_prop_name, only_extended_props=False):
+    """Retrieve a property value from the state of an OpenStack object.
+
+    Args:
+        os_object_state (munch.Munch): The state of an OpenStack object as
+            returned from the API.
+        os_prop_name (str): The name of the OpenStack object property to
+            retrieve.
+        only_extended_props (bool): Flag for forcing searching of ONLY extended
+            OpenStack properties on the given OpenStack object.
+
+    Returns:
+        str: The property value converted to a string.
+
+    Raises:
+        RuntimeError: The property was not found on the given object.
+    """
+
+    # Search direct properties and extended properties.
+    if not only_extended_props and os_prop_name in os_object_state:
+        return str(os_object_state[os_prop_name])
+    elif ('properties' in os_object_state and
+          os_prop_name in os_object_state['properties']):
+        return str(os_object_state['properties'][os_prop_name])
+    else:
+        raise RuntimeError(
+            "The '{}' property was not "
+            "found on the given object!\n\n"
+            "Object properties:\n\n"
+            "{}".format(os_prop_name, pformat(dict(os_object_state), indent=4))
+        )
+
+
+def _match_os_properties(os_object_state,
+                         expected_props,
+                         case_insensitive=True,
+                         only_extended_props=False):
+    """Compare the state of an OpenStack object against expected property
+    values.
+
+    Args:
+        os_object_state (munch.Munch): The state of an OpenStack object as
+            returned from the API.
+        expected_props (dict): A mapping of OpenStack object property names to
+            their expected values.
+        case_insensitive (bool): Flag for controlling whether to match case
+            sensitive or not for the expected values.
+        only_extended_props (bool): Flag for forcing searching of ONLY extended
+            OpenStack properties on the given OpenStack object.
+
+    Returns:
+        list of (str, str, str): The property name, expected value and actual
+            value for every property that did not match. Empty list if all
+            properties matched.
+
+    Raises:
+        RuntimeError: A property was not found on the given object.
+    """
+
+    mismatches = []
+
+    for os_prop_name in sorted(expected_props):
+        expected_value = expected_props[os_prop_name]
+        actual_value = _get_os_property(os_object_state,
+                                        os_prop_name,
+                                        only_extended_props)
+
+        if actual_value == expected_value:
+            continue
+        elif actual_value.lower() == expected_value and case_insensitive:
+            continue
+        else:
+            mismatches.append((os_prop_name, expected_value, actual_value))
+
+    return mismatches
+
+
+def wait_for_os_objects(os_api_conn,
+                        os_service,
+                        os_objects,
+                        expected_props,
+                        retries=10,
+                        filters=None,
+                        failure_props=None,
+                        show_warnings=True,
+                        case_insensitive=True,
+                        only_extended_props=False,
+                        retry_policy=None):
+    """Wait for many OpenStack objects to match expected property values using
+    a single 'list' API call per attempt.
+
+    Objects are dropped from the pending set as soon as they reach the expected
+    state or any of the failure states. Objects missing from the 'list'
+    response are treated as pending.
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+        os_service (str): The service to inspect for object state.
+            (e.g. 'server', 'volume')
+        os_objects (list of munch.Munch): The OpenStack objects to inspect.
+        expected_props (dict): A mapping of OpenStack object property names to
+            their expected values. (e.g. {'status': 'ACTIVE'})
+        retries (int): The maximum number of retry attempts.
+        filters (dict): Filters passed to the 'list' API call to reduce the
+            size of the response. (Only for services that support filtering)
+        failure_props (dict): A mapping of OpenStack object property names to
+            values which indicate that an object will never reach the expected
+            state. Matching ANY of them stops waiting on the object.
+            (e.g. {'status': 'ERROR'})
+        show_warnings (bool): Flag for displaying warnings while attempting
+            validate properties.(VERY NOISY!)
+        case_insensitive (bool): Flag for controlling whether to match case
+            sensitive or not for the expected values.
+        only_extended_props (bool): Flag for forcing searching of ONLY extended
+            OpenStack properties on the given OpenStack objects.
+        retry_policy (RetryPolicy): A retry policy which takes precedence over
+            'retries'.
+
+    Returns:
+        collections.OrderedDict of {str: OsObjectWaitResult}: Wait results
+            keyed by object ID in the order the objects were given.
+
+    Raises:
+        RuntimeError: Invalid service specified.
+        RuntimeError: A property was not found on one of the given objects.
+    """
+
+    def _is_ready(os_object_state):
+        return (os_object_state is not None and
+                not _match_os_properties(os_object_state,
+                                         expected_props,
+                                         case_insensitive,
+                                         only_extended_props))
+
+    def _is_failed(os_object_state):
+        if os_object_state is None or not failure_props:
+            return False
+
+        return any(
+            not _match_os_properties(os_object_state,
+                                     {os_prop_name: failure_value},
+                                     case_insensitive,
+                                     only_extended_props)
+            for os_prop_name, failure_value in failure_props.items()
+        )
+
+    return _poll_os_objects(os_api_conn,
+                            os_service,
+                            os_objects,
+                            _is_ready,
+                            RetryPolicy.resolve(retries, retry_policy),
+                            filters,
+                            show_warnings,
+                            _is_failed)
+
+
+def wait_for_os_objects_deleted(os_api_conn,
+                                os_service,
+                                os_objects,
+                                retries=10,
+                                filters=None,
+                                show_warnings=True,
+                                retry_policy=None):
+    """Wait for many OpenStack objects to disappear using a single 'list' API
+    call per attempt.
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+        os_service (str): The service to inspect for object state.
+            (e.g. 'server', 'volume')
+        os_objects (list of munch.Munch): The OpenStack objects to inspect.
+        retries (int): The maximum number of retry attempts.
+        filters (dict): Filters passed to the 'list' API call to reduce the
+            size of the response. (Only for services that support filtering)
+        show_warnings (bool): Flag for displaying warnings while waiting.
+            (VERY NOISY!)
+        retry_policy (RetryPolicy): A retry policy which takes precedence over
+            'retries'.
+
+    Returns:
+        collections.OrderedDict of {str: OsObjectWaitResult}: Wait results
+            keyed by object ID in the order the objects were given.
+
+    Raises:
+        RuntimeError: Invalid service specified.
+    """
+
+    return _poll_os_objects(os_api_conn,
+                            os_service,
+                            os_objects,
+                            lambda os_object_state: os_object_state is None,
+                            RetryPolicy.resolve(retries, retry_policy),
+                            filters,
+                            show_warnings)
+
+
+def _poll_os_objects(os_api_conn,
+                     os_service,
+                     os_objects,
+                     is_ready,
+                     retry_policy,
+                     filters=None,
+                     show_warnings=True,
+                     is_failed=None):
+    """Poll the state of many OpenStack objects with one 'list' API call per
+    attempt until every object is ready or the retry policy is exhausted.
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+        os_service (str): The service to inspect for object state.
+        os_objects (list of munch.Munch): The OpenStack objects to inspect.
+        is_ready (def): A function which accepts the observed state of an
+            object (None if absent from the response) and returns whether the
+            object is ready.
+        retry_policy (RetryPolicy): The retry policy to use.
+        filters (dict): Filters passed to the 'list' API call.
+        show_warnings (bool): Flag for displaying warnings while waiting.
+        is_failed (def): A function which accepts the observed state of an
+            object and returns whether the object will never become ready.
+
+    Returns:
+        collections.OrderedDict of {str: OsObjectWaitResult}: Wait results
+            keyed by object ID in the order the objects were given.
+
+    Raises:
+        RuntimeError: Invalid service specified.
+    """
+
+    try:
+        list_service_method = getattr(os_api_conn,
+                                      "list_{}s".format(os_service))
+    except AttributeError:
+        raise RuntimeError("Invalid '{}' service specified!".format(os_service))
+
+    list_args = {'filters': filters} if filters else {}
+    results = OrderedDict((os_object.id, None) for os_object in os_objects)
+    pending = list(results)
+    states = {}
+    attempt = 0
+    start = time()
+
+    for attempt in retry_policy.attempts():
+        states = dict((s['id'], s) for s in list_service_method(**list_args))
+
+        for os_object_id in list(pending):
+            os_object_state = states.get(os_object_id)
+
+            if is_ready(os_object_state):
+                ready = True
+            elif is_failed is not None and is_failed(os_object_state):
+                ready = False
+            else:
+                continue
+
+            results[os_object_id] = OsObjectWaitResult(os_object_id,
+                                                       ready,
+                                                       time() - start,
+                                                       attempt,
+                                                       os_object_state)
+            pending.remove(os_object_id)
+
+        if not pending:
+            break
+        elif show_warnings:
+            warn(UserWarning("Validation attempt: #{}\n"
+                             "Pending {} objects: {}".format(attempt,
+                                                             os_service,
+                                                             pending)))
+
+    for os_object_id in pending:
+        results[os_object_id] = OsObjectWaitResult(os_object_id,
+                                                   False,
+                                                   time() - start,
+                                                   attempt,
+                                                   states.get(os_object_id))
+
+    return results
+
+
+def delete_os_objects(os_api_conn,
+                      os_service,
+                      os_objects,
+                      wait=True,
+                      timeout=180,
+                      max_workers=10,
+                      show_warnings=False,
+                      retry_policy=None,
+                      os_api_conn_manager=None):
+    """Delete many OpenStack objects at once and optionally wait for all of
+    them to disappear with a single 'list' API call per poll.
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+        os_service (str): The service the objects belong to.
+            (e.g. 'server', 'volume')
+        os_objects (list of munch.Munch): The OpenStack objects to delete.
+        wait (bool): Flag for waiting until the objects are gone.
+        timeout (int): Seconds to wait for the objects to disappear.
+        max_workers (int): The maximum number of concurrent API requests.
+        show_warnings (bool): Flag for displaying warnings while waiting.
+            (VERY NOISY!)
+        retry_policy (RetryPolicy): A retry policy for waiting which takes
+            precedence over 'timeout'.
+        os_api_conn_manager (OsConnectionManager): Provides a connection for
+            each concurrent delete request. (all requests share 'os_api_conn'
+            if None)
+
+    Returns:
+        collections.OrderedDict of {str: OsObjectDeleteResult}: Delete results
+            keyed by object ID in the order the objects were given.
+
+    Raises:
+        RuntimeError: Invalid service specified.
+    """
+
+    delete_method_name = "delete_{}".format(os_service)
+
+    if not hasattr(os_api_conn, delete_method_name):
+        raise RuntimeError("Invalid '{}' service specified!".format(os_service))
+
+    if not os_objects:
+        return OrderedDict()
+
+    def _delete(os_object):
+        try:
+            with _worker_connection(os_api_conn, os_api_conn_manager) as conn:
+                found = getattr(conn, delete_method_name)(
+                    name_or_id=os_object.id, wait=False
+                )
+        except Exception as e:
+            return OsObjectDeleteResult(os_object.id, True, False, e)
+
+        return OsObjectDeleteResult(os_object.id, bool(found), None, None)
+
+    pool = ThreadPool(max(1, min(len(os_objects), max_workers)))
+
+    try:
+        results = OrderedDict((r.id, r) for r in pool.map(_delete, os_objects))
+    finally:
+        pool.close()
+        pool.join()
+
+    deleting = [o for o in os_objects
+                if results[o.id].found and results[o.id].error is None]
+
+    if wait and deleting:
+        wait_results = wait_for_os_objects_deleted(
+            os_api_conn=os_api_conn,
+            os_service=os_service,
+            os_objects=deleting,
+            show_warnings=show_warnings,
+            retry_policy=retry_policy or RetryPolicy(retries=None,
+                                                     max_sleep=10,
+                                                     deadline=timeout)
+        )
+
+        for os_object_id, wait_result in wait_results.items():
+            results[os_object_id] = \
+                results[os_object_id]._replace(deleted=wait_result.ready)
+
+    return results
+
+
+def probe_tcp_port(host_or_ip, port=22, timeout=5):
+    """Verify that a TCP port accepts connections.
+
+    Args:
+        host_or_ip (str): A valid hostname or IP address.
+        port (int): The TCP port to connect to.
+        timeout (float): Seconds to wait for the connection.
+
+    Returns:
+        bool: True if the connection was accepted otherwise False.
+    """
+
+    try:
+        sock = socket.create_connection((host_or_ip, port), timeout)
+    except (socket.error, socket.timeout):
+        return False
+
+    sock.close()
+
+    return True
+
+
+def probe_ssh_banner(host_or_ip, port=22, timeout=5):
+    """Verify that an SSH server is answering by reading its banner.
+
+    Args:
+        host_or_ip (str): A valid hostname or IP address.
+        port (int): The TCP port of the SSH server.
+        timeout (float): Seconds to wait for the connection and the banner.
+
+    Returns:
+        bool: True if an SSH banner was received otherwise False.
+    """
+
+    try:
+        sock = socket.create_connection((host_or_ip, port), timeout)
+    except (socket.error, socket.timeout):
+        return False
+
+    try:
+        banner = sock.recv(256)
+    except (socket.error, socket.timeout):
+        return False
+    finally:
+        sock.close()
+
+    return banner.startswith(b'SSH-')
+
+
+def wait_for_guest_ready(host_or_ip,
+                         port=22,
+                         check_banner=True,
+                         os_api_conn=None,
+                         server=None,
+                         console_marker=None,
+                         timeout=600,
+                         probe_timeout=5,
+                         retry_policy=None):
+    """Wait until a guest operating system is ready to be used by actively
+    probing it instead of sleeping for a fixed time.
+
+    The guest is ready once its SSH port accepts connections (and returns an
+    SSH banner if 'check_banner' is set) and, when a server is given, once the
+    console log contains the console marker. Probes that have passed are not
+    repeated.
+
+    Args:
+        host_or_ip (str): A valid hostname or IP address of the guest.
+        port (int): The TCP port of the SSH server.
+        check_banner (bool): Flag for requiring an SSH banner rather than just
+            an accepted TCP connection.
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection used for scanning the console log.
+        server (openstack.compute.v2.server.Server): The server whose console
+            log is scanned. (Console scanning is skipped if not given)
+        console_marker (str or re.SRE_Pattern): The console marker to wait
+            for. (Defaults to the cloud-init "finished" message)
+        timeout (int): Seconds to wait for the guest, defaults to 600.
+        probe_timeout (float): Seconds to wait for each network probe.
+        retry_policy (RetryPolicy): A retry policy which takes precedence over
+            'timeout'.
+
+    Returns:
+        bool: True if the guest became ready otherwise False.
+    """
+
+    retry_policy = retry_policy or RetryPolicy(retries=None,
+                                               strategy=RetryPolicy.FIXED,
+                                               interval=3,
+                                               deadline=timeout)
+    probe_port = probe_ssh_banner if check_banner else probe_tcp_port
+    port_ready = False
+    scanner = None
+
+    if os_api_conn is not None and server is not None:
+        scanner = ConsoleLogScanner(os_api_conn, server, console_marker)
+
+    for _ in retry_policy.attempts():
+        port_ready = port_ready or probe_port(host_or_ip, port, probe_timeout)
+
+        if port_ready and (scanner is None or scanner.scan()):
+            return True
+
+    return False
+
+
+def run_ssh_commands(ssh_client,
+                     commands,
+                     concurrency=4,
+                     timeout=None,
+                     max_output=1048576):
+    """Run several commands concurrently over a single SSH transport. Every
+    command gets its own channel on the transport of the given client.
+
+    Args:
+        ssh_client (paramiko.client.SSHClient): A client already connected to
+            the target server. (e.g. from the 'ssh_connect' fixture)
+        commands (list of str): The commands to run.
+        concurrency (int): The maximum number of channels open at once. (Keep
+            this below the 'MaxSessions' setting of the SSH server)
+        timeout (float): Seconds to wait for each command. (None for no limit)
+        max_output (int): The maximum number of bytes kept for each of stdout
+            and stderr per command. Additional output is read and discarded.
+
+    Returns:
+        list of SshCommandResult: One result per command in the given order.
+    """
+
+    transport = ssh_client.get_transport()
+
+    def _run(command):
+        start = time()
+
+        try:
+            channel = transport.open_session()
+            channel.exec_command(command)
+        except Exception as e:
+            return SshCommandResult(command, -1, '', str(e), time() - start,
+                                    False, False)
+
+        streams = {'stdout': ([], channel.recv_ready, channel.recv),
+                   'stderr': ([], channel.recv_stderr_ready,
+                              channel.recv_stderr)}
+        kept = {'stdout': 0, 'stderr': 0}
+        truncated = False
+        timed_out = False
+
+        try:
+            while True:
+                finished = channel.exit_status_ready()
+                received = False
+
+                for name, (chunks, ready, recv) in streams.items():
+                    while ready():
+                        data = recv(ssh_read_size)
+                        received = True
+                        room = max(0, max_output - kept[name])
+                        if len(data) > room:
+                            truncated = True
+                            data = data[:room]
+                        if data:
+                            chunks.append(data)
+                            kept[name] += len(data)
+
+                if finished and not received:
+                    break
+                elif timeout is not None and time() - start > timeout:
+                    timed_out = True
+                    break
+                elif not received:
+                    sleep(ssh_poll_interval)
+
+            exit_status = -1 if timed_out else channel.recv_exit_status()
+        finally:
+            channel.close()
+
+        return SshCommandResult(
+            command,
+            exit_status,
+            b''.join(streams['stdout'][0]).decode('utf-8', 'replace'),
+            b''.join(streams['stderr'][0]).decode('utf-8', 'replace'),
+            time() - start,
+            truncated,
+            timed_out
+        )
+
+    if not commands:
+        return []
+
+    pool = ThreadPool(max(1, min(len(commands), concurrency)))
+
+    try:
+        return pool.map(_run, commands)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def ping_from_mnaio(host_or_ip, retries=10, retry_policy=None):
+    """Verify that a host can be pinged from the MNAIO deployment host. The
+    host is pinged with an in-process ICMP echo request where the kernel
+    allows it and with the 'ping' command otherwise. (see
+    'ping_hosts_from_mnaio')
+
+    Note: this function uses an exponential back-off for retries which means the
+    more retries specified the longer the wait between each retry. The total
+    wait time is on the fibonacci sequence. (https://bit.ly/1ee23o9)
+
+    Args:
+        host_or_ip (str): A valid hostname or IP address to ping.
+        retries (int): The maximum number of retry attempts.
+        retry_policy (RetryPolicy): A retry policy which takes precedence over
+            'retries'.
+
+    Returns:
+        bool: True if host was successfully pinged otherwise False.
+    """
+
+    results = ping_hosts_from_mnaio([host_or_ip],
+                                    count=1,
+                                    retries=retries,
+                                    retry_policy=retry_policy)
+
+    return results[host_or_ip].reachable
+
+
+def ping_hosts_from_mnaio(hosts_or_ips,
+                          count=3,
+                          retries=10,
+                          deadline=None,
+                          max_workers=20,
+                          retry_policy=None,
+                          method=None,
+                          tcp_port=None,
+                          timeout=1):
+    """Ping several hosts concurrently from the MNAIO deployment host,
+    retrying only the hosts which have not answered yet. (see
+    'probe_reachability')
+
+    Hosts are pinged with in-process ICMP echo requests where the kernel
+    allows them, otherwise with the 'ping' command. A host is never reported
+    reachable because of a TCP connect unless 'method' is explicitly 'tcp'.
+    The method actually used is recorded in each result.
+
+    Note: unless a deadline is given this function uses an exponential
+    back-off for retries which means the more retries specified the longer
+    the wait between each retry. The total wait time is on the fibonacci
+    sequence. (https://bit.ly/1ee23o9)
+
+    Args:
+        hosts_or_ips (list of str): Valid hostnames or IP addresses to ping.
+        count (int): The number of packets to send to a host per attempt.
+        retries (int): The maximum number of retry attempts.
+        deadline (float): Retry every second until all hosts are reachable or
+            this many seconds have elapsed. Takes precedence over 'retries'.
+        max_workers (int): The maximum number of ping subprocesses at once.
+        retry_policy (RetryPolicy): A retry policy which takes precedence over
+            'retries' and 'deadline'.
+        method (str): How to probe the hosts. ('icmp', 'tcp' or 'subprocess',
+            defaults to 'icmp' when available and 'subprocess' otherwise)
+        tcp_port (int): The port for TCP probes. (only used when 'method' is
+            'tcp', defaults to 22)
+        timeout (float): Seconds to wait for each reply.
+
+    Returns:
+        OrderedDict: Results keyed by host in the order given.
+            ({str: PingResult})
+    """
+
+    if method == 'tcp':
+        tcp_port = tcp_port or 22
+    else:
+        tcp_port = None     # Never fall back to TCP for a ping.
+
+    if retry_policy is None and deadline is not None:
+        retry_policy = RetryPolicy(retries=None,
+                                   strategy=RetryPolicy.FIXED,
+                                   interval=1,
+                                   deadline=deadline)
+
+    results = OrderedDict((h, None) for h in hosts_or_ips)
+    pending = list(results)
+
+    if not pending:
+        return results
+
+    with timed_phase('ping_hosts_from_mnaio'):
+        for attempt in RetryPolicy.resolve(retries, retry_policy).attempts():
+            probed = probe_reachability(pending,
+                                        count=count,
+                                        timeout=timeout,
+                                        tcp_port=tcp_port,
+                                        method=method,
+                                        max_workers=max_workers)
+
+            for host, result in probed.items():
+                results[host] = result._replace(attempts=attempt)
+
+            pending = [h for h in pending if not results[h].reachable]
+
+            if not pending:
+                break
+
+    return results
+
+
+def probe_reachability(hosts_or_ips,
+                       count=3,
+                       timeout=1,
+                       interval=0.2,
+                       tcp_port=22,
+                       method=None,
+                       max_workers=20):
+    """Probe the reachability of many hosts in-process with a single event
+    loop, without forking a process per host.
+
+    Hosts are probed with unprivileged ICMP echo requests where the kernel
+    allows them ('net.ipv4.ping_group_range'), otherwise with TCP connects to
+    'tcp_port' where a refused connection also counts as an answer. Ping
+    subprocesses are the last resort. All output is captured in the results.
+
+    Args:
+        hosts_or_ips (list of str): Valid hostnames or IP addresses to probe.
+        count (int): The number of probes to send to each host.
+        timeout (float): Seconds to wait for each reply.
+        interval (float): Seconds between the probes to a host.
+        tcp_port (int): The port for TCP probes. (None disables TCP probes)
+        method (str): How to probe the hosts. ('icmp', 'tcp' or 'subprocess',
+            defaults to the best available)
+        max_workers (int): The maximum number of ping subprocesses at once.
+
+    Returns:
+        OrderedDict: Results keyed by host in the order given.
+            ({str: PingResult})
+
+    Raises:
+        RuntimeError: The probe method is invalid or unavailable.
+    """
+
+    method = method or _best_probe_method(tcp_port)
+
+    if method not in ('icmp', 'tcp', 'subprocess'):
+        raise RuntimeError("Invalid probe method '{}'!".format(method))
+    elif method == 'tcp' and tcp_port is None:
+        raise RuntimeError('TCP probes require a port!')
+    elif method == 'subprocess':
+        pool = ThreadPool(max(1, min(len(hosts_or_ips), max_workers)))
+        try:
+            results = pool.map(lambda h: _ping(h, count), hosts_or_ips)
+        finally:
+            pool.close()
+            pool.join()
+
+        return OrderedDict((r.host, r) for r in results)
+
+    addresses = OrderedDict()
+    errors = {}
+
+    for host in hosts_or_ips:
+        try:
+            addresses[host] = _resolve_probe_address(host, method, tcp_port)
+        except (socket.error, socket.gaierror) as e:
+            errors[host] = str(e)
+
+    rtts = _run_probe_loop(addresses, method, count, timeout, interval)
+
+    return OrderedDict((h, _probe_result(h,
+                                         method,
+                                         count,
+                                         rtts.get(h, []),
+                                         errors.get(h)))
+                       for h in hosts_or_ips)
+
+
+def _best_probe_method(tcp_port):
+    """Determine the best available probe method.
+
+    Args:
+        tcp_port (int): The port for TCP probes. (None disables TCP probes)
+
+    Returns:
+        str: The probe method. ('icmp', 'tcp' or 'subprocess')
+    """
+
+    try:
+        socket.socket(socket.AF_INET,
+                      socket.SOCK_DGRAM,
+                      socket.IPPROTO_ICMP).close()
+        return 'icmp'
+    except (socket.error, AttributeError):
+        return 'tcp' if tcp_port is not None else 'subprocess'
+
+
+def _resolve_probe_address(host_or_ip, method, tcp_port):
+    """Resolve a host to the socket address to probe.
+
+    Args:
+        host_or_ip (str): A valid hostname or IP address.
+        method (str): The probe method. ('icmp' or 'tcp')
+        tcp_port (int): The port for TCP probes.
+
+    Returns:
+        tuple: The address family and the socket address.
+    """
+
+    if method == 'icmp':
+        info = socket.getaddrinfo(host_or_ip, None, socket.AF_INET)
+    else:
+        info = socket.getaddrinfo(host_or_ip,
+                                  tcp_port,
+                                  socket.AF_UNSPEC,
+                                  socket.SOCK_STREAM)
+
+    return info[0][0], info[0][4]
+
+
+def _run_probe_loop(addresses, method, count, timeout, interval):
+    """Send probes to every host and collect the answers with a single
+    select-based event loop.
+
+    Args:
+        addresses (OrderedDict): The address family and socket address of
+            each host keyed by host.
+        method (str): The probe method. ('icmp' or 'tcp')
+        count (int): The number of probes to send to each host.
+        timeout (float): Seconds to wait for each reply.
+        interval (float): Seconds between the probes to a host.
+
+    Returns:
+        dict: Round trip times in milliseconds of the answered probes keyed by
+            host. ({str: list of float})
+    """
+
+    rtts = dict((h, []) for h in addresses)
+    start = time()
+    schedule = deque(sorted((start + i * interval, n, h)
+                            for n, h in enumerate(addresses)
+                            for i in range(count)))
+    pending = {}    # Outstanding probes keyed by sequence or TCP socket.
+    sequence = itertools.count(1)
+    icmp_sock = None
+
+    if method == 'icmp':
+        try:
+            icmp_sock = socket.socket(socket.AF_INET,
+                                      socket.SOCK_DGRAM,
+                                      socket.IPPROTO_ICMP)
+        except (socket.error, AttributeError) as e:
+            raise RuntimeError('ICMP probes are unavailable: {}'.format(e))
+        icmp_sock.setblocking(False)
+
+    try:
+        while schedule or pending:
+            now = time()
+
+            # Send the probes which are due.
+            while schedule and schedule[0][0] <= now:
+                _, _, host = schedule.popleft()
+                family, address = addresses[host]
+
+                if icmp_sock is not None:
+                    seq = next(sequence) & 0xffff
+                    try:
+                        icmp_sock.sendto(_icmp_echo_request(seq), address)
+                        pending[seq] = (host, time())
+                    except socket.error:
+                        pass    # Counts as a lost probe.
+                    continue
+
+                sock = socket.socket(family, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                sent = time()
+                err = sock.connect_ex(address)
+
+                if err in (0, errno.ECONNREFUSED):
+                    rtts[host].append((time() - sent) * 1000)
+                    sock.close()
+                elif err in (errno.EINPROGRESS, errno.EWOULDBLOCK,
+                             errno.EAGAIN):
+                    pending[sock] = (host, sent)
+                else:
+                    sock.close()
+
+            # Wait for answers until the next probe is due or one expires.
+            wake = [t + timeout for _, t in pending.values()]
+            wake += [schedule[0][0]] if schedule else []
+            wait = max(0, min(wake) - time()) if wake else 0
+            readers = [icmp_sock] if icmp_sock is not None and pending else []
+            writers = [k for k in pending if not isinstance(k, int)]
+
+            if readers or writers:
+                readable, writable, _ = select.select(readers,
+                                                      writers,
+                                                      [],
+                                                      wait)
+            else:
+                sleep(wait)
+                readable, writable = [], []
+
+            now = time()
+
+            if readable:
+                for seq in _read_icmp_replies(icmp_sock):
+                    if seq in pending:
+                        host, sent = pending.pop(seq)
+                        rtts[host].append((now - sent) * 1000)
+
+            for sock in writable:
+                host, sent = pending.pop(sock)
+                err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if err in (0, errno.ECONNREFUSED):
+                    rtts[host].append((now - sent) * 1000)
+                sock.close()
+
+            # Expire the probes which were not answered in time.
+            for key, (_, sent) in list(pending.items()):
+                if now - sent >= timeout:
+                    del pending[key]
+                    if not isinstance(key, int):
+                        key.close()
+    finally:
+        for key in pending:
+            if not isinstance(key, int):
+                key.close()
+        if icmp_sock is not None:
+            icmp_sock.close()
+
+    return rtts
+
+
+def _icmp_echo_request(seq):
+    """Build an ICMP echo request. The kernel sets the identifier of echo
+    requests sent on ICMP datagram sockets.
+
+    Args:
+        seq (int): The sequence number of the request.
+
+    Returns:
+        bytes: The ICMP packet.
+    """
+
+    header = struct.pack('!BBHHH', 8, 0, 0, 0, seq)
+    data = bytearray(header + icmp_echo_payload)
+    checksum = 0
+
+    for i in range(0, len(data), 2):
+        checksum += (data[i] << 8) + (data[i + 1] if i + 1 < len(data) else 0)
+
+    checksum = (checksum >> 16) + (checksum & 0xffff)
+    checksum = ~(checksum + (checksum >> 16)) & 0xffff
+
+    return struct.pack('!BBHHH', 8, 0, checksum, 0, seq) + icmp_echo_payload
+
 
-    Note: this function uses an exponential back-off for retries which means the
-    more retries specified the longer the wait between each retry. The total
-    wait time is on the fibonacci sequence. (https://bit.ly/1ee23o9)
+def _read_icmp_replies(icmp_sock):
+    """Read every pending ICMP echo reply from a non-blocking socket.
 
     Args:
-        os_api_conn (openstack.connection.Connection): An authorized API
-            connection to the 'default' cloud on the OpenStack infrastructure.
-        os_service (str): The service to inspect for object state.
-            (e.g. 'server', 'network', 'floating_ip')
-        os_object (munch.Munch): The OpenStack object to inspect. (Note: this
-            can also OpenStack resource types: https://bit.ly/2R7yjbi)
-        os_prop_name (str): The name of the OpenStack object property to
-            inspect.
-        expected_value (str): The expected value for the given property.
-        retries (int): The maximum number of retry attempts.
-        show_warnings (bool): Flag for displaying warnings while attempting
-            validate properties.(VERY NOISY!)
-        case_insensitive (bool): Flag for controlling whether to match case
-            sensitive or not for the 'expected_value'.
-        only_extended_props (bool): Flag for forcing searching of ONLY extended
-            OpenStack properties on the given OpenStack object.
+        icmp_sock (socket.socket): An ICMP datagram socket.
 
     Returns:
-        bool: Whether the property matched the expected value.
-
-    Raises:
-        RuntimeError: Invalid service specified.
-        RuntimeError: The property was not found on the given object.
+        list of int: The sequence numbers of the replies.
     """
 
-    try:
-        get_service_method = getattr(os_api_conn, "get_{}".format(os_service))
-    except AttributeError:
-        raise RuntimeError("Invalid '{}' service specified!".format(os_service))
+    sequences = []
 
-    for attempt in range(1, retries + 1):
-        result = get_service_method(os_object.id)
+    while True:
+        try:
+            data = bytearray(icmp_sock.recv(1024))
+        except socket.error:
+            return sequences
 
-        # Search direct properties and extended properties.
-        if not only_extended_props and os_prop_name in result:
-            actual_value = str(result[os_prop_name])
-        elif 'properties' in result and os_prop_name in result['properties']:
-            actual_value = str(result['properties'][os_prop_name])
-        else:
-            raise RuntimeError(
-                "The '{}' property was not "
-                "found on the given object!\n\n"
-                "Object properties:\n\n"
-                "{}".format(os_prop_name, pformat(dict(result), indent=4))
-            )
+        # Some platforms include the IP header on ICMP datagram sockets.
+        if len(data) >= 20 and data[0] >> 4 == 4:
+            data = data[(data[0] & 0x0f) * 4:]
 
-        if actual_value == expected_value:
-            return True
-        elif actual_value.lower() == expected_value and case_insensitive:
-            return True
-        else:
-            if show_warnings:
-                warning_message = (
-                    "Validation attempt: #{}\n"
-                    "Object ID: '{}'\n"
-                    "Property name: '{}'\n"
-                    "Expected value: '{}'\n"
-                    "Actual value: '{}'".format(
-                        attempt,
-                        os_object.id,
-                        os_prop_name,
-                        expected_value,
-                        actual_value
-                    )
-                )
-                warn(UserWarning(warning_message))
+        if len(data) >= 8 and data[0] == 0:     # Echo reply
+            sequences.append(struct.unpack('!H', bytes(data[6:8]))[0])
 
-        sleep(attempt)
 
-    return False
+def _probe_result(host_or_ip, method, sent, rtts, output=None):
+    """Summarise the probes sent to a host.
+
+    Args:
+        host_or_ip (str): The probed hostname or IP address.
+        method (str): The probe method. ('icmp' or 'tcp')
+        sent (int): The number of probes sent.
+        rtts (list of float): Round trip times of the answered probes.
+        output (str): Output describing the probes. (generated if None)
 
+    Returns:
+        PingResult: The outcome of the probes.
+    """
 
-def ping_from_mnaio(host_or_ip, retries=10):
-    """Verify that a host can be pinged from the MNAIO deployment host.
+    received = len(rtts)
+    loss = 100.0 * (sent - received) / sent if sent else 100.0
+
+    if output is None:
+        output = '{}: {} probes sent, {} received, {:.0f}% loss'.format(
+            method, sent, received, loss
+        )
+        if rtts:
+            output += ', rtt min/avg/max = {:.3f}/{:.3f}/{:.3f} ms'.format(
+                min(rtts), sum(rtts) / received, max(rtts)
+            )
+
+    return PingResult(host_or_ip,
+                      received > 0,
+                      sent,
+                      received,
+                      loss,
+                      min(rtts) if rtts else None,
+                      sum(rtts) / received if rtts else None,
+                      max(rtts) if rtts else None,
+                      1,
+                      method,
+                      output)
 
-    Note: this function uses an exponential back-off for retries which means the
-    more retries specified the longer the wait between each retry. The total
-    wait time is on the fibonacci sequence. (https://bit.ly/1ee23o9)
+
+def _ping(host_or_ip, count):
+    """Ping a host with a ping subprocess and capture its output.
 
     Args:
         host_or_ip (str): A valid hostname or IP address to ping.
-        retries (int): The maximum number of retry attempts.
+        count (int): The number of packets to send.
 
     Returns:
-        bool: True if host was successfully pinged otherwise False.
+        PingResult: The outcome of the attempt.
     """
 
     # Ping command count option as function of OS
     param = '-n' if system().lower() == 'windows' else '-c'
 
-    # Building the command. Ex: "ping_from_mnaio -c 1 google.com"
-    command = ['ping', param, '1', host_or_ip]
-
-    # Pinging
-    for attempt in range(1, retries + 1):
-        if call(command) == 0:
-            return True
+    try:
+        process = Popen(['ping', param, str(count), host_or_ip],
+                        stdout=PIPE,
+                        stderr=STDOUT,
+                        universal_newlines=True)
+        output = process.communicate()[0]
+        rc = process.returncode
+    except (IOError, OSError) as e:
+        output, rc = str(e), -1
 
-        sleep(attempt)
+    packets = ping_packets_regex.search(output)
+    rtt = ping_rtt_regex.search(output)
+    sent, received = (int(g) for g in packets.groups()) if packets else \
+        (count, count if rc == 0 else 0)
+    rtt_min, rtt_avg, rtt_max = (float(g) for g in rtt.groups()) if rtt else \
+        (None, None, None)
 
-    return False
+    return PingResult(host_or_ip,
+                      received > 0,
+                      sent,
+                      received,
+                      100.0 * (sent - received) / sent if sent else 100.0,
+                      rtt_min,
+                      rtt_avg,
+                      rtt_max,
+                      1,
+                      'subprocess',
+                      output)
 
 
 def generate_random_string(string_length=10):
@@ -151,7 +3736,52 @@ def generate_random_string(string_length=10):
     return random_str[0:string_length]  # Return the random_str string.
 
 
-def run_on_container(command, container_type, run_on_host):
+def get_container_inventory(run_on_host):
+    """Retrieve the cached container inventory for a host, creating it on
+    first use.
+
+    Args:
+        run_on_host (testinfra.Host): Testinfra host object to list the
+                                      containers on.
+
+    Returns:
+        ContainerInventory: The container inventory for the host.
+    """
+
+    with _container_inventories_lock:
+        inventory = _container_inventories.get(run_on_host)
+        if inventory is None:
+            inventory = ContainerInventory(run_on_host)
+            _container_inventories[run_on_host] = inventory
+
+    return inventory
+
+
+def invalidate_container_inventory(run_on_host=None):
+    """Discard the cached container inventory of a host so that the next
+    lookup lists the containers again.
+
+    Args:
+        run_on_host (testinfra.Host): The host to discard the inventory of.
+            (all hosts if None)
+    """
+
+    with _container_inventories_lock:
+        if run_on_host is None:
+            inventories = list(_container_inventories.values())
+        else:
+            inventories = [_container_inventories.get(run_on_host)]
+
+    for inventory in inventories:
+        if inventory is not None:
+            inventory.invalidate()
+
+
+def run_on_container(command,
+                     container_type,
+                     run_on_host,
+                     container_name=None,
+                     use_inventory=False):
     """Run the given command on the given container.
 
     Args:
@@ -159,16 +3789,200 @@ def run_on_container(command, container_type, run_on_host):
         container_type (str): The container type to run the command on.
         run_on_host (testinfra.Host): Testinfra host object to execute the
                                       wrapped command on.
+        container_name (str): The exact name of the container to attach to.
+            Takes precedence over 'container_type'.
+        use_inventory (bool): Flag for resolving 'container_type' through the
+            cached container inventory of the host instead of listing the
+            containers on every call. The inventory is refreshed once if the
+            attach fails.
 
     Returns:
         testinfra.CommandResult: Result of command execution.
+
+    Raises:
+        RuntimeError: No container matches the container type.
+    """
+
+    if container_name is not None:
+        return run_on_host.run(_attach_command(command, container_name))
+    elif not use_inventory:
+        pre_command = ("lxc-attach "
+                       "-n $(lxc-ls -1 | grep {} | head -n 1) "
+                       "-- bash -c".format(container_type))
+        cmd = "{} '{}'".format(pre_command, command)
+        return run_on_host.run(cmd)
+
+    inventory = get_container_inventory(run_on_host)
+
+    for _ in range(2):
+        container_name = inventory.resolve(container_type)
+
+        if container_name is None:
+            raise RuntimeError("No '{}' container found!".format(
+                container_type
+            ))
+
+        result = run_on_host.run(_attach_command(command, container_name))
+
+        if result.rc == 0 or 'lxc-attach' not in (result.stderr or ''):
+            break
+
+        inventory.invalidate()   # The container may have been replaced.
+
+    return result
+
+
+def run_on_all_containers(command,
+                          container_type,
+                          run_on_hosts,
+                          concurrency=10,
+                          timeout=None):
+    """Run the given command concurrently on every container of the given
+    type across one or more hosts.
+
+    Args:
+        command (str): The bash command to run.
+        container_type (str): The container type to run the command on.
+        run_on_hosts (testinfra.Host or list of testinfra.Host): Testinfra
+            host objects to execute the wrapped command on.
+        concurrency (int): The maximum number of commands to run at once.
+        timeout (int): Seconds after which the command in a container is
+            killed. (exit status 124, no timeout if None)
+
+    Returns:
+        OrderedDict: Results of command execution keyed by container name,
+            ordered by host and then best match first.
+            ({str: testinfra.CommandResult})
+
+    Raises:
+        RuntimeError: No container matches the container type.
+    """
+
+    if not isinstance(run_on_hosts, (list, tuple)):
+        run_on_hosts = [run_on_hosts]
+
+    def _resolve(run_on_host):
+        names = get_container_inventory(run_on_host).resolve_all(
+            container_type
+        )
+
+        return [(run_on_host, name) for name in names]
+
+    def _run(target):
+        run_on_host, container_name = target
+        cmd = _attach_command(command, container_name)
+
+        if timeout is not None:
+            cmd = 'timeout {} {}'.format(timeout, cmd)
+
+        return container_name, run_on_host.run(cmd)
+
+    pool = ThreadPool(max(1, concurrency))
+
+    try:
+        targets = list(itertools.chain.from_iterable(
+            pool.map(_resolve, run_on_hosts)
+        ))
+
+        if not targets:
+            raise RuntimeError("No '{}' container found!".format(
+                container_type
+            ))
+
+        return OrderedDict(pool.map(_run, targets))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def run_on_container_batch(commands,
+                           container_type,
+                           run_on_host,
+                           setup=None,
+                           container_name=None,
+                           use_inventory=False):
+    """Run several commands on the given container through a single attach.
+
+    The setup command runs once before the batch and its effects (e.g.
+    sourced environment variables) are visible to every command. Each command
+    runs in its own subshell so that a failing or exiting command does not
+    stop the commands after it.
+
+    Args:
+        commands (list of str): Commands to run in order.
+        container_type (str): The container type to run the commands on.
+        run_on_host (testinfra.Host): Testinfra host object to execute the
+                                      wrapped commands on.
+        setup (str): Command to run once before the batch. (e.g. sourcing
+            '~/openrc')
+        container_name (str): The exact name of the container to attach to.
+            Takes precedence over 'container_type'.
+        use_inventory (bool): Flag for resolving 'container_type' through the
+            cached container inventory of the host.
+
+    Returns:
+        list of ContainerCommandResult: The result of each command in the
+            order given.
+
+    Raises:
+        RuntimeError: No container matches the container type.
+    """
+
+    delimiter = 'pytest-rpc-{}'.format(uuid.uuid4().hex)
+    script = [_text(setup)] if setup else []
+
+    for index, command in enumerate(commands):
+        script.append(
+            u"echo '{0} start {1}' ; echo '{0} start {1}' >&2\n"
+            u"(\n{2}\n)\n"
+            u"printf '\\n{0} end {1} %d\\n' $? ; "
+            u"printf '\\n{0} end {1}\\n' >&2".format(delimiter,
+                                                     index,
+                                                     _text(command))
+        )
+
+    # Encode the script so that no quoting is needed for the attach.
+    encoded = base64.b64encode(u'\n'.join(script).encode('utf-8'))
+    result = run_on_container(
+        'eval "$(echo {} | base64 -d)"'.format(encoded.decode('ascii')),
+        container_type,
+        run_on_host,
+        container_name=container_name,
+        use_inventory=use_inventory
+    )
+
+    stdout_regex = re.compile(r'^{0} start (\d+)\n(.*?)\n{0} end \1 (\d+)$'
+                              .format(delimiter), re.S | re.M)
+    stderr_regex = re.compile(r'^{0} start (\d+)\n(.*?)\n{0} end \1$'
+                              .format(delimiter), re.S | re.M)
+    stdouts = {int(m.group(1)): (m.group(2), int(m.group(3)))
+               for m in stdout_regex.finditer(result.stdout or '')}
+    stderrs = {int(m.group(1)): m.group(2)
+               for m in stderr_regex.finditer(result.stderr or '')}
+
+    results = []
+    for index, command in enumerate(commands):
+        stdout, rc = stdouts.get(index, ('', None))
+        results.append(ContainerCommandResult(command,
+                                              rc,
+                                              stdout,
+                                              stderrs.get(index, '')))
+
+    return results
+
+
+def _attach_command(command, container_name):
+    """Build the command for running a bash command in a named container.
+
+    Args:
+        command (str): The bash command to run.
+        container_name (str): The exact name of the container.
+
+    Returns:
+        str: The wrapped command.
     """
 
-    pre_command = ("lxc-attach "
-                   "-n $(lxc-ls -1 | grep {} | head -n 1) "
-                   "-- bash -c".format(container_type))
-    cmd = "{} '{}'".format(pre_command, command)
-    return run_on_host.run(cmd)
+    return "lxc-attach -n {} -- bash -c '{}'".format(container_name, command)
 
 
 def run_on_swift(cmd, run_on_host):
@@ -182,12 +3996,29 @@ def run_on_swift(cmd, run_on_host):
         testinfra.CommandResult: Result of command execution.
     """
 
-    command = (". ~/openrc ; "
-               ". /openstack/venvs/swift-*/bin/activate ; "
-               "{}".format(cmd))
+    command = "{} ; {}".format(swift_env_setup, cmd)
     return run_on_container(command, 'swift', run_on_host)
 
 
+def run_on_swift_batch(cmds, run_on_host):
+    """Run several commands on the swift container through a single attach,
+    preparing the swift environment only once.
+
+    Args:
+        cmds (list of str): Commands to run in order.
+        run_on_host (testinfra.Host): Testinfra host object to execute the
+                                      wrapped commands on.
+    Returns:
+        list of ContainerCommandResult: The result of each command in the
+            order given.
+    """
+
+    return run_on_container_batch(cmds,
+                                  'swift',
+                                  run_on_host,
+                                  setup=swift_env_setup)
+
+
 def parse_swift_recon(recon_out):
     """Parse swift-recon output into list of lists grouped by the content of
     the delimited blocks.
@@ -210,19 +4041,127 @@ def parse_swift_recon(recon_out):
     ============================================================================
     """
 
-    lines = recon_out.splitlines()
-    delimiter_regex = re.compile(r'^={79}')
-    collection = []
+    return list(iter_swift_recon(recon_out))
+
+
+def iter_swift_recon(recon_out):
+    """Parse swift-recon output in a single pass, yielding the lines of each
+    delimited block as soon as the block ends. Only the current block is held
+    in memory so output can be streamed straight from the remote command.
+
+    Lines before the first delimiter and after the last delimiter are
+    discarded.
+
+    Args:
+        recon_out (str or iterable): CLI output from the `swift-recon`
+            command, either as a string or as an iterable of lines. (e.g. a
+            file object or a paramiko channel file)
+
+    Yields:
+        list of str: The lines of a delimited block without line endings.
+
+    Example:
+        >>> with open('recon.out') as f:
+        ...     for block in iter_swift_recon(f):
+        ...         print(block[0])
+    """
+
+    block = None    # No block until the first delimiter.
+
+    for line in _iter_lines(recon_out):
+        if swift_recon_delimiter_regex.match(line):
+            if block is not None:
+                yield block
+            block = []
+        elif block is not None:
+            block.append(line)
+
+
+def _iter_lines(output):
+    """Iterate over the lines of command output without copying the whole
+    output.
+
+    Args:
+        output (str or iterable): The output as a string or as an iterable of
+            lines. (str or bytes)
+
+    Yields:
+        str: Each line without its line ending.
+    """
+
+    if isinstance(output, (str, bytes, type(u''))):
+        output = _split_lines(output)
+
+    for line in output:
+        if isinstance(line, bytes) and not isinstance(line, str):
+            line = line.decode('utf-8', 'replace')
+        yield line.rstrip('\r\n')
+
+
+def _split_lines(text):
+    """Split a string into lines lazily.
+
+    Args:
+        text (str): The string to split.
+
+    Yields:
+        str: Each line with its line ending.
+    """
+
+    start = 0
+    newline = b'\n' if isinstance(text, bytes) else u'\n'
+
+    while start < len(text):
+        end = text.find(newline, start)
+        end = len(text) if end == -1 else end + 1
+        yield text[start:end]
+        start = end
+
+
+def parse_swift_recon_report(recon_out):
+    """Parse swift-recon output into a report of typed checks in a single
+    pass.
+
+    Args:
+        recon_out (str or iterable): CLI output from the `swift-recon`
+            command, either as a string or as an iterable of lines.
+
+    Returns:
+        SwiftReconReport: The parsed report.
+    """
+
+    report = SwiftReconReport()
+
+    for block in iter_swift_recon(recon_out):
+        check = None
+
+        for line in block:
+            start = swift_recon_check_regex.match(line)
+
+            if start:
+                check = SwiftReconCheck(
+                    start.group(2),
+                    datetime.strptime(start.group(1), '%Y-%m-%d %H:%M:%S')
+                )
+                report.checks.append(check)
+                continue
+            elif check is None:
+                header = swift_recon_header_regex.match(line)
+                if header:
+                    report.hosts = int(header.group(1))
+                    report.server_type = header.group(2)
+                continue
+
+            matched = (check.matched is None and
+                       swift_recon_match_regex.match(line))
 
-    delimiter_positions = [ind for ind, x in enumerate(lines)
-                           if delimiter_regex.match(x)]
+            if matched:
+                check.matched, check.total, check.errors = \
+                    (int(g) for g in matched.groups())
+            elif line.strip():
+                check.details.append(line)
 
-    for ind, delimiter_position in enumerate(delimiter_positions):
-        if ind != len(delimiter_positions) - 1:  # Are in the last position?
-            start = delimiter_position + 1
-            end = delimiter_positions[ind + 1]
-            collection.append(lines[start:end])
-    return collection
+    return report
 
 
 def parse_swift_ring_builder(ring_builder_output):
@@ -243,16 +4182,218 @@ def parse_swift_ring_builder(ring_builder_output):
          'partitions': 256.0}
     """
 
-    swift_data = {}
-    swift_lines = ring_builder_output.split('\n')
-    matching = [s for s in swift_lines if "partitions" and "dispersion" in s]
-    if matching:
-        elements = [s.strip() for s in matching[0].split(',')]
-        for element in elements:
-            v, k = element.split(' ')
-            swift_data[k] = float(v)
+    return parse_swift_ring(ring_builder_output).summary
+
+
+def parse_swift_ring(ring_builder_output):
+    """Parse the summary and the device table of swift-ring-builder output in
+    a single pass. Both the combined 'ip address:port' and the separate 'ip
+    address' and 'port' column layouts are supported.
+
+    Args:
+        ring_builder_output (str or iterable): The output from the
+            swift-ring-builder command, either as a string or as an iterable
+            of lines.
+
+    Returns:
+        SwiftRing: The summary and the device table. (empty if parse fails)
+    """
+
+    summary = {}
+    devices = SwiftRingDevices()
+    header = None
+
+    for line in _iter_lines(ring_builder_output):
+        if header is not None:
+            fields = line.split()
+            if fields and fields[0].isdigit():
+                device = _parse_swift_ring_device(fields, header)
+                if device is not None:
+                    devices.append(device)
+        elif line.startswith('Devices:'):
+            header = line.split()
+        elif not summary and 'partitions' in line and 'dispersion' in line:
+            try:
+                for element in line.split(','):
+                    v, k = element.split()
+                    summary[k] = float(v)
+            except ValueError:
+                summary = {}
+
+    return SwiftRing(summary, devices)
+
+
+def _parse_swift_ring_device(fields, header):
+    """Parse a row of the swift-ring-builder device table.
+
+    Args:
+        fields (list of str): The whitespace separated fields of the row.
+        header (list of str): The whitespace separated fields of the header.
+
+    Returns:
+        SwiftRingDevice: The device or None if the row is malformed.
+    """
+
+    try:
+        if 'address:port' in header:
+            ip, port = _split_address(fields[3])
+            replication_ip, replication_port = _split_address(fields[4])
+            rest = fields[5:]
+        else:
+            ip, port = fields[3], int(fields[4])
+            replication_ip, replication_port = fields[5], int(fields[6])
+            rest = fields[7:]
+
+        name, weight, partitions, balance = rest[:4]
+        flags = ''
+        meta = rest[4:]
+
+        if 'flags' in header and meta and meta[0] in swift_ring_device_flags:
+            flags = meta.pop(0)
+
+        return SwiftRingDevice(int(fields[0]),
+                               int(fields[1]),
+                               int(fields[2]),
+                               ip,
+                               port,
+                               replication_ip,
+                               replication_port,
+                               name,
+                               float(weight),
+                               int(partitions),
+                               float(balance),
+                               flags,
+                               ' '.join(meta))
+    except (IndexError, ValueError):
+        return None
+
+
+def _split_address(address):
+    """Split an 'ip:port' address. IPv6 addresses may be bracketed.
+
+    Args:
+        address (str): The address to split. (e.g. '10.0.0.1:6000')
+
+    Returns:
+        tuple of (str, int): The IP address and the port.
+    """
+
+    ip, port = address.rsplit(':', 1)
+
+    return ip.strip('[]'), int(port)
+
+
+def get_openstack_release(run_on_host):
+    """Retrieve the OpenStack release of a host from '/etc/openstack-release'.
+
+    Args:
+        run_on_host (testinfra.host.Host): Testinfra host fixture
+
+    Returns:
+        str: OpenStack release (e.g. '16.0.4'), None if lookup fails
+    """
+
+    result = run_on_host.run('cat /etc/openstack-release')
+    match = re.search(r'^DISTRIB_RELEASE="?r?([^"\s]+)',
+                      result.stdout or '',
+                      re.M)
+
+    return match.group(1) if match else None
+
+
+def discover_service_versions(os_api_conn,
+                              services=None,
+                              max_workers=5,
+                              os_api_conn_manager=None):
+    """Discover the API versions of OpenStack services from their version
+    documents using an authenticated API connection. The services are
+    discovered concurrently.
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+        services (list of str): The services to discover. (defaults to
+            cinder, nova, neutron, glance and swift)
+        max_workers (int): The maximum number of concurrent discoveries.
+        os_api_conn_manager (OsConnectionManager): Provides a connection for
+            each concurrent discovery. (all discoveries share 'os_api_conn' if
+            None)
+
+    Returns:
+        OrderedDict: Discovered versions keyed by service name.
+            ({str: OsServiceVersion})
+
+    Raises:
+        RuntimeError: An unknown service was requested.
+    """
+
+    services = list(services or os_version_services)
+    unknown = [s for s in services if s not in os_version_services]
+
+    if unknown:
+        raise RuntimeError('Unknown services: {}'.format(', '.join(unknown)))
+
+    def _discover(service):
+        try:
+            with _worker_connection(os_api_conn, os_api_conn_manager) as conn:
+                data = getattr(conn,
+                               os_version_services[service]).get_endpoint_data()
+        except Exception as e:
+            return OsServiceVersion(service, None, None, None, None, None, e)
+
+        if data is None:
+            return OsServiceVersion(service, None, None, None, None, None,
+                                    RuntimeError('No endpoint found!'))
+
+        return OsServiceVersion(service,
+                                data.service_type,
+                                _version_tuple(data.api_version),
+                                _version_tuple(data.min_microversion),
+                                _version_tuple(data.max_microversion),
+                                data.url,
+                                None)
+
+    pool = ThreadPool(max(1, min(len(services), max_workers)))
+
+    try:
+        return OrderedDict((v.service, v) for v in pool.map(_discover,
+                                                            services))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _version_tuple(version):
+    """Convert a discovered version to a tuple of integers.
+
+    Args:
+        version (tuple): The version from keystoneauth. (may hold floats)
+
+    Returns:
+        tuple of int: The version or None if there is no version.
+    """
+
+    return tuple(int(v) for v in version) if version else None
+
+
+def get_cinder_api_major_version(os_api_conn):
+    """Retrieve the major version of the block storage API from its version
+    document. (see 'discover_service_versions')
+
+    Note: this is the version of the cinder API (e.g. 3) which is unrelated
+    to the version of the cinder client. (see 'get_cinder_major_version')
+
+    Args:
+        os_api_conn (openstack.connection.Connection): An authorized API
+            connection to the 'default' cloud on the OpenStack infrastructure.
+
+    Returns:
+        int: The block storage API major version, -1 if discovery fails.
+    """
+
+    version = discover_service_versions(os_api_conn, ['cinder'])['cinder']
 
-    return swift_data
+    return version.api_version[0] if version.api_version else -1
 
 
 def get_cinder_major_version(run_on_host):
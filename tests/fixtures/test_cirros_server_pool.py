@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the warm Cirros server pool wiring of the 'cirros_server_pool'
+and 'tiny_cirros_server' fixtures."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+import itertools
+from collections import namedtuple
+from pytest_rpc.fixtures import _reset_server
+
+pytest_plugins = 'pytester'
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+FakeFloatingIp = namedtuple('FakeFloatingIp', ('id', 'floating_ip_address'))
+
+
+class FakeServer(dict):
+    """A server which works like a munch.Munch object with an ID."""
+
+    @property
+    def id(self):
+        return self['id']
+
+
+session_properties_conftest = """
+import pytest
+
+
+@pytest.fixture(scope='session')
+def openstack_session_properties():
+    properties = {'cirros_image': 'cirros',
+                  'tiny_flavor': 'm1.tiny',
+                  'test_network': 'PRIVATE',
+                  'network_name': 'PUBLIC',
+                  'key_name': 'rpc_support',
+                  'security_group': 'default'}
+
+    return lambda: properties
+"""
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def healthy(mocker):
+    """Report every server as active and reachable.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        tuple of Mock: The mocked 'expect_os_properties' and 'ping_from_mnaio'
+            helpers.
+    """
+
+    return (mocker.patch('pytest_rpc.helpers.expect_os_properties',
+                         return_value=True),
+            mocker.patch('pytest_rpc.helpers.ping_from_mnaio',
+                         return_value=True))
+
+
+@pytest.fixture
+def connections(mocker):
+    """Replace the cloud connection with fake API connections which boot
+    servers 's1', 's2', ... in call order.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        list of Mock: Every fake API connection in the order created.
+    """
+
+    server_ids = itertools.count(1)
+    fip_ids = itertools.count(1)
+    created = []
+
+    def _create_floating_ip(**kwargs):
+        fip_id = next(fip_ids)
+        return FakeFloatingIp('fip-{}'.format(fip_id),
+                              '10.0.0.{}'.format(fip_id))
+
+    def _connect():
+        conn = mocker.Mock()
+        for resource_type in ('flavor', 'image', 'network', 'security_group'):
+            getattr(conn, 'list_{}s'.format(resource_type)).return_value = []
+        conn.create_server.side_effect = \
+            lambda **kwargs: FakeServer(id='s{}'.format(next(server_ids)))
+        conn.create_floating_ip.side_effect = _create_floating_ip
+        conn.list_servers.return_value = []
+        created.append(conn)
+
+        return conn
+
+    mocker.patch('pytest_rpc.fixtures._connect_to_cloud', side_effect=_connect)
+
+    return created
+
+
+def _calls(connections, method):
+    """Count the calls of an API method across every connection.
+
+    Args:
+        connections (list of Mock): The fake API connections.
+        method (str): The dotted path of the method. (e.g. 'compute.reboot')
+
+    Returns:
+        int: The number of calls.
+    """
+
+    total = 0
+
+    for conn in connections:
+        mock_method = conn
+        for name in method.split('.'):
+            mock_method = getattr(mock_method, name)
+        total += mock_method.call_count
+
+    return total
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_reset_reboot(mocker, healthy):
+    """Verify that a reboot reset hard reboots the server, waits for the
+    reboot to finish and pings the server.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        healthy (tuple of Mock): The mocked health check helpers.
+    """
+
+    mock_expect, mock_ping = healthy
+    conn = mocker.Mock()
+    server = FakeServer(id='s1', accessIPv4='10.0.0.1')
+
+    assert _reset_server(conn, server, 'reboot')
+    conn.compute.reboot_server.assert_called_once_with('s1', 'HARD')
+    assert not conn.rebuild_server.called
+    assert mock_expect.call_args[1]['expected_props'][
+        'OS-EXT-STS:task_state'] == 'None'
+    mock_ping.assert_called_once_with('10.0.0.1')
+
+
+def test_reset_rebuild(mocker, healthy):
+    """Verify that a rebuild reset rebuilds the server from its image.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        healthy (tuple of Mock): The mocked health check helpers.
+    """
+
+    conn = mocker.Mock()
+    server = FakeServer(id='s1', image={'id': 'cirros-id'})
+
+    assert _reset_server(conn, server, 'rebuild')
+    assert conn.rebuild_server.call_args[0] == ('s1', 'cirros-id')
+    assert not conn.compute.reboot_server.called
+
+
+def test_reset_unhealthy(mocker, healthy):
+    """Verify that a server which does not become active again is unhealthy
+    and is not pinged.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        healthy (tuple of Mock): The mocked health check helpers.
+    """
+
+    mock_expect, mock_ping = healthy
+    mock_expect.return_value = False
+
+    assert not _reset_server(mocker.Mock(),
+                             FakeServer(id='s1', accessIPv4='10.0.0.1'),
+                             'reboot')
+    assert not mock_ping.called
+
+
+def test_reset_unreachable(mocker, healthy):
+    """Verify that a server which does not answer pings is unhealthy.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        healthy (tuple of Mock): The mocked health check helpers.
+    """
+
+    healthy[1].return_value = False
+
+    assert not _reset_server(mocker.Mock(),
+                             FakeServer(id='s1', accessIPv4='10.0.0.1'),
+                             'reboot')
+
+
+def test_pool_lease_and_reset(testdir, healthy, connections):
+    """Verify that tests lease the same warm server, that it is reset after
+    every test and that it and its floating IP are deleted when the session
+    ends without sweeping unattached floating IPs.
+
+    Args:
+        testdir (Testdir): A temporary pytest project.
+        healthy (tuple of Mock): The mocked health check helpers.
+        connections (list of Mock): Every fake API connection.
+    """
+
+    testdir.makeconftest(session_properties_conftest)
+    testdir.makepyfile("""
+        def test_first(tiny_cirros_server):
+            assert tiny_cirros_server.id == 's1'
+
+        def test_second(tiny_cirros_server):
+            assert tiny_cirros_server.id == 's1'
+    """)
+
+    result = testdir.runpytest('-p', 'pytest_rpc',
+                               '-p', 'no:cacheprovider',
+                               '--rpc-server-pool-size', '1')
+
+    result.assert_outcomes(passed=2)
+    assert _calls(connections, 'create_server') == 1
+    assert _calls(connections, 'compute.reboot_server') == 2
+    assert _calls(connections, 'delete_server') == 1
+    assert _calls(connections, 'delete_floating_ip') == 1
+    assert _calls(connections, 'delete_unattached_floating_ips') == 0
+
+
+def test_pool_replaces_unhealthy(testdir, healthy, connections):
+    """Verify that a server which fails its reset is discarded and replaced
+    and that only the floating IPs created for the pool are deleted.
+
+    Args:
+        testdir (Testdir): A temporary pytest project.
+        healthy (tuple of Mock): The mocked health check helpers.
+        connections (list of Mock): Every fake API connection.
+    """
+
+    healthy[1].side_effect = [False, True]
+
+    testdir.makeconftest(session_properties_conftest)
+    testdir.makepyfile("""
+        def test_first(tiny_cirros_server):
+            assert tiny_cirros_server.id == 's1'
+
+        def test_second(tiny_cirros_server):
+            assert tiny_cirros_server.id == 's2'
+    """)
+
+    result = testdir.runpytest('-p', 'pytest_rpc',
+                               '-p', 'no:cacheprovider',
+                               '--rpc-server-pool-size', '1')
+
+    result.assert_outcomes(passed=2)
+    assert _calls(connections, 'create_server') == 2
+    assert _calls(connections, 'delete_server') == 2
+    assert _calls(connections, 'delete_floating_ip') == 2
+    assert _calls(connections, 'delete_unattached_floating_ips') == 0
+
+
+def test_destructive(testdir):
+    """Verify that tests marked as 'destructive' get a server of their own
+    while other tests lease from the pool and return the server.
+
+    Args:
+        testdir (Testdir): A temporary pytest project.
+    """
+
+    testdir.makeconftest("""
+        import pytest
+
+
+        class FakePool(object):
+            def __init__(self):
+                self.leased = 0
+                self.released = []
+
+            def lease(self):
+                self.leased += 1
+                return 'pooled'
+
+            def release(self, server):
+                self.released.append(server)
+
+
+        @pytest.fixture(scope='session')
+        def cirros_server_pool():
+            return FakePool()
+
+
+        @pytest.fixture
+        def create_server():
+            return lambda **kwargs: 'created'
+
+
+        @pytest.fixture
+        def openstack_properties():
+            return dict.fromkeys(('cirros_image',
+                                  'tiny_flavor',
+                                  'test_network',
+                                  'key_name',
+                                  'security_group'))
+    """)
+    testdir.makepyfile("""
+        import pytest
+
+
+        @pytest.mark.destructive
+        def test_destructive(tiny_cirros_server, cirros_server_pool):
+            assert tiny_cirros_server == 'created'
+            assert cirros_server_pool.leased == 0
+
+        def test_pooled(tiny_cirros_server, cirros_server_pool):
+            assert tiny_cirros_server == 'pooled'
+            assert cirros_server_pool.released == []
+
+        def test_released(cirros_server_pool):
+            assert cirros_server_pool.leased == 1
+            assert cirros_server_pool.released == ['pooled']
+    """)
+
+    result = testdir.runpytest('-p', 'pytest_rpc', '-p', 'no:cacheprovider')
+
+    result.assert_outcomes(passed=3)
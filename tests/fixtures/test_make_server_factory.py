@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the batch server factory built by '_make_server_factory'."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+from collections import namedtuple
+from pytest_rpc.helpers import (RetryPolicy,
+                                OsConnectionManager,
+                                OsResourceResolver)
+from pytest_rpc.fixtures import _make_server_factory
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+FakeFloatingIp = namedtuple('FakeFloatingIp', ('floating_ip_address',))
+
+
+class FakeServer(dict):
+    """A server which works like a munch.Munch object with an ID."""
+
+    @property
+    def id(self):
+        return self['id']
+
+
+def _state(server_id, status):
+    """Build the listed state of a server.
+
+    Args:
+        server_id (str): The server ID.
+        status (str): The server status. ('ACTIVE', 'BUILD' or 'ERROR')
+
+    Returns:
+        dict: The state as returned by 'list_servers'.
+    """
+
+    active = status == 'ACTIVE'
+
+    return {'id': server_id,
+            'status': status,
+            'OS-EXT-STS:power_state': 1 if active else 0,
+            'OS-EXT-STS:vm_state': 'active' if active else status.lower()}
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def mock_os_api_conn(mocker):
+    """An API connection which boots servers 's1', 's2', ... in call order.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        Mock: A fake API connection.
+    """
+
+    conn = mocker.Mock()
+    counter = iter(range(1, 100))
+    conn.create_server.side_effect = \
+        lambda **kwargs: FakeServer(id='s{}'.format(next(counter)))
+    mocker.patch('pytest_rpc.helpers.sleep', autospec=True)
+
+    return conn
+
+
+@pytest.fixture
+def batch(mock_os_api_conn):
+    """The batch factory built around the fake API connection.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+
+    Returns:
+        tuple: The batch factory and the list of servers registered for
+            teardown.
+    """
+
+    servers = []
+    manager = OsConnectionManager(lambda: mock_os_api_conn)
+    factory = _make_server_factory(mock_os_api_conn,
+                                   manager,
+                                   {'network_name': 'PUBLIC'},
+                                   servers)
+
+    return factory.batch, servers
+
+
+def _create(factory, count, **kwargs):
+    """Create a batch of servers with the default test arguments.
+
+    Args:
+        factory (def): The batch factory.
+        count (int): The number of servers to create.
+
+    Returns:
+        list of ServerBatchResult: The batch results.
+    """
+
+    args = {'flavor': 'm1.tiny',
+            'network': 'PRIVATE',
+            'key_name': 'rpc_support',
+            'security_groups': ['default'],
+            'image': 'cirros',
+            'auto_ip': False,
+            'show_warnings': False,
+            'max_workers': 1}
+    args.update(kwargs)
+
+    return factory(count, **args)
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_results_in_request_order(mock_os_api_conn, batch):
+    """Verify that one result per requested server is returned in request
+    order and that every server is registered for teardown.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+        batch (tuple): The batch factory and the teardown inventory.
+    """
+
+    factory, servers = batch
+    mock_os_api_conn.list_servers.return_value = \
+        [_state(s, 'ACTIVE') for s in ('s3', 's1', 's2')]
+
+    results = _create(factory, 3)
+
+    assert [r.server.id for r in results] == ['s1', 's2', 's3']
+    assert [r.error for r in results] == [None, None, None]
+    assert [s.id for s in servers] == ['s1', 's2', 's3']
+    assert mock_os_api_conn.list_servers.call_count == 1
+
+
+def test_concurrent_results(mock_os_api_conn, batch):
+    """Verify that concurrent boots return a distinct server per result.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+        batch (tuple): The batch factory and the teardown inventory.
+    """
+
+    factory, servers = batch
+    mock_os_api_conn.list_servers.return_value = \
+        [_state('s{}'.format(i), 'ACTIVE') for i in range(1, 6)]
+
+    results = _create(factory, 5, max_workers=5)
+
+    assert sorted(r.server.id for r in results) == \
+        ['s1', 's2', 's3', 's4', 's5']
+    assert all(r.error is None for r in results)
+    assert len(servers) == 5
+
+
+def test_error_stops_wait(mock_os_api_conn, batch):
+    """Verify that a server in the ERROR state fails without waiting for the
+    retry policy to be exhausted.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+        batch (tuple): The batch factory and the teardown inventory.
+    """
+
+    factory, servers = batch
+    mock_os_api_conn.list_servers.return_value = [_state('s1', 'ACTIVE'),
+                                                  _state('s2', 'ERROR')]
+
+    results = _create(factory, 2, retry_policy=RetryPolicy(retries=5))
+
+    assert results[0].error is None
+    assert isinstance(results[1].error, RuntimeError)
+    assert results[1].server.id == 's2'
+    assert mock_os_api_conn.list_servers.call_count == 1
+    assert len(servers) == 2
+
+
+def test_failed_boot(mock_os_api_conn, batch):
+    """Verify that a failed boot request is reported in its result while the
+    other servers are still waited on and registered for teardown.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+        batch (tuple): The batch factory and the teardown inventory.
+    """
+
+    factory, servers = batch
+    boot_error = RuntimeError('Quota exceeded!')
+    mock_os_api_conn.create_server.side_effect = [FakeServer(id='s1'),
+                                                  boot_error,
+                                                  FakeServer(id='s3')]
+    mock_os_api_conn.list_servers.return_value = [_state('s1', 'ACTIVE'),
+                                                  _state('s3', 'ACTIVE')]
+
+    results = _create(factory, 3)
+
+    assert results[1].server is None
+    assert results[1].error is boot_error
+    assert [r.error for r in (results[0], results[2])] == [None, None]
+    assert [s.id for s in servers] == ['s1', 's3']
+
+
+def test_floating_ip_failure(mock_os_api_conn, batch):
+    """Verify that a floating IP attachment failure is reported in the result
+    of its server only.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+        batch (tuple): The batch factory and the teardown inventory.
+    """
+
+    factory, servers = batch
+    attach_error = RuntimeError('No more floating IPs!')
+    mock_os_api_conn.list_servers.return_value = [_state('s1', 'ACTIVE'),
+                                                  _state('s2', 'ACTIVE')]
+    mock_os_api_conn.create_floating_ip.side_effect = \
+        [FakeFloatingIp('10.0.0.1'), attach_error]
+
+    results = _create(factory, 2, auto_ip=True)
+
+    assert results[0].error is None
+    assert results[0].server['accessIPv4'] == '10.0.0.1'
+    assert results[1].error is attach_error
+    assert results[1].server.id == 's2'
+    assert len(servers) == 2
+    mock_os_api_conn.delete_unattached_floating_ips.assert_called_once_with(
+        retry=3
+    )
+
+
+def test_retries(mock_os_api_conn, batch):
+    """Verify that 'retries' bounds the number of validation polls.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+        batch (tuple): The batch factory and the teardown inventory.
+    """
+
+    factory, servers = batch
+    mock_os_api_conn.list_servers.return_value = [_state('s1', 'BUILD')]
+
+    results = _create(factory, 1, retries=2)
+
+    assert isinstance(results[0].error, RuntimeError)
+    assert mock_os_api_conn.list_servers.call_count == 2
+
+
+@pytest.mark.parametrize('security_groups', [None, []])
+def test_no_security_groups(mock_os_api_conn, security_groups):
+    """Verify that servers without security groups are created without
+    resolving any.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+        security_groups (list): The security groups to create servers with.
+    """
+
+    mock_os_api_conn.list_servers.return_value = [_state('s1', 'ACTIVE')]
+    for resource_type in ('flavor', 'image', 'network'):
+        getattr(mock_os_api_conn,
+                'list_{}s'.format(resource_type)).return_value = []
+    factory = _make_server_factory(
+        mock_os_api_conn,
+        OsConnectionManager(lambda: mock_os_api_conn),
+        {'network_name': 'PUBLIC'},
+        [],
+        os_resource_resolver=OsResourceResolver(mock_os_api_conn)
+    )
+
+    results = _create(factory.batch, 1, security_groups=security_groups)
+
+    assert results[0].error is None
+    assert not mock_os_api_conn.list_security_groups.called
+    assert mock_os_api_conn.create_server.call_args[1]['security_groups'] == \
+        security_groups
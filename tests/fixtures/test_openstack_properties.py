@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'openstack_session_properties' and
+'openstack_properties' fixtures."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import os
+import pytest
+import warnings
+import pytest_rpc.fixtures
+from pytest_rpc.fixtures import _make_openstack_properties_cache
+
+pytest_plugins = 'pytester'
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+release_ini = """[default]
+DISTRIB_CODENAME="{}"
+DISTRIB_RELEASE="r{}"
+"""
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def os_version_ini(mocker, tmpdir):
+    """Point the OpenStack version file at a temporary file.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        tmpdir (py.path.local): A temporary directory unique to the test.
+
+    Returns:
+        py.path.local: The OpenStack version file. (not created yet)
+    """
+
+    ini = tmpdir.join('openstack-release.ini')
+    mocker.patch.dict(pytest_rpc.fixtures._default_os_properties,
+                      {'os_version_ini_path': str(ini)})
+
+    return ini
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_cached_until_modified(os_version_ini):
+    """Verify that the version file is parsed once and parsed again after it
+    is modified.
+
+    Args:
+        os_version_ini (py.path.local): The OpenStack version file.
+    """
+
+    os_version_ini.write(release_ini.format('queens', '17.1.2'))
+    get_properties = _make_openstack_properties_cache()
+    first = get_properties()
+
+    assert get_properties() is first
+    assert first['os_version_major'] == 17
+
+    os_version_ini.write(release_ini.format('rocky', '18.0.1'))
+    mtime = os.stat(str(os_version_ini)).st_mtime + 10
+    os.utime(str(os_version_ini), (mtime, mtime))
+    second = get_properties()
+
+    assert second is not first
+    assert second['os_version_codename'] == 'rocky'
+    assert second['os_version_major'] == 18
+    assert get_properties() is second
+
+
+def test_missing_file_warns_once(os_version_ini):
+    """Verify that a missing version file falls back to the defaults and
+    warns only once.
+
+    Args:
+        os_version_ini (py.path.local): The OpenStack version file.
+    """
+
+    get_properties = _make_openstack_properties_cache()
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        for _ in range(3):
+            properties = get_properties()
+
+    assert properties['os_version_codename'] == 'master'
+    assert len(caught) == 1
+    assert 'Failed to parse OpenStack version file!' in str(caught[0].message)
+
+
+def test_per_test_copy(testdir):
+    """Verify that a test modifying 'openstack_properties' affects neither the
+    session properties nor later tests.
+
+    Args:
+        testdir (Testdir): A temporary pytest project.
+    """
+
+    testdir.makeconftest("""
+        from pytest_rpc.fixtures import (openstack_session_properties,
+                                         openstack_properties)
+    """)
+    testdir.makepyfile("""
+        def test_modify(openstack_properties, openstack_session_properties):
+            openstack_properties['tiny_flavor'] = 'oops'
+
+            assert openstack_session_properties()['tiny_flavor'] != 'oops'
+
+        def test_unmodified(openstack_properties):
+            assert openstack_properties['tiny_flavor'] != 'oops'
+    """)
+
+    result = testdir.runpytest('-p', 'no:cacheprovider')
+
+    result.assert_outcomes(passed=2)
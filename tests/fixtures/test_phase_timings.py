@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the phase timing hooks of the pytest-rpc plugin."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import json
+import pytest
+import pytest_rpc.fixtures
+from pytest_rpc.helpers import PhaseTimer
+
+pytest_plugins = 'pytester'
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def phase_timer(mocker):
+    """Replace the plugin's phase timer with an enabled one.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        PhaseTimer: The phase timer used by the plugin hooks.
+    """
+
+    timer = PhaseTimer(enabled=True)
+    mocker.patch('pytest_rpc.helpers.phase_timer', timer)
+
+    return timer
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_xdist_worker(mocker, phase_timer, tmpdir):
+    """Verify that a pytest-xdist worker hands its spans to the controller
+    instead of saving them.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        phase_timer (PhaseTimer): The phase timer used by the plugin hooks.
+        tmpdir (py.path.local): A temporary directory unique to the test.
+    """
+
+    # Setup
+    path = tmpdir.join('timings.json')
+    phase_timer.record('boot', 10, 2, 'test_boot')
+
+    # Mock
+    session = mocker.Mock()
+    session.config.workeroutput = {}
+    session.config.getoption.return_value = str(path)
+
+    # Test
+    pytest_rpc.fixtures.pytest_sessionfinish(session)
+
+    assert session.config.workeroutput == \
+        {'rpc_phase_spans': [['test_boot', 'boot', 10, 2]]}
+    assert not path.check()
+
+
+def test_xdist_controller(mocker, phase_timer, tmpdir):
+    """Verify that the controller merges the spans of every worker and saves
+    them once.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        phase_timer (PhaseTimer): The phase timer used by the plugin hooks.
+        tmpdir (py.path.local): A temporary directory unique to the test.
+    """
+
+    # Setup
+    path = tmpdir.join('timings.json')
+
+    # Mock
+    session = mocker.Mock(spec=['config'])
+    session.config = mocker.Mock(spec=['getoption'])
+    session.config.getoption.return_value = str(path)
+    gw0 = mocker.Mock(workeroutput={
+        'rpc_phase_spans': [['test_boot', 'boot', 10, 2]]
+    })
+    gw1 = mocker.Mock(workeroutput={
+        'rpc_phase_spans': [[None, 'boot', 11, 4]]
+    })
+    crashed = mocker.Mock(workeroutput={})
+
+    # Test
+    pytest_rpc.fixtures.pytest_sessionfinish(session)
+
+    assert not path.check()
+
+    for node in (gw0, gw1, crashed):
+        pytest_rpc.fixtures.pytest_testnodedown(node, None)
+    pytest_rpc.fixtures.pytest_sessionfinish(session)
+
+    with open(str(path)) as f:
+        data = json.load(f)
+
+    assert data['phases'][0]['count'] == 2
+    assert [s['nodeid'] for s in data['spans']] == ['test_boot', None]
+
+
+def test_session_fixture_phases(testdir):
+    """Verify that phases timed by fixtures which outlive a single test are
+    recorded as session phases.
+
+    Args:
+        testdir (Testdir): A temporary pytest project.
+    """
+
+    testdir.makeconftest("""
+        import pytest
+        from pytest_rpc.helpers import timed_phase
+
+        @pytest.fixture(scope='session')
+        def shared():
+            with timed_phase('shared.setup'):
+                pass
+            yield
+            with timed_phase('shared.teardown'):
+                pass
+
+        @pytest.fixture
+        def own():
+            with timed_phase('own.setup'):
+                pass
+            yield
+            with timed_phase('own.teardown'):
+                pass
+    """)
+    testdir.makepyfile("""
+        def test_one(shared, own):
+            pass
+    """)
+
+    result = testdir.runpytest('-p', 'pytest_rpc',
+                               '-p', 'no:cacheprovider',
+                               '--rpc-timings', 'timings.json')
+    result.assert_outcomes(passed=1)
+
+    with open(str(testdir.tmpdir.join('timings.json'))) as f:
+        spans = dict((s['phase'], s['nodeid']) for s in json.load(f)['spans'])
+
+    assert spans == {'shared.setup': None,
+                     'own.setup': 'test_session_fixture_phases.py::test_one',
+                     'own.teardown': 'test_session_fixture_phases.py::test_one',
+                     'shared.teardown': None}
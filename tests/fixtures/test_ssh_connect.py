@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'ssh_connect' fixture."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+pytest_plugins = 'pytester'
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+conftest = """
+import pytest
+import socket
+from paramiko.ssh_exception import NoValidConnectionsError
+from pytest_rpc.fixtures import ssh_connect, ssh_connection_pool
+
+
+@pytest.fixture
+def openstack_properties():
+    return {'private_key_path': '/root/.ssh/rpc_support'}
+
+
+@pytest.fixture
+def mock_ssh_client(mocker):
+    mocker.patch('pytest_rpc.helpers.sleep')
+
+    return mocker.patch('pytest_rpc.fixtures.SSHClient')
+
+
+@pytest.fixture
+def refused():
+    return NoValidConnectionsError(
+        {('10.0.0.1', 22): socket.error('Connection refused')}
+    )
+"""
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_connect_once(testdir):
+    """Verify that a connection which succeeds on the first attempt is not
+    attempted again.
+
+    Args:
+        testdir (Testdir): A temporary pytest project.
+    """
+
+    testdir.makeconftest(conftest)
+    testdir.makepyfile("""
+        def test_connect(ssh_connect, mock_ssh_client):
+            client = ssh_connect('10.0.0.1', 'cirros', retries=5)
+
+            assert client is mock_ssh_client.return_value
+            assert client.connect.call_count == 1
+    """)
+
+    result = testdir.runpytest('-p', 'no:cacheprovider')
+
+    result.assert_outcomes(passed=1)
+
+
+def test_connect_retries(testdir):
+    """Verify that a connection is retried until it succeeds.
+
+    Args:
+        testdir (Testdir): A temporary pytest project.
+    """
+
+    testdir.makeconftest(conftest)
+    testdir.makepyfile("""
+        def test_connect(ssh_connect, mock_ssh_client, refused):
+            connect = mock_ssh_client.return_value.connect
+            connect.side_effect = [refused, refused, None]
+
+            ssh_connect('10.0.0.1', 'cirros', retries=5)
+
+            assert connect.call_count == 3
+    """)
+
+    result = testdir.runpytest('-p', 'no:cacheprovider')
+
+    result.assert_outcomes(passed=1)
+
+
+def test_connect_failure(testdir):
+    """Verify that the last connection error is raised once the retries are
+    exhausted instead of returning a dead client.
+
+    Args:
+        testdir (Testdir): A temporary pytest project.
+    """
+
+    testdir.makeconftest(conftest)
+    testdir.makepyfile("""
+        import pytest
+        from paramiko.ssh_exception import NoValidConnectionsError
+
+        def test_connect(ssh_connect, mock_ssh_client, refused):
+            connect = mock_ssh_client.return_value.connect
+            connect.side_effect = refused
+
+            with pytest.raises(NoValidConnectionsError):
+                ssh_connect('10.0.0.1', 'cirros', retries=3)
+
+            assert connect.call_count == 3
+    """)
+
+    result = testdir.runpytest('-p', 'no:cacheprovider')
+
+    result.assert_outcomes(passed=1)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'ConsoleLogScanner' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+from pytest_rpc.helpers import ConsoleLogScanner
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+finished = ('Cloud-init v. 0.7.9 finished at Thu, 19 Jul 2018 15:36:40 +0000. '
+            'Up 25.63 seconds\n')
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def mock_os_api_conn(mocker):
+    """An API connection which returns a console log per call.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        Mock: A fake API connection.
+    """
+
+    return mocker.Mock()
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_marker_found(mock_os_api_conn):
+    """Verify that the scanner keeps fetching the log until the marker appears
+    and stops fetching afterwards.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    booting = ''.join('[{:5}] Starting kernel ...\n'.format(i)
+                      for i in range(100))
+    mock_os_api_conn.get_server_console.side_effect = [None,
+                                                       booting,
+                                                       booting + finished]
+
+    scanner = ConsoleLogScanner(mock_os_api_conn, 'server')
+
+    assert not scanner.scan()
+    assert not scanner.scan()
+    assert scanner.scan()
+    assert scanner.scan()
+    assert mock_os_api_conn.get_server_console.call_count == 3
+
+
+def test_marker_split_across_fetches(mock_os_api_conn):
+    """Verify that a marker written partly before and partly after a fetch is
+    found.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    booting = 'Starting kernel ...\n' * 100
+    mock_os_api_conn.get_server_console.side_effect = [
+        booting + finished[:20],
+        booting + finished
+    ]
+
+    scanner = ConsoleLogScanner(mock_os_api_conn, 'server')
+
+    assert not scanner.scan()
+    assert scanner.scan()
+
+
+def test_capped_sliding_log(mock_os_api_conn):
+    """Verify that the marker is found when the console output is capped and
+    the log keeps sliding without growing.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    cap = 2000
+    lines = ['[{:5}] systemd: Started unit.\n'.format(i) for i in range(400)]
+    before = ''.join(lines[:200])[-cap:]
+    after = (''.join(lines[:230]) + finished + ''.join(lines[230:260]))[-cap:]
+
+    assert len(before) == len(after) == cap
+    assert len(after) - after.index(finished) > 256
+
+    mock_os_api_conn.get_server_console.side_effect = [before, after]
+
+    scanner = ConsoleLogScanner(mock_os_api_conn, 'server')
+
+    assert not scanner.scan()
+    assert scanner.scan()
+
+
+def test_tail_length(mock_os_api_conn):
+    """Verify that a bounded number of lines is requested when 'length' is
+    given.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    mock_os_api_conn.get_server_console.return_value = finished
+
+    scanner = ConsoleLogScanner(mock_os_api_conn, 'server', length=50)
+
+    assert scanner.scan()
+    mock_os_api_conn.get_server_console.assert_called_once_with('server',
+                                                                length=50)
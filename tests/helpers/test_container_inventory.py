@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'ContainerInventory' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest_rpc.helpers
+import testinfra.backend.base
+import testinfra.host
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+LXC_LS_FANCY = """NAME                                          STATE
+infra1_galera_container-2d4b6f8a              RUNNING
+infra1_nova_api_container-5e6f7a8b            RUNNING
+infra1_nova_api_metadata_container-1a2b3c4d   RUNNING
+infra1_utility_container-9c5b8a2d             STOPPED
+infra2_utility_container-0a1b2c3d             RUNNING
+"""
+
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+def _fake_host(mocker, results):
+    """Build a testinfra host whose 'run' returns the given results in order.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        results (list of tuple): The (rc, stdout) of each 'run' call.
+
+    Returns:
+        testinfra.Host: A host with a mocked backend.
+    """
+
+    fake_backend = mocker.Mock(spec=testinfra.backend.base.BaseBackend)
+    myhost = testinfra.host.Host(fake_backend)
+    command_results = []
+
+    for rc, stdout in results:
+        cr = mocker.Mock(spec=testinfra.backend.base.CommandResult)
+        cr.rc = rc
+        cr.stdout = stdout
+        command_results.append(cr)
+
+    mocker.patch('testinfra.host.Host.run', side_effect=command_results)
+
+    return myhost
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_resolve_exact_type(mocker):
+    """Verify that a container type resolves to the container of that exact
+    type rather than a type sharing the same prefix.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    myhost = _fake_host(mocker, [(0, LXC_LS_FANCY)])
+    inventory = pytest_rpc.helpers.ContainerInventory(myhost)
+
+    assert inventory.resolve('nova_api') == \
+        'infra1_nova_api_container-5e6f7a8b'
+    assert inventory.resolve('nova_api_metadata') == \
+        'infra1_nova_api_metadata_container-1a2b3c4d'
+    assert inventory.resolve('oops') is None
+    # noinspection PyUnresolvedReferences
+    assert myhost.run.call_count == 1
+
+
+def test_resolve_prefers_running(mocker):
+    """Verify that running containers are preferred over stopped ones.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    myhost = _fake_host(mocker, [(0, LXC_LS_FANCY)])
+    inventory = pytest_rpc.helpers.ContainerInventory(myhost)
+
+    assert inventory.resolve_all('utility') == [
+        'infra2_utility_container-0a1b2c3d',
+        'infra1_utility_container-9c5b8a2d'
+    ]
+
+
+def test_substring_fallback(mocker):
+    """Verify that container types are matched as a substring when no name
+    follows the OpenStack-Ansible naming convention.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    myhost = _fake_host(mocker, [(0, LXC_LS_FANCY)])
+    inventory = pytest_rpc.helpers.ContainerInventory(myhost)
+
+    assert inventory.resolve('galera_') == 'infra1_galera_container-2d4b6f8a'
+
+
+def test_plain_listing_fallback(mocker):
+    """Verify that the inventory falls back to a plain listing when fancy
+    output is not supported.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    myhost = _fake_host(mocker, [(1, ''), (0, 'a_swift_container-1\n')])
+    inventory = pytest_rpc.helpers.ContainerInventory(myhost)
+
+    assert inventory.containers == [
+        pytest_rpc.helpers.ContainerInfo('a_swift_container-1', None)
+    ]
+
+
+def test_invalidate(mocker):
+    """Verify that an invalidated inventory lists the containers again.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    myhost = _fake_host(mocker, [(0, LXC_LS_FANCY), (0, 'NAME STATE\n')])
+    inventory = pytest_rpc.helpers.ContainerInventory(myhost)
+
+    assert inventory.resolve('galera') is not None
+
+    inventory.invalidate()
+
+    assert inventory.resolve('galera') is None
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'ContainerShell' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import io
+import os
+import stat
+import warnings
+import pytest
+import testinfra
+from pytest_rpc.helpers import ContainerShell, ContainerCommandResult
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def local_shell(tmpdir, monkeypatch):
+    """A container shell on the local host where 'lxc-attach' is replaced by
+    a script which runs the attached command without a container.
+
+    Args:
+        tmpdir (py.path.local): A temporary directory unique to the test.
+        monkeypatch (MonkeyPatch): A helper for patching the environment.
+
+    Returns:
+        ContainerShell: A container shell which prepares an environment.
+    """
+
+    fake_attach = tmpdir.join('lxc-attach')
+    fake_attach.write('#!/bin/bash\n'
+                      'while [ "$1" != "--" ]; do shift; done\n'
+                      'shift\n'
+                      'exec "$@"\n')
+    os.chmod(str(fake_attach), stat.S_IRWXU)
+    monkeypatch.setenv('PATH', '{}:{}'.format(tmpdir, os.environ['PATH']))
+
+    shell = ContainerShell(testinfra.get_host('local://'),
+                           'infra1_swift_proxy_container-1a2b3c4d',
+                           setup='export SETUP=done',
+                           timeout=10)
+
+    yield shell
+
+    shell.close()
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_run(local_shell):
+    """Verify that commands see the prepared environment and get their own
+    output and exit status.
+
+    Args:
+        local_shell (ContainerShell): A container shell on the local host.
+    """
+
+    command = 'echo $SETUP; echo err >&2'
+
+    assert local_shell.run(command) == \
+        ContainerCommandResult(command, 0, 'done\n', 'err\n')
+    assert local_shell.run("printf 'no newline'").stdout == 'no newline'
+
+
+def test_non_ascii(local_shell):
+    """Verify that non-ASCII commands given as unicode or as UTF-8 byte
+    strings (a plain 'str' on Python 2) are run unchanged.
+
+    Args:
+        local_shell (ContainerShell): A container shell on the local host.
+    """
+
+    assert local_shell.run(u'test "caf\xe9" = "caf\xe9"').rc == 0
+    assert local_shell.run(u'test "na\xefve" = "na\xefve"'
+                           .encode('utf-8')).rc == 0
+
+
+def test_exit_keeps_session(local_shell):
+    """Verify that an exiting command does not end the session.
+
+    Args:
+        local_shell (ContainerShell): A container shell on the local host.
+    """
+
+    assert local_shell.run('exit 3').rc == 3
+
+    session = local_shell._session
+
+    assert local_shell.run('true').rc == 0
+    assert local_shell._session is session
+
+
+def test_timeout(local_shell):
+    """Verify that a command which times out has no exit status and that the
+    session is restarted for the next command.
+
+    Args:
+        local_shell (ContainerShell): A container shell on the local host.
+    """
+
+    assert local_shell.run('sleep 5', timeout=0.5).rc is None
+    assert local_shell.run('echo $SETUP').stdout == 'done\n'
+
+
+def test_restart(local_shell):
+    """Verify that the session is restarted when its process dies.
+
+    Args:
+        local_shell (ContainerShell): A container shell on the local host.
+    """
+
+    assert local_shell.run('true').rc == 0
+
+    local_shell._session.close()
+
+    assert local_shell.run('echo $SETUP').stdout == 'done\n'
+
+
+def test_fallback(mocker):
+    """Verify that backends without persistent session support warn once and
+    run every command through its own attach.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    host = mocker.Mock()
+    host.backend.NAME = 'ansible'
+    mock_batch = mocker.patch('pytest_rpc.helpers.run_on_container_batch',
+                              return_value=['result'])
+    mocker.patch('pytest_rpc.helpers._container_shell_warnings', set())
+
+    # Test
+    with pytest.warns(UserWarning):
+        shell = ContainerShell(host, 'infra1_utility_container-1', setup='true')
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        ContainerShell(host, 'infra1_utility_container-1')
+
+    assert not caught
+    assert not shell.persistent
+    assert shell.run('ls') == 'result'
+    mock_batch.assert_called_once_with(['ls'],
+                                       None,
+                                       host,
+                                       setup='true',
+                                       container_name='infra1_utility_'
+                                                      'container-1')
+
+
+def test_persistent_required(mocker):
+    """Verify that requiring a persistent session on a backend which cannot
+    stream one raises the correct exception.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    host = mocker.Mock()
+    host.backend.NAME = 'ansible'
+
+    # Test
+    with pytest.raises(RuntimeError):
+        ContainerShell(host, 'infra1_utility_container-1', persistent=True)
+
+
+def test_ssh_session(mocker):
+    """Verify that the session on an ssh host is started through the ssh
+    command built by the backend.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_popen = mocker.patch('pytest_rpc.helpers.Popen')
+    mock_popen.return_value.poll.return_value = 0
+    mock_popen.return_value.stdout = io.BytesIO()
+    mock_popen.return_value.stderr = io.BytesIO()
+
+    # Test
+    host = testinfra.get_host('ssh://root@infra1')
+    shell = ContainerShell(host, 'infra1_utility_container-1')
+
+    assert shell.persistent
+
+    shell.run('ls', timeout=1)
+    command = mock_popen.call_args[0][0]
+
+    assert command.startswith('ssh ')
+    assert 'User=root' in command
+    assert 'infra1' in command
+    assert 'lxc-attach -n infra1_utility_container-1' in command
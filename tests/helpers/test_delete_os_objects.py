@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'delete_os_objects' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+import openstack.connection
+from collections import namedtuple
+from pytest_rpc.helpers import delete_os_objects, OsConnectionManager
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def fake_os_objects():
+    """A list of objects that work like munch.Munch objects containing just an
+    ID property.
+
+    Returns:
+        list of namedtuple: Objects that respond to an attribute lookup.
+    """
+
+    FakeOsObject = namedtuple('FakeOsObject', ('id',))
+
+    return [FakeOsObject(id='fake-{}'.format(i)) for i in range(3)]
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_delete_and_wait(mocker, fake_os_objects):
+    """Verify that every delete is issued without waiting and that the helper
+    then waits for all the objects with a single list call per poll.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_objects (list of namedtuple): Objects that respond to an
+            attribute lookup. ('id')
+    """
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.delete_server.return_value = True
+    mock_os_api_conn.list_servers.return_value = []
+
+    # Test
+    results = delete_os_objects(mock_os_api_conn, 'server', fake_os_objects)
+
+    assert list(results) == [o.id for o in fake_os_objects]
+    assert all(r.found and r.deleted for r in results.values())
+    assert mock_os_api_conn.list_servers.call_count == 1
+    for call_args in mock_os_api_conn.delete_server.call_args_list:
+        assert call_args[1]['wait'] is False
+
+
+def test_missing_and_failed(mocker, fake_os_objects):
+    """Verify that missing objects and failed deletes are reported per object
+    and are not waited on.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_objects (list of namedtuple): Objects that respond to an
+            attribute lookup. ('id')
+    """
+
+    # Setup
+    missing, failed, deleted = [o.id for o in fake_os_objects]
+    error = RuntimeError('Delete failed!')
+
+    def _fake_delete(name_or_id, wait):
+        if name_or_id == failed:
+            raise error
+        return name_or_id != missing
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.delete_volume.side_effect = _fake_delete
+    mock_os_api_conn.list_volumes.return_value = []
+
+    # Test
+    results = delete_os_objects(mock_os_api_conn, 'volume', fake_os_objects)
+
+    assert not results[missing].found
+    assert results[failed].error is error
+    assert results[deleted].deleted
+
+
+def test_no_wait(mocker, fake_os_objects):
+    """Verify that the helper does not poll when waiting is disabled.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_objects (list of namedtuple): Objects that respond to an
+            attribute lookup. ('id')
+    """
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.delete_server.return_value = True
+
+    # Test
+    results = delete_os_objects(mock_os_api_conn,
+                                'server',
+                                fake_os_objects,
+                                wait=False)
+
+    assert all(r.deleted is None for r in results.values())
+    assert not mock_os_api_conn.list_servers.called
+
+
+def test_worker_connections(mocker, fake_os_objects):
+    """Verify that the deletes are issued on connections borrowed from the
+    connection manager and the wait uses the given connection.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_objects (list of namedtuple): Objects that respond to an
+            attribute lookup. ('id')
+    """
+
+    # Mock
+    mock_os_api_conn = mocker.create_autospec(openstack.connection.Connection,
+                                              instance=True)
+    mock_os_api_conn.list_servers.return_value = []
+    mock_worker_conn = mocker.create_autospec(openstack.connection.Connection,
+                                              instance=True)
+    mock_worker_conn.delete_server.return_value = True
+
+    # Test
+    results = delete_os_objects(
+        mock_os_api_conn,
+        'server',
+        fake_os_objects,
+        os_api_conn_manager=OsConnectionManager(lambda: mock_worker_conn)
+    )
+
+    assert all(r.deleted for r in results.values())
+    assert mock_worker_conn.delete_server.call_count == 3
+    assert not mock_os_api_conn.delete_server.called
+    assert mock_os_api_conn.list_servers.call_count == 1
+
+
+def test_invalid_service_name(mocker, fake_os_objects):
+    """Verify that the helper raises the correct exception when the caller
+    provides an invalid OpenStack service name.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_objects (list of namedtuple): Objects that respond to an
+            attribute lookup. ('id')
+    """
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+
+    # Test
+    with pytest.raises(RuntimeError):
+        delete_os_objects(mock_os_api_conn, 'oops', fake_os_objects)
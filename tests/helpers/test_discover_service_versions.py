@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'discover_service_versions' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+from keystoneauth1.discover import EndpointData
+from pytest_rpc.helpers import discover_service_versions
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_discover_all(mocker):
+    """Verify that every service is discovered and reported in order with
+    integer versions.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    os_api_conn = mocker.Mock()
+    os_api_conn.block_storage.get_endpoint_data.return_value = EndpointData(
+        service_type='block-storage',
+        service_url='http://cinder/v3',
+        api_version=(3, 0),
+        min_microversion=(3, 0),
+        max_microversion=(3, 59)
+    )
+    os_api_conn.compute.get_endpoint_data.return_value = EndpointData(
+        service_type='compute',
+        service_url='http://nova/v2.1',
+        api_version=(2.0, 1.0),
+        min_microversion=(2, 1),
+        max_microversion=(2, 79)
+    )
+    os_api_conn.network.get_endpoint_data.return_value = None
+    os_api_conn.image.get_endpoint_data.side_effect = RuntimeError('Oops!')
+    os_api_conn.object_store.get_endpoint_data.return_value = EndpointData(
+        service_type='object-store',
+        service_url='http://swift/v1/AUTH_1',
+        api_version=(1, 0)
+    )
+
+    # Test
+    versions = discover_service_versions(os_api_conn)
+
+    assert list(versions) == ['cinder', 'nova', 'neutron', 'glance', 'swift']
+    assert versions['cinder'].api_version == (3, 0)
+    assert versions['cinder'].max_microversion == (3, 59)
+    assert versions['nova'].api_version == (2, 1)
+    assert versions['nova'].url == 'http://nova/v2.1'
+    assert versions['neutron'].api_version is None
+    assert versions['neutron'].error is not None
+    assert isinstance(versions['glance'].error, RuntimeError)
+    assert versions['swift'].min_microversion is None
+    assert versions['swift'].error is None
+
+
+def test_selected_services(mocker):
+    """Verify that only the requested services are discovered.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    os_api_conn = mocker.Mock()
+    os_api_conn.compute.get_endpoint_data.return_value = EndpointData(
+        api_version=(2, 1)
+    )
+
+    # Test
+    assert list(discover_service_versions(os_api_conn, ['nova'])) == ['nova']
+    assert not os_api_conn.block_storage.get_endpoint_data.called
+
+
+def test_unknown_service(mocker):
+    """Verify that an unknown service raises the correct exception.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    with pytest.raises(RuntimeError):
+        discover_service_versions(mocker.Mock(), ['oops'])
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'expect_os_properties' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+import openstack.connection
+from collections import namedtuple
+from pytest_rpc.helpers import expect_os_properties
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def fake_os_object():
+    """An object that works like a munch.Munch object containing just an ID
+    property.
+
+    Returns:
+        namedtuple: An object that responds to an attribute lookup.
+    """
+
+    FakeOsObject = namedtuple('FakeOsObject', ('id',))
+
+    return FakeOsObject(id='A totally fake UUID!')
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_expect_success(mocker, fake_os_object):
+    """Verify that the helper will return True when all the expected properties
+    and values are satisfied on a OpenStack resource with a single API call.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_object (namedtuple): An object that responds to an attribute
+            lookup. ('id')
+    """
+
+    # Expect
+    props_exp = {'status': 'ACTIVE',
+                 'OS-EXT-STS:power_state': '1',
+                 'OS-EXT-STS:vm_state': 'active'}
+
+    # Setup
+    service_name = 'server'
+    prop_dict = {'status': 'ACTIVE',
+                 'OS-EXT-STS:power_state': 1,
+                 'OS-EXT-STS:vm_state': 'active'}
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.get_server.return_value = prop_dict
+
+    # Test
+    assert expect_os_properties(os_api_conn=mock_os_api_conn,
+                                os_service=service_name,
+                                os_object=fake_os_object,
+                                expected_props=props_exp)
+    assert mock_os_api_conn.get_server.call_count == 1
+
+
+def test_expect_partial_failure(mocker, fake_os_object):
+    """Verify that the helper will return False when only some of the expected
+    properties and values are satisfied on a OpenStack resource.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_object (namedtuple): An object that responds to an attribute
+            lookup. ('id')
+    """
+
+    # Expect
+    props_exp = {'status': 'ACTIVE', 'OS-EXT-STS:power_state': '1'}
+
+    # Setup
+    service_name = 'server'
+    prop_dict = {'status': 'ACTIVE', 'OS-EXT-STS:power_state': 0}
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.get_server.return_value = prop_dict
+
+    # Test
+    assert not expect_os_properties(os_api_conn=mock_os_api_conn,
+                                    os_service=service_name,
+                                    os_object=fake_os_object,
+                                    expected_props=props_exp,
+                                    show_warnings=False,
+                                    retries=1)
+
+
+def test_expect_eventual_success(mocker, fake_os_object):
+    """Verify that the helper retries with one API call per attempt until all
+    the expected properties are satisfied.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_object (namedtuple): An object that responds to an attribute
+            lookup. ('id')
+    """
+
+    # Expect
+    props_exp = {'status': 'ACTIVE', 'OS-EXT-STS:vm_state': 'active'}
+
+    # Setup
+    service_name = 'server'
+    building = {'status': 'BUILD', 'OS-EXT-STS:vm_state': 'building'}
+    active = {'status': 'ACTIVE', 'OS-EXT-STS:vm_state': 'active'}
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.sleep', autospec=True)
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.get_server.side_effect = [building, building, active]
+
+    # Test
+    assert expect_os_properties(os_api_conn=mock_os_api_conn,
+                                os_service=service_name,
+                                os_object=fake_os_object,
+                                expected_props=props_exp,
+                                show_warnings=False)
+    assert mock_os_api_conn.get_server.call_count == 3
+
+
+def test_missing_property(mocker, fake_os_object):
+    """Verify that the helper raises the correct exception when one of the
+    expected properties is not present on the OpenStack resource.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_object (namedtuple): An object that responds to an attribute
+            lookup. ('id')
+    """
+
+    # Expect
+    props_exp = {'status': 'ACTIVE', 'oops': 'value'}
+
+    # Setup
+    service_name = 'server'
+    prop_dict = {'status': 'ACTIVE'}
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.get_server.return_value = prop_dict
+
+    # Test
+    with pytest.raises(RuntimeError):
+        expect_os_properties(os_api_conn=mock_os_api_conn,
+                             os_service=service_name,
+                             os_object=fake_os_object,
+                             expected_props=props_exp)
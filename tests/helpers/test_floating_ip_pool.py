@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'FloatingIpPool' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+import itertools
+from collections import namedtuple
+from pytest_rpc.helpers import FloatingIpPool, OsConnectionManager
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+FakeFloatingIp = namedtuple('FakeFloatingIp', ('id', 'floating_ip_address'))
+FakeServer = namedtuple('FakeServer', ('id',))
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def mock_os_api_conn(mocker):
+    """An API connection which allocates sequentially numbered floating IPs.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        Mock: A fake API connection.
+    """
+
+    ids = itertools.count(1)
+
+    def _create_floating_ip(network):
+        fip_id = next(ids)
+        return FakeFloatingIp('fip-{}'.format(fip_id),
+                              '10.0.0.{}'.format(fip_id))
+
+    conn = mocker.Mock()
+    conn.create_floating_ip.side_effect = _create_floating_ip
+    conn.delete_floating_ip.return_value = True
+
+    return conn
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_start(mock_os_api_conn):
+    """Verify that the addresses are allocated up front.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    pool = FloatingIpPool(mock_os_api_conn, 'GATEWAY_NET', 3)
+
+    assert pool.start() == []
+    assert len(pool) == 3
+    assert pool.start() == []
+    assert mock_os_api_conn.create_floating_ip.call_count == 3
+
+
+def test_worker_connections(mocker, mock_os_api_conn):
+    """Verify that addresses are allocated and released on connections
+    borrowed from the connection manager.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    primary_conn = mocker.Mock()
+    pool = FloatingIpPool(
+        primary_conn,
+        'GATEWAY_NET',
+        2,
+        os_api_conn_manager=OsConnectionManager(lambda: mock_os_api_conn)
+    )
+
+    assert pool.start() == []
+    assert len(pool.close()) == 2
+    assert mock_os_api_conn.create_floating_ip.call_count == 2
+    assert mock_os_api_conn.delete_floating_ip.call_count == 2
+    assert not primary_conn.create_floating_ip.called
+    assert not primary_conn.delete_floating_ip.called
+
+
+def test_lease_and_release(mock_os_api_conn):
+    """Verify that a leased address is attached to the server and returned to
+    the pool instead of being released.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    # Setup
+    pool = FloatingIpPool(mock_os_api_conn, 'GATEWAY_NET', 1)
+    pool.start()
+    server = FakeServer('server-1')
+
+    # Test
+    floating_ip = pool.lease(server)
+
+    assert len(pool) == 0
+    mock_os_api_conn.add_ip_list.assert_called_once_with(
+        server, [floating_ip.floating_ip_address], wait=True, timeout=600
+    )
+
+    pool.release(server)
+
+    assert len(pool) == 1
+    mock_os_api_conn.detach_ip_from_server.assert_called_once_with(
+        server_id='server-1', floating_ip_id=floating_ip.id
+    )
+    assert not mock_os_api_conn.delete_floating_ip.called
+    assert not mock_os_api_conn.delete_unattached_floating_ips.called
+
+
+def test_grow_on_demand(mock_os_api_conn):
+    """Verify that an exhausted pool allocates another address.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    pool = FloatingIpPool(mock_os_api_conn, 'GATEWAY_NET', 1)
+    pool.start()
+
+    assert pool.lease(FakeServer('server-1')).id == 'fip-1'
+    assert pool.lease(FakeServer('server-2')).id == 'fip-2'
+    assert list(pool.close()) == ['fip-1', 'fip-2']
+
+
+def test_failed_attach(mock_os_api_conn):
+    """Verify that an address which failed to attach is returned to the pool.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    # Setup
+    mock_os_api_conn.add_ip_list.side_effect = RuntimeError('Oops!')
+    pool = FloatingIpPool(mock_os_api_conn, 'GATEWAY_NET', 1)
+    pool.start()
+
+    # Test
+    with pytest.raises(RuntimeError):
+        pool.lease(FakeServer('server-1'))
+
+    assert len(pool) == 1
+
+
+def test_failed_detach(mock_os_api_conn):
+    """Verify that an address which failed to detach is kept out of the pool
+    but still released when the pool is closed.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    # Setup
+    mock_os_api_conn.detach_ip_from_server.side_effect = RuntimeError('Oops!')
+    pool = FloatingIpPool(mock_os_api_conn, 'GATEWAY_NET', 1)
+    pool.start()
+    server = FakeServer('server-1')
+    pool.lease(server)
+
+    # Test
+    pool.release(server)
+
+    assert len(pool) == 0
+
+    results = pool.close()
+
+    assert results['fip-1'].deleted
+    assert mock_os_api_conn.delete_floating_ip.call_count == 1
+
+
+def test_close_errors(mock_os_api_conn):
+    """Verify that errors releasing addresses are reported.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    # Setup
+    mock_os_api_conn.delete_floating_ip.side_effect = RuntimeError('Oops!')
+    pool = FloatingIpPool(mock_os_api_conn, 'GATEWAY_NET', 2)
+    pool.start()
+
+    # Test
+    results = pool.close()
+
+    assert all(isinstance(r.error, RuntimeError) for r in results.values())
+    assert pool.close() == {}
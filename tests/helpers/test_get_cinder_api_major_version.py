@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'get_cinder_api_major_version' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+from keystoneauth1.discover import EndpointData
+from pytest_rpc.helpers import get_cinder_api_major_version
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_api_version(mocker):
+    """Verify that the block storage API major version is returned.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    os_api_conn = mocker.Mock()
+    os_api_conn.block_storage.get_endpoint_data.return_value = \
+        EndpointData(api_version=(3, 0))
+
+    # Test
+    assert get_cinder_api_major_version(os_api_conn) == 3
+
+
+def test_discovery_failure(mocker):
+    """Verify that -1 is returned when version discovery fails.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    os_api_conn = mocker.Mock()
+    os_api_conn.block_storage.get_endpoint_data.side_effect = \
+        RuntimeError('Discovery failed!')
+
+    # Test
+    assert get_cinder_api_major_version(os_api_conn) == -1
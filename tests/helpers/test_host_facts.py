@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'HostFacts' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import time
+import pytest
+from multiprocessing.pool import ThreadPool
+from pytest_rpc.helpers import (HostFacts,
+                                get_openstack_release,
+                                get_container_inventory)
+
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+def _fake_host(mocker, host_id='paramiko://infra1'):
+    """Build a fake testinfra host.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        host_id (str): The pytest ID of the host.
+
+    Returns:
+        Mock: A fake testinfra host.
+    """
+
+    host = mocker.Mock()
+    host.backend.get_pytest_id.return_value = host_id
+
+    return host
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_single_flight(mocker):
+    """Verify that concurrent callers share a single probe per host.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    def _probe(run_on_host):
+        time.sleep(0.1)
+        return 3
+
+    probe = mocker.Mock(side_effect=_probe)
+    facts = HostFacts(probes={'cinder_major_version': probe})
+    host = _fake_host(mocker)
+    pool = ThreadPool(5)
+
+    # Test
+    try:
+        values = pool.map(lambda _: facts.get(host, 'cinder_major_version'),
+                          range(5))
+    finally:
+        pool.close()
+        pool.join()
+
+    assert values == [3] * 5
+    assert probe.call_count == 1
+    assert facts.get(_fake_host(mocker, 'local://'),
+                     'cinder_major_version') == 3
+    assert probe.call_count == 2
+
+
+def test_invalidate(mocker):
+    """Verify that an invalidated fact is probed again.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    probe = mocker.Mock(side_effect=['16.0.4', '17.0.0'])
+    facts = HostFacts(probes={'openstack_release': probe})
+    host = _fake_host(mocker)
+
+    # Test
+    assert facts.get(host, 'openstack_release') == '16.0.4'
+
+    facts.invalidate(host, 'openstack_release')
+
+    assert facts.get(host, 'openstack_release') == '17.0.0'
+
+
+def test_unknown_fact(mocker):
+    """Verify that an unknown fact raises the correct exception.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    with pytest.raises(RuntimeError):
+        HostFacts().get(_fake_host(mocker), 'oops')
+
+
+def test_persistence(mocker, tmpdir):
+    """Verify that plain data facts are saved and loaded again without
+    probing.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        tmpdir (py.path.local): A temporary directory unique to the test.
+    """
+
+    # Setup
+    path = str(tmpdir.join('host_facts.json'))
+    probes = {'cinder_major_version': mocker.Mock(return_value=3),
+              'container_inventory': mocker.Mock(return_value=object())}
+    host = _fake_host(mocker)
+
+    # Test
+    facts = HostFacts(path, probes, fingerprint='deployment-1')
+    facts.get(host, 'cinder_major_version')
+    facts.get(host, 'container_inventory')
+    facts.save()
+
+    probes['cinder_major_version'].reset_mock()
+    facts = HostFacts(path, probes, fingerprint='deployment-1')
+
+    assert facts.get(host, 'cinder_major_version') == 3
+    assert not probes['cinder_major_version'].called
+
+
+def test_failed_probe(mocker, tmpdir):
+    """Verify that the value of a failed probe is neither cached nor saved so
+    that the fact is probed again.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        tmpdir (py.path.local): A temporary directory unique to the test.
+    """
+
+    # Setup
+    path = str(tmpdir.join('host_facts.json'))
+    probes = {'cinder_major_version': mocker.Mock(side_effect=[-1, 3]),
+              'openstack_release': mocker.Mock(return_value=None)}
+    host = _fake_host(mocker)
+
+    # Test
+    facts = HostFacts(path, probes, fingerprint='deployment-1')
+
+    assert facts.get(host, 'cinder_major_version') == -1
+    assert facts.get(host, 'openstack_release') is None
+
+    facts.save()
+    probes['openstack_release'].return_value = 'r17.0.0'
+    facts = HostFacts(path, probes, fingerprint='deployment-1')
+
+    assert facts.get(host, 'cinder_major_version') == 3
+    assert facts.get(host, 'openstack_release') == 'r17.0.0'
+    assert probes['cinder_major_version'].call_count == 2
+    assert probes['openstack_release'].call_count == 2
+
+
+def test_fingerprint_mismatch(mocker, tmpdir):
+    """Verify that facts saved for another deployment are discarded with a
+    warning and probed again.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        tmpdir (py.path.local): A temporary directory unique to the test.
+    """
+
+    # Setup
+    path = str(tmpdir.join('host_facts.json'))
+    probe = mocker.Mock(side_effect=[3, 2])
+    host = _fake_host(mocker)
+
+    facts = HostFacts(path, {'cinder_major_version': probe}, 'deployment-1')
+    facts.get(host, 'cinder_major_version')
+    facts.save()
+
+    # Test
+    with pytest.warns(UserWarning):
+        facts = HostFacts(path,
+                          {'cinder_major_version': probe},
+                          'deployment-2')
+
+    assert facts.get(host, 'cinder_major_version') == 2
+    assert probe.call_count == 2
+
+
+def test_legacy_file(mocker, tmpdir):
+    """Verify that a facts file without a fingerprint is discarded.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        tmpdir (py.path.local): A temporary directory unique to the test.
+    """
+
+    # Setup
+    facts_file = tmpdir.join('host_facts.json')
+    facts_file.write('{"paramiko://infra1": {"cinder_major_version": 3}}')
+    probe = mocker.Mock(return_value=2)
+
+    # Test
+    with pytest.warns(UserWarning):
+        facts = HostFacts(str(facts_file), {'cinder_major_version': probe})
+
+    assert facts.get(_fake_host(mocker), 'cinder_major_version') == 2
+
+
+def test_single_container_inventory(mocker):
+    """Verify that the container inventory is shared with
+    'get_container_inventory' and that invalidating it through the facts
+    refreshes the shared inventory.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    host = _fake_host(mocker)
+    host.run.return_value.rc = 0
+    host.run.return_value.stdout = ('NAME STATE\n'
+                                    'infra1_utility_container-1a2b3c4d '
+                                    'RUNNING\n')
+    mocker.patch('pytest_rpc.helpers._container_inventories', {})
+    facts = HostFacts()
+
+    # Test
+    inventory = facts.get(host, 'container_inventory')
+
+    assert inventory is get_container_inventory(host)
+    assert inventory.resolve('utility') == 'infra1_utility_container-1a2b3c4d'
+
+    host.run.return_value.stdout = ('NAME STATE\n'
+                                    'infra1_utility_container-5e6f7a8b '
+                                    'RUNNING\n')
+    facts.invalidate(host, 'container_inventory')
+
+    assert get_container_inventory(host).resolve('utility') == \
+        'infra1_utility_container-5e6f7a8b'
+
+
+def test_get_openstack_release(mocker):
+    """Verify that the release is parsed from the OpenStack release file.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    host = _fake_host(mocker)
+    host.run.return_value.stdout = ('DISTRIB_ID="RPC-O"\n'
+                                    'DISTRIB_RELEASE="r16.0.4"\n'
+                                    'DISTRIB_CODENAME="Pike"\n')
+
+    # Test
+    assert get_openstack_release(host) == '16.0.4'
+
+    host.run.return_value.stdout = ''
+
+    assert get_openstack_release(host) is None
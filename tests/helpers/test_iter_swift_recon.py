@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'iter_swift_recon' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import io
+import types
+from pytest_rpc.helpers import iter_swift_recon
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+SWIFT_RECON_OUT = """\
+Preamble which is ignored
+===============================================================================
+--> Starting reconnaissance on 3 hosts (object)
+===============================================================================
+[2018-07-19 15:36:40] Checking ring md5sums
+3/3 hosts matched, 0 error[s] while checking hosts.
+===============================================================================
+Trailing output which is ignored"""
+
+EXPECTED_BLOCKS = [
+    ['--> Starting reconnaissance on 3 hosts (object)'],
+    ['[2018-07-19 15:36:40] Checking ring md5sums',
+     '3/3 hosts matched, 0 error[s] while checking hosts.']
+]
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_string():
+    """Verify that blocks are parsed from a string."""
+
+    blocks = iter_swift_recon(SWIFT_RECON_OUT)
+
+    assert isinstance(blocks, types.GeneratorType)
+    assert list(blocks) == EXPECTED_BLOCKS
+
+
+def test_file_object():
+    """Verify that blocks are parsed from a file object of bytes."""
+
+    stream = io.BytesIO(SWIFT_RECON_OUT.replace('\n', '\r\n').encode('utf-8'))
+
+    assert list(iter_swift_recon(stream)) == EXPECTED_BLOCKS
+
+
+def test_yields_each_block_when_it_ends():
+    """Verify that a block is yielded as soon as its closing delimiter is read
+    without consuming the rest of the stream."""
+
+    lines = iter(SWIFT_RECON_OUT.splitlines(True))
+    blocks = iter_swift_recon(lines)
+
+    assert next(blocks) == EXPECTED_BLOCKS[0]
+    assert next(lines).startswith('[2018-07-19 15:36:40]')
+
+
+def test_empty():
+    """Verify that no blocks are yielded for empty output."""
+
+    assert list(iter_swift_recon('')) == []
+    assert list(iter_swift_recon([])) == []
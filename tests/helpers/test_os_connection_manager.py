@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'OsConnectionManager' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import threading
+from pytest_rpc.helpers import OsConnectionManager
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_primary_connection(mocker):
+    """Verify that 'get' always returns the same primary connection, even from
+    other threads.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_connect = mocker.Mock(side_effect=lambda: mocker.Mock())
+
+    # Test
+    manager = OsConnectionManager(mock_connect)
+    main_conn = manager.get()
+    thread_conns = []
+
+    thread = threading.Thread(target=lambda: thread_conns.append(manager.get()))
+    thread.start()
+    thread.join()
+
+    assert manager.get() is main_conn
+    assert thread_conns[0] is main_conn
+    assert mock_connect.call_count == 1
+
+
+def test_checkout_reuses_connections(mocker):
+    """Verify that connections checked out by short-lived threads share the
+    auth plugin and are reused instead of created per thread.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_connect = mocker.Mock(side_effect=lambda: mocker.Mock())
+
+    # Test
+    manager = OsConnectionManager(mock_connect, max_size=2)
+    main_conn = manager.get()
+    worker_conns = []
+
+    def _work():
+        with manager.checkout() as conn:
+            worker_conns.append(conn)
+
+    for _ in range(5):
+        thread = threading.Thread(target=_work)
+        thread.start()
+        thread.join()
+
+    assert len(set(id(c) for c in worker_conns)) == 1
+    assert worker_conns[0] is not main_conn
+    assert worker_conns[0].session.auth is main_conn.session.auth
+    assert mock_connect.call_count == 2
+
+
+def test_checkout_is_bounded(mocker):
+    """Verify that no more than 'max_size' connections are checked out at once.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_connect = mocker.Mock(side_effect=lambda: mocker.Mock())
+
+    # Test
+    manager = OsConnectionManager(mock_connect, max_size=2)
+    lock = threading.Lock()
+    active = [0, 0]     # Current and peak checkouts.
+    release = threading.Event()
+
+    def _work():
+        with manager.checkout():
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            release.wait(1)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=_work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert active[1] <= 2
+    assert mock_connect.call_count <= 2
+
+
+def test_refresh_expiring_token(mocker):
+    """Verify that a token expiring within the margin is invalidated.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_conn = mocker.Mock()
+    mock_auth = mock_conn.session.auth
+    mock_auth.auth_ref.will_expire_soon.return_value = True
+
+    # Test
+    manager = OsConnectionManager(lambda: mock_conn, expiry_margin=600)
+    manager.get()
+
+    mock_auth.auth_ref.will_expire_soon.assert_called_with(600)
+    assert mock_auth.invalidate.called
+
+
+def test_refresh_on_checkout(mocker):
+    """Verify that the token expiry is checked whenever a connection is
+    checked out, not only when the primary connection is created.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_conn = mocker.Mock()
+    mock_auth = mock_conn.session.auth
+    mock_auth.auth_ref.will_expire_soon.return_value = False
+
+    # Test
+    manager = OsConnectionManager(lambda: mock_conn)
+    manager.get()
+
+    mock_auth.auth_ref.will_expire_soon.return_value = True
+
+    with manager.checkout():
+        pass
+
+    assert mock_auth.invalidate.call_count == 1
+
+    manager.refresh_if_expiring()
+
+    assert mock_auth.invalidate.call_count == 2
+
+
+def test_close(mocker):
+    """Verify that closing the manager closes every connection and that a new
+    connection is created afterwards.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_connect = mocker.Mock(side_effect=lambda: mocker.Mock())
+
+    # Test
+    manager = OsConnectionManager(mock_connect)
+    first_conn = manager.get()
+    with manager.checkout() as worker_conn:
+        pass
+    manager.close()
+
+    assert first_conn.close.called
+    assert worker_conn.close.called
+    assert manager.get() is not first_conn
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'OsObjectReaper' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import openstack.connection
+from collections import namedtuple
+from pytest_rpc.helpers import OsObjectReaper
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_drain(mocker):
+    """Verify that submitted deletions are executed in the background and their
+    results are returned when drained.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    FakeOsObject = namedtuple('FakeOsObject', ('id',))
+    servers = [FakeOsObject(id='server')]
+    volumes = [FakeOsObject(id='volume')]
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.delete_server.return_value = True
+    mock_os_api_conn.delete_volume.return_value = False
+    mock_os_api_conn.list_servers.return_value = []
+
+    # Test
+    reaper = OsObjectReaper(mock_os_api_conn)
+    reaper.submit('server', servers)
+    reaper.submit('volume', volumes)
+    reaper.submit('volume', [])
+
+    results = dict(reaper.close())
+
+    assert results['server']['server'].deleted
+    assert not results['volume']['volume'].found
+    assert reaper.drain() == []
+
+
+def test_failed_batch(mocker):
+    """Verify that an unexpected failure while deleting a batch is reported
+    for every object in the batch.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    FakeOsObject = namedtuple('FakeOsObject', ('id',))
+    servers = [FakeOsObject(id='one'), FakeOsObject(id='two')]
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.delete_server.return_value = True
+    mock_os_api_conn.list_servers.side_effect = RuntimeError('API down!')
+
+    # Test
+    reaper = OsObjectReaper(mock_os_api_conn)
+    reaper.submit('server', servers)
+
+    (os_service, results), = reaper.close()
+
+    assert os_service == 'server'
+    assert all(r.error is not None for r in results.values())
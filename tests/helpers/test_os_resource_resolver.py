@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'OsResourceResolver' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+from pytest_rpc.helpers import OsResourceResolver
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def mock_os_api_conn(mocker):
+    """An API connection with two flavors and two networks with the same
+    name.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        Mock: A fake API connection.
+    """
+
+    conn = mocker.Mock()
+    conn.list_flavors.return_value = [{'id': 'f1', 'name': 'm1.tiny'},
+                                      {'id': 'f2', 'name': 'm1.small'}]
+    conn.list_networks.return_value = [{'id': 'n1', 'name': 'TEST-VXLAN'},
+                                       {'id': 'n2', 'name': 'TEST-VXLAN'}]
+
+    return conn
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_resolve(mock_os_api_conn):
+    """Verify that names and IDs are resolved with one list call per resource
+    type.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    resolver = OsResourceResolver(mock_os_api_conn)
+
+    assert resolver.resolve('flavor', 'm1.tiny')['id'] == 'f1'
+    assert resolver.resolve('flavor', 'f2')['name'] == 'm1.small'
+    assert [f['id'] for f in resolver.resolve_all('flavor',
+                                                  ['m1.small', 'f1'])] == \
+        ['f2', 'f1']
+    assert mock_os_api_conn.list_flavors.call_count == 1
+
+
+def test_objects_pass_through(mock_os_api_conn):
+    """Verify that objects and None are returned unchanged without listing.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    resolver = OsResourceResolver(mock_os_api_conn)
+    flavor = {'id': 'f3', 'name': 'm1.large'}
+
+    assert resolver.resolve('flavor', flavor) is flavor
+    assert resolver.resolve('image', None) is None
+    assert not mock_os_api_conn.list_flavors.called
+
+
+def test_unknown_refreshes_once(mock_os_api_conn):
+    """Verify that an unknown name refreshes the index once and is then
+    returned unchanged.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    resolver = OsResourceResolver(mock_os_api_conn)
+
+    assert resolver.resolve('flavor', 'm1.tiny')['id'] == 'f1'
+    assert resolver.resolve('flavor', 'oops') == 'oops'
+    assert mock_os_api_conn.list_flavors.call_count == 2
+
+
+def test_ambiguous_name(mock_os_api_conn):
+    """Verify that an ambiguous name is returned unchanged without refreshing
+    the index.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    resolver = OsResourceResolver(mock_os_api_conn)
+
+    assert resolver.resolve('network', 'TEST-VXLAN') == 'TEST-VXLAN'
+    assert resolver.resolve('network', 'n2')['id'] == 'n2'
+    assert mock_os_api_conn.list_networks.call_count == 1
+
+
+def test_invalidate(mock_os_api_conn):
+    """Verify that an invalidated resource type is listed again.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    resolver = OsResourceResolver(mock_os_api_conn)
+    resolver.resolve('flavor', 'm1.tiny')
+    resolver.resolve('network', 'n1')
+
+    resolver.invalidate('flavor')
+    resolver.resolve('flavor', 'm1.tiny')
+    resolver.resolve('network', 'n1')
+
+    assert mock_os_api_conn.list_flavors.call_count == 2
+    assert mock_os_api_conn.list_networks.call_count == 1
+
+    resolver.invalidate()
+    resolver.resolve('network', 'n1')
+
+    assert mock_os_api_conn.list_networks.call_count == 2
+
+
+def test_invalid_resource_type(mock_os_api_conn):
+    """Verify that an invalid resource type raises the correct exception.
+
+    Args:
+        mock_os_api_conn (Mock): A fake API connection.
+    """
+
+    with pytest.raises(RuntimeError):
+        OsResourceResolver(mock_os_api_conn).resolve('oops', 'name')
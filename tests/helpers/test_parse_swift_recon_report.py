@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'parse_swift_recon_report' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+from datetime import datetime
+from pytest_rpc.helpers import parse_swift_recon_report, SwiftReconCheck
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+SWIFT_RECON_OUT = """
+===============================================================================
+--> Starting reconnaissance on 3 hosts (object)
+===============================================================================
+[2018-07-19 15:36:40] Checking ring md5sums
+3/3 hosts matched, 0 error[s] while checking hosts.
+===============================================================================
+[2018-07-19 15:36:41] Checking swift.conf md5sum
+-> http://172.29.236.12:6000/recon/swiftconfmd5: <urlopen error timed out>
+2/3 hosts matched, 1 error[s] while checking hosts.
+===============================================================================
+[2018-07-19 15:36:42] Checking on replication
+[replication_failure] low: 0, high: 0, avg: 0.0, total: 0, Failed: 0.0%
+Oldest completion was 2018-07-19 15:35:40 (1 minutes ago) by 172.29.236.11.
+===============================================================================
+"""
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_report():
+    """Verify that the header and every check are parsed into typed
+    records."""
+
+    report = parse_swift_recon_report(SWIFT_RECON_OUT)
+
+    assert report.hosts == 3
+    assert report.server_type == 'object'
+    assert [c.name for c in report.checks] == ['ring md5sums',
+                                               'swift.conf md5sum',
+                                               'on replication']
+    assert report.get('ring md5sums') == SwiftReconCheck(
+        'ring md5sums', datetime(2018, 7, 19, 15, 36, 40), 3, 3, 0
+    )
+    assert report.get('swift.conf md5sum').details == [
+        '-> http://172.29.236.12:6000/recon/swiftconfmd5: '
+        '<urlopen error timed out>'
+    ]
+    assert len(report.get('on replication').details) == 2
+    assert report.get('oops') is None
+
+
+def test_health():
+    """Verify that checks which do not report matches are not judged."""
+
+    report = parse_swift_recon_report(SWIFT_RECON_OUT)
+
+    assert report.get('ring md5sums').healthy
+    assert report.get('on replication').healthy is None
+    assert report.unhealthy() == [report.get('swift.conf md5sum')]
+    assert not report.all_healthy()
+
+    report.checks.remove(report.get('swift.conf md5sum'))
+
+    assert report.all_healthy()
+
+
+def test_slots():
+    """Verify that checks do not carry a per-instance dictionary."""
+
+    check = SwiftReconCheck('ring md5sums', None)
+
+    assert not hasattr(check, '__dict__')
+
+
+def test_empty():
+    """Verify that empty output yields an empty report."""
+
+    report = parse_swift_recon_report('')
+
+    assert report.hosts is None
+    assert report.checks == []
+    assert report.all_healthy()
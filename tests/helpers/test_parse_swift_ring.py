@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'parse_swift_ring' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+from pytest_rpc.helpers import parse_swift_ring, SwiftRingDevice
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+SEPARATE_PORT_OUT = """
+/etc/swift/account.builder, build version 5
+256 partitions, 4.000000 replicas, 2 regions, 2 zones, 4 devices, 0.00 balance, 0.00 dispersion
+The minimum number of hours before a partition can be reassigned is 1 (0:56:05 remaining)
+Ring file /etc/swift/account.ring.gz is up-to-date
+
+Devices:    id  region  zone      ip address  port replication ip  replication port      name weight partitions balance flags meta
+
+             0       1     0     10.240.0.60  6002     10.240.0.60              6002       sdd 100.00        256    0.00
+             1       1     0     10.240.0.61  6002     10.240.0.61              6002       sdd 100.00        256    0.00
+             2       2     0     10.240.1.60  6002     10.240.1.60              6002       sdd 100.00        256    0.00
+             3       2     0     10.240.1.61  6002     10.240.1.61              6002       sdd 100.00        256    0.00
+"""  # noqa
+
+COMBINED_PORT_OUT = """
+/etc/swift/object.builder, build version 9, id 0d2f1c23a5d24a3e9b5a6cbd6e7a8f90
+1024 partitions, 3.000000 replicas, 1 regions, 3 zones, 4 devices, 1.27 balance, 0.00 dispersion
+The overload factor is 0.00% (0.000000)
+Devices:   id region zone        ip address:port  replication ip:port  name weight partitions balance flags meta
+            0      1    1  172.29.236.11:6000   172.29.236.11:6000   sdc 100.00        768    0.00
+            1      1    2  172.29.236.12:6000   172.29.236.12:6000   sdc 100.00        768    0.00
+            2      1    3  172.29.236.13:6000   172.29.236.13:6000   sdc  99.00        758   -1.27       rack=3 row=a
+            3      1    3       [fd00::14]:6000        [fd00::14]:6000   sdd   0.00          0    0.00   DEL
+"""  # noqa
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_separate_port_columns():
+    """Verify that the device table is parsed when the IP addresses and ports
+    are in separate columns."""
+
+    ring = parse_swift_ring(SEPARATE_PORT_OUT)
+
+    assert ring.summary['partitions'] == 256
+    assert len(ring.devices) == 4
+    assert ring.devices[1] == SwiftRingDevice(1, 1, 0,
+                                              '10.240.0.61', 6002,
+                                              '10.240.0.61', 6002,
+                                              'sdd', 100.0, 256, 0.0,
+                                              '', '')
+    assert ring.devices.devices_per_zone() == {(1, 0): 2, (2, 0): 2}
+
+
+def test_combined_port_columns():
+    """Verify that the device table is parsed when the IP addresses and ports
+    are combined, including flags, metadata and IPv6 addresses."""
+
+    ring = parse_swift_ring(COMBINED_PORT_OUT)
+
+    assert ring.summary['balance'] == 1.27
+    assert list(ring.devices.id) == [0, 1, 2, 3]
+    assert ring.devices[2].meta == 'rack=3 row=a'
+    assert ring.devices[2].flags == ''
+    assert ring.devices[3].flags == 'DEL'
+    assert ring.devices[3].ip == 'fd00::14'
+    assert ring.devices[3].replication_port == 6000
+    assert list(ring.devices.devices_per_zone().items()) == [((1, 1), 1),
+                                                             ((1, 2), 1),
+                                                             ((1, 3), 2)]
+    assert ring.devices.max_balance() == 1.27
+
+
+def test_large_ring():
+    """Verify that rings with thousands of devices are parsed."""
+
+    rows = ['{0} 1 {1} 10.0.{2}.{3}:6000 10.0.{2}.{3}:6000 sdb 100.00 '
+            '3 0.{4:02d}'.format(i, i % 5, i // 250, i % 250, i % 100)
+            for i in range(5000)]
+    output = '\n'.join([COMBINED_PORT_OUT.strip().splitlines()[3]] + rows)
+
+    devices = parse_swift_ring(output).devices
+
+    assert len(devices) == 5000
+    assert sum(devices.devices_per_zone().values()) == 5000
+    assert devices.max_balance() == 0.99
+
+
+def test_summary_requires_partitions_and_dispersion():
+    """Verify that a line mentioning only dispersion is not mistaken for the
+    summary line."""
+
+    ring = parse_swift_ring('Dispersion is now 1.00 dispersion\n')
+
+    assert ring.summary == {}
+    assert len(ring.devices) == 0
+    assert ring.devices.max_balance() == 0.0
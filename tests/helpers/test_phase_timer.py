@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'PhaseTimer' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import json
+import pytest
+from multiprocessing.pool import ThreadPool
+from pytest_rpc.helpers import PhaseTimer
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def fake_clock(mocker):
+    """A clock which only moves when told to.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        list: A single element list holding the current time.
+    """
+
+    clock = [100.0]
+    mocker.patch('pytest_rpc.helpers.time', side_effect=lambda: clock[0])
+
+    return clock
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_disabled(fake_clock):
+    """Verify that nothing is recorded while the timer is disabled.
+
+    Args:
+        fake_clock (list): A single element list holding the current time.
+    """
+
+    timer = PhaseTimer()
+
+    with timer.span('boot'):
+        fake_clock[0] += 5
+
+    assert timer.spans == []
+    assert timer.summary() == {}
+
+
+def test_nested_spans(fake_clock):
+    """Verify that nested phases are recorded under the joined names and
+    attributed to the running test.
+
+    Args:
+        fake_clock (list): A single element list holding the current time.
+    """
+
+    timer = PhaseTimer(enabled=True)
+    timer.nodeid = 'test_boot'
+
+    with timer.span('create_server'):
+        with timer.span('boot'):
+            fake_clock[0] += 3
+        fake_clock[0] += 1
+
+    assert [(s.nodeid, s.phase, s.start, s.duration) for s in timer.spans] == \
+        [('test_boot', 'create_server/boot', 100.0, 3.0),
+         ('test_boot', 'create_server', 100.0, 4.0)]
+
+
+def test_thread_nodeid():
+    """Verify that phases timed on other threads are session phases unless
+    the work was bound to the submitting test."""
+
+    timer = PhaseTimer(enabled=True)
+    timer.nodeid = 'test_boot'
+
+    def _work(phase):
+        with timer.span(phase):
+            pass
+
+    pool = ThreadPool(1)
+
+    try:
+        pool.map(_work, ['fill'])
+        pool.map(timer.bind(_work), ['submit'])
+        pool.map(_work, ['recycle'])
+    finally:
+        pool.close()
+        pool.join()
+
+    assert [(s.phase, s.nodeid) for s in timer.spans] == \
+        [('fill', None), ('submit', 'test_boot'), ('recycle', None)]
+    assert timer.nodeid == 'test_boot'
+
+
+def test_span_recorded_on_error(fake_clock):
+    """Verify that a phase which raises is still recorded.
+
+    Args:
+        fake_clock (list): A single element list holding the current time.
+    """
+
+    timer = PhaseTimer(enabled=True)
+
+    with pytest.raises(RuntimeError):
+        with timer.span('boot'):
+            fake_clock[0] += 2
+            raise RuntimeError('Boot failed!')
+
+    with timer.span('connect'):
+        pass
+
+    assert [(s.phase, s.duration) for s in timer.spans] == \
+        [('boot', 2.0), ('connect', 0.0)]
+
+
+def test_summary():
+    """Verify the per phase statistics and that phases are ordered by total
+    time."""
+
+    timer = PhaseTimer(enabled=True)
+
+    for duration in (4, 1, 3, 2, 5):
+        timer.record('boot', 0, duration)
+    timer.record('connect', 0, 20)
+
+    summary = timer.summary()
+
+    assert list(summary) == ['connect', 'boot']
+    assert summary['boot'].count == 5
+    assert summary['boot'].total == 15
+    assert summary['boot'].mean == 3
+    assert summary['boot'].p50 == 3
+    assert summary['boot'].p90 == pytest.approx(4.6)
+    assert summary['boot'].max == 5
+    assert summary['connect'].p99 == 20
+
+
+def test_slowest():
+    """Verify that the longest individual spans are returned first."""
+
+    timer = PhaseTimer(enabled=True)
+
+    for duration in (4, 1, 3):
+        timer.record('boot', 0, duration, 'test_{}'.format(duration))
+
+    assert [s.nodeid for s in timer.slowest(2)] == ['test_4', 'test_3']
+
+
+def test_save(tmpdir):
+    """Verify that the statistics and spans are saved as JSON.
+
+    Args:
+        tmpdir (py.path.local): A temporary directory unique to the test.
+    """
+
+    path = str(tmpdir.join('timings.json'))
+    timer = PhaseTimer(enabled=True)
+    timer.record('boot', 10, 2, 'test_boot')
+
+    timer.save(path)
+
+    with open(path) as f:
+        data = json.load(f)
+
+    assert data['phases'][0]['phase'] == 'boot'
+    assert data['phases'][0]['p50'] == 2
+    assert data['spans'] == [{'nodeid': 'test_boot',
+                              'phase': 'boot',
+                              'start': 10,
+                              'duration': 2}]
+
+
+def test_reset():
+    """Verify that reset discards every recorded span."""
+
+    timer = PhaseTimer(enabled=True)
+    timer.record('boot', 0, 1)
+
+    timer.reset()
+
+    assert timer.spans == []
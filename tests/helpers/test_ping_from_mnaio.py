@@ -4,6 +4,26 @@
 # Imports
 # ==============================================================================
 import pytest_rpc.helpers
+from collections import OrderedDict
+
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+def _probe_results(reachable):
+    """Build the results of probing 'fake_host'.
+
+    Args:
+        reachable (bool): Whether the host answered.
+
+    Returns:
+        OrderedDict: Results keyed by host. ({str: PingResult})
+    """
+
+    return OrderedDict([('fake_host', pytest_rpc.helpers.PingResult(
+        'fake_host', reachable, 1, int(reachable), 0.0 if reachable else 100.0,
+        None, None, None, 1, 'icmp', ''
+    ))])
 
 
 # ==============================================================================
@@ -17,7 +37,8 @@ def test_successful_ping(mocker):
     """
 
     # Mock
-    mocker.patch('pytest_rpc.helpers.call', autospec=True, return_value=0)
+    mocker.patch('pytest_rpc.helpers.probe_reachability',
+                 return_value=_probe_results(True))
 
     # Test
     assert pytest_rpc.helpers.ping_from_mnaio('fake_host')
@@ -31,7 +52,8 @@ def test_unsuccessful_ping(mocker):
     """
 
     # Mock
-    mocker.patch('pytest_rpc.helpers.call', autospec=True, return_value=1)
+    mocker.patch('pytest_rpc.helpers.probe_reachability',
+                 return_value=_probe_results(False))
 
     # Test
     assert pytest_rpc.helpers.ping_from_mnaio('fake_host', 1) is False
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'ping_hosts_from_mnaio' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+from pytest_rpc.helpers import ping_hosts_from_mnaio, PingResult, RetryPolicy
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+PING_SUCCESS = """\
+PING 10.0.0.1 (10.0.0.1) 56(84) bytes of data.
+64 bytes from 10.0.0.1: icmp_seq=1 ttl=64 time=0.045 ms
+64 bytes from 10.0.0.1: icmp_seq=2 ttl=64 time=0.061 ms
+
+--- 10.0.0.1 ping statistics ---
+3 packets transmitted, 2 received, 33% packet loss, time 2003ms
+rtt min/avg/max/mdev = 0.045/0.053/0.061/0.008 ms
+"""
+
+PING_FAILURE = """\
+PING 10.0.0.2 (10.0.0.2) 56(84) bytes of data.
+
+--- 10.0.0.2 ping statistics ---
+3 packets transmitted, 0 received, 100% packet loss, time 2031ms
+"""
+
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+def _mock_ping(mocker, answers):
+    """Mock the ping subprocess.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        answers (dict): The attempt from which each host answers, keyed by
+            host. (hosts which are missing never answer)
+
+    Returns:
+        Mock: The mocked 'Popen' class.
+    """
+
+    attempts = {}
+
+    def _popen(command, **kwargs):
+        host = command[-1]
+        attempts[host] = attempts.get(host, 0) + 1
+        answered = attempts[host] >= answers.get(host, float('inf'))
+        process = mocker.Mock()
+        process.returncode = 0 if answered else 1
+        process.communicate.return_value = \
+            (PING_SUCCESS if answered else PING_FAILURE, None)
+
+        return process
+
+    return mocker.patch('pytest_rpc.helpers.Popen', side_effect=_popen)
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_statistics(mocker):
+    """Verify that the round trip times and packet loss are reported for each
+    host in the order given.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.sleep')
+    _mock_ping(mocker, {'10.0.0.1': 1})
+
+    # Test
+    results = ping_hosts_from_mnaio(['10.0.0.1', '10.0.0.2'],
+                                    retries=2,
+                                    method='subprocess')
+
+    assert list(results) == ['10.0.0.1', '10.0.0.2']
+    assert results['10.0.0.1'].reachable
+    assert results['10.0.0.1'].received == 2
+    assert round(results['10.0.0.1'].loss) == 33
+    assert (results['10.0.0.1'].rtt_min,
+            results['10.0.0.1'].rtt_avg,
+            results['10.0.0.1'].rtt_max) == (0.045, 0.053, 0.061)
+    assert not results['10.0.0.2'].reachable
+    assert results['10.0.0.2'].loss == 100.0
+    assert results['10.0.0.2'].rtt_avg is None
+    assert 'ping statistics' in results['10.0.0.2'].output
+
+
+def test_retries_only_pending_hosts(mocker):
+    """Verify that hosts which answered are not pinged again.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_sleep = mocker.patch('pytest_rpc.helpers.sleep')
+    mock_popen = _mock_ping(mocker, {'10.0.0.1': 1, '10.0.0.2': 3})
+
+    # Test
+    results = ping_hosts_from_mnaio(['10.0.0.1', '10.0.0.2'],
+                                    method='subprocess')
+
+    assert all(r.reachable for r in results.values())
+    assert results['10.0.0.1'].attempts == 1
+    assert results['10.0.0.2'].attempts == 3
+    assert mock_popen.call_count == 4
+    assert mock_sleep.call_count == 2
+
+
+def test_deadline(mocker):
+    """Verify that the deadline mode retries every second until the deadline.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    clock = [0]
+
+    def _fake_sleep(seconds):
+        clock[0] += seconds
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.time', side_effect=lambda: clock[0])
+    mocker.patch('pytest_rpc.helpers.sleep', side_effect=_fake_sleep)
+    _mock_ping(mocker, {})
+
+    # Test
+    results = ping_hosts_from_mnaio(['10.0.0.2'],
+                                    deadline=5,
+                                    method='subprocess')
+
+    assert not results['10.0.0.2'].reachable
+    assert results['10.0.0.2'].attempts == 6
+
+
+def test_retry_policy(mocker):
+    """Verify that a retry policy takes precedence over the deadline.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.sleep')
+    _mock_ping(mocker, {})
+
+    # Test
+    results = ping_hosts_from_mnaio(['10.0.0.2'],
+                                    deadline=600,
+                                    retry_policy=RetryPolicy(retries=2),
+                                    method='subprocess')
+
+    assert results['10.0.0.2'].attempts == 2
+
+
+def test_no_tcp_fallback(mocker):
+    """Verify that hosts are only probed with TCP connects when asked to.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    result = PingResult('10.0.0.1', True, 1, 1, 0.0, None, None, None, 1,
+                        'subprocess', '')
+
+    # Mock
+    mock_probe = mocker.patch('pytest_rpc.helpers.probe_reachability',
+                              return_value={'10.0.0.1': result})
+
+    # Test
+    ping_hosts_from_mnaio(['10.0.0.1'], tcp_port=22)
+    ping_hosts_from_mnaio(['10.0.0.1'], method='tcp')
+
+    assert mock_probe.call_args_list[0][1]['tcp_port'] is None
+    assert mock_probe.call_args_list[1][1]['tcp_port'] == 22
+
+
+def test_no_hosts():
+    """Verify that no hosts yields no results."""
+
+    assert ping_hosts_from_mnaio([]) == {}
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'probe_reachability' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import socket
+import struct
+import pytest
+import pytest_rpc.helpers
+from pytest_rpc.helpers import probe_reachability
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def listening_port():
+    """A local TCP port which accepts connections.
+
+    Returns:
+        int: The port number.
+    """
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(16)
+
+    yield server.getsockname()[1]
+
+    server.close()
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_tcp(listening_port):
+    """Verify that hosts are probed with TCP connects and reported in the
+    order given.
+
+    Args:
+        listening_port (int): A local TCP port which accepts connections.
+    """
+
+    results = probe_reachability(['no-such-host.invalid', '127.0.0.1'],
+                                 count=2,
+                                 interval=0,
+                                 tcp_port=listening_port,
+                                 method='tcp')
+
+    assert list(results) == ['no-such-host.invalid', '127.0.0.1']
+    assert results['127.0.0.1'].reachable
+    assert results['127.0.0.1'].method == 'tcp'
+    assert results['127.0.0.1'].received == 2
+    assert results['127.0.0.1'].rtt_min <= results['127.0.0.1'].rtt_max
+    assert 'rtt min/avg/max' in results['127.0.0.1'].output
+    assert not results['no-such-host.invalid'].reachable
+    assert results['no-such-host.invalid'].loss == 100.0
+
+
+def test_tcp_refused():
+    """Verify that a refused connection counts as an answer."""
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    port = server.getsockname()[1]
+    server.close()
+
+    results = probe_reachability(['127.0.0.1'],
+                                 count=1,
+                                 tcp_port=port,
+                                 method='tcp')
+
+    assert results['127.0.0.1'].reachable
+
+
+def test_best_method(mocker):
+    """Verify that TCP and then ping subprocesses are used when ICMP datagram
+    sockets are not permitted.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.socket.socket',
+                 side_effect=socket.error('Permission denied'))
+
+    # Test
+    assert pytest_rpc.helpers._best_probe_method(22) == 'tcp'
+    assert pytest_rpc.helpers._best_probe_method(None) == 'subprocess'
+
+
+def test_invalid_method():
+    """Verify that an invalid probe method raises the correct exception."""
+
+    with pytest.raises(RuntimeError):
+        probe_reachability(['127.0.0.1'], method='oops')
+
+    with pytest.raises(RuntimeError):
+        probe_reachability(['127.0.0.1'], method='tcp', tcp_port=None)
+
+
+def test_icmp_echo_request():
+    """Verify that ICMP echo requests carry the sequence number and a valid
+    checksum."""
+
+    packet = bytearray(pytest_rpc.helpers._icmp_echo_request(513))
+    words = struct.unpack('!{}H'.format(len(packet) // 2),
+                          bytes(packet[:len(packet) // 2 * 2]))
+    total = sum(words) + (packet[-1] << 8 if len(packet) % 2 else 0)
+
+    while total >> 16:
+        total = (total & 0xffff) + (total >> 16)
+
+    assert packet[0] == 8
+    assert struct.unpack('!H', bytes(packet[6:8]))[0] == 513
+    assert total == 0xffff
+
+
+def test_read_icmp_replies(mocker):
+    """Verify that echo replies are read with or without an IP header and
+    other ICMP messages are ignored.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    reply = struct.pack('!BBHHH', 0, 0, 0, 0, 7)
+    ip_header = bytes(bytearray([0x45] + [0] * 19))
+    unreachable = struct.pack('!BBHHH', 3, 1, 0, 0, 8)
+
+    # Mock
+    icmp_sock = mocker.Mock()
+    icmp_sock.recv.side_effect = [reply,
+                                  ip_header + reply.replace(b'\x07', b'\x09'),
+                                  unreachable,
+                                  socket.error('EAGAIN')]
+
+    # Test
+    assert pytest_rpc.helpers._read_icmp_replies(icmp_sock) == [7, 9]
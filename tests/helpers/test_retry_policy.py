@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'RetryPolicy' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+from pytest_rpc.helpers import RetryPolicy
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_fibonacci_backoff():
+    """Verify that the fibonacci strategy sleeps on the fibonacci sequence."""
+
+    policy = RetryPolicy(strategy=RetryPolicy.FIBONACCI)
+
+    assert [policy.backoff(a) for a in range(1, 8)] == [1, 1, 2, 3, 5, 8, 13]
+
+
+def test_exponential_backoff_without_jitter():
+    """Verify that the exponential strategy doubles the sleep time after every
+    attempt when jitter is disabled."""
+
+    policy = RetryPolicy(strategy=RetryPolicy.EXPONENTIAL, jitter=False)
+
+    assert [policy.backoff(a) for a in range(1, 6)] == [1, 2, 4, 8, 16]
+
+
+def test_exponential_backoff_with_jitter():
+    """Verify that jitter keeps each sleep between zero and the back-off."""
+
+    policy = RetryPolicy(strategy=RetryPolicy.EXPONENTIAL, max_sleep=10)
+
+    assert policy.jitter
+    for attempt in range(1, 10):
+        assert 0 <= policy.backoff(attempt) <= min(2 ** (attempt - 1), 10)
+
+
+def test_fixed_backoff():
+    """Verify that the fixed strategy always sleeps for the interval."""
+
+    policy = RetryPolicy(strategy=RetryPolicy.FIXED, interval=5)
+
+    assert [policy.backoff(a) for a in range(1, 4)] == [5, 5, 5]
+
+
+def test_max_sleep():
+    """Verify that no sleep exceeds the maximum sleep time."""
+
+    policy = RetryPolicy(max_sleep=4)
+
+    assert max([policy.backoff(a) for a in range(1, 20)]) == 4
+
+
+def test_invalid_strategy():
+    """Verify that an invalid strategy raises the correct exception."""
+
+    with pytest.raises(RuntimeError):
+        RetryPolicy(strategy='oops')
+
+
+def test_attempts(mocker):
+    """Verify that the policy yields every attempt and does not sleep after
+    the final attempt.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_sleep = mocker.patch('pytest_rpc.helpers.sleep', autospec=True)
+
+    # Test
+    policy = RetryPolicy(retries=4)
+
+    assert list(policy.attempts()) == [1, 2, 3, 4]
+    assert [c[0][0] for c in mock_sleep.call_args_list] == [1, 1, 2]
+
+
+def test_deadline(mocker):
+    """Verify that the policy stops yielding attempts once the deadline has
+    passed and shortens the final sleep to fit the deadline.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    clock = [0]
+
+    def _fake_sleep(seconds):
+        clock[0] += seconds
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.time', side_effect=lambda: clock[0])
+    mock_sleep = mocker.patch('pytest_rpc.helpers.sleep',
+                              side_effect=_fake_sleep)
+
+    # Test
+    policy = RetryPolicy(retries=100, deadline=10)
+
+    assert list(policy.attempts()) == [1, 2, 3, 4, 5, 6]
+    assert [c[0][0] for c in mock_sleep.call_args_list] == [1, 1, 2, 3, 3]
+
+
+def test_resolve():
+    """Verify that an explicit policy takes precedence over retries."""
+
+    policy = RetryPolicy(retries=3)
+
+    assert RetryPolicy.resolve(5, policy) is policy
+    assert RetryPolicy.resolve(5).retries == 5
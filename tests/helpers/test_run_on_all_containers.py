@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'run_on_all_containers' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+import pytest_rpc.helpers
+import testinfra.backend.base
+
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+def _fake_host(mocker, containers):
+    """Build a fake testinfra host with the given containers which echoes the
+    commands it runs.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        containers (list of str): Names of the running containers on the host.
+
+    Returns:
+        Mock: A fake testinfra host.
+    """
+
+    def _run(command):
+        cr = mocker.Mock(spec=testinfra.backend.base.CommandResult)
+        cr.rc = 0
+        cr.stdout = command
+
+        if command.startswith('lxc-ls'):
+            cr.stdout = '\n'.join(['NAME STATE'] +
+                                  ['{} RUNNING'.format(c) for c in containers])
+
+        return cr
+
+    host = mocker.Mock()
+    host.run.side_effect = _run
+
+    return host
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_fan_out(mocker):
+    """Verify that the command runs on every matching container across all
+    hosts.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    host1 = _fake_host(mocker, ['infra1_galera_container-1',
+                                'infra1_utility_container-1'])
+    host2 = _fake_host(mocker, ['infra2_galera_container-2'])
+
+    # Test
+    results = pytest_rpc.helpers.run_on_all_containers('hostname',
+                                                       'galera',
+                                                       [host1, host2])
+
+    assert list(results) == ['infra1_galera_container-1',
+                             'infra2_galera_container-2']
+    assert results['infra2_galera_container-2'].stdout == \
+        "lxc-attach -n infra2_galera_container-2 -- bash -c 'hostname'"
+
+
+def test_timeout(mocker):
+    """Verify that the command is wrapped with the timeout.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    host = _fake_host(mocker, ['infra1_galera_container-1'])
+
+    # Test
+    results = pytest_rpc.helpers.run_on_all_containers('hostname',
+                                                       'galera',
+                                                       host,
+                                                       timeout=30)
+
+    assert results['infra1_galera_container-1'].stdout.startswith(
+        'timeout 30 lxc-attach'
+    )
+
+
+def test_no_container(mocker):
+    """Verify that the helper raises the correct exception when no container
+    matches.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    host = _fake_host(mocker, ['infra1_utility_container-1'])
+
+    # Test
+    with pytest.raises(RuntimeError):
+        pytest_rpc.helpers.run_on_all_containers('hostname', 'galera', host)
@@ -29,3 +29,65 @@ def test_expected_constructed_run_command(mocker):
     # noinspection PyUnresolvedReferences
     myhost.run.assert_called_with(expected_run_cmd)
     assert result == command_result
+
+
+def test_container_name(mocker):
+    """Verify run_on_container attaches to the exact container name when one
+    is given.
+
+    relies on mocked objects from testinfra
+    """
+
+    fake_backend = mocker.Mock(spec=testinfra.backend.base.BaseBackend)
+    myhost = testinfra.host.Host(fake_backend)
+    command_result = mocker.Mock(spec=testinfra.backend.base.CommandResult)
+    mocker.patch('testinfra.host.Host.run', return_value=command_result)
+
+    cmd = 'ls -al'
+    container_name = 'infra1_swift_proxy_container-1a2b3c4d'
+
+    expected_run_cmd = ("lxc-attach -n {} "
+                        "-- bash -c '{}'".format(container_name, cmd))
+
+    result = pytest_rpc.helpers.run_on_container(cmd,
+                                                 'swift',
+                                                 myhost,
+                                                 container_name=container_name)
+    # noinspection PyUnresolvedReferences
+    myhost.run.assert_called_with(expected_run_cmd)
+    assert result == command_result
+
+
+def test_use_inventory_refresh_on_attach_failure(mocker):
+    """Verify run_on_container resolves the container through the inventory
+    and refreshes the inventory once when the attach fails.
+
+    relies on mocked objects from testinfra
+    """
+
+    fake_backend = mocker.Mock(spec=testinfra.backend.base.BaseBackend)
+    myhost = testinfra.host.Host(fake_backend)
+    stale = mocker.Mock(spec=testinfra.backend.base.CommandResult)
+    stale.rc = 0
+    stale.stdout = 'NAME STATE\ninfra1_utility_container-old RUNNING\n'
+    fresh = mocker.Mock(spec=testinfra.backend.base.CommandResult)
+    fresh.rc = 0
+    fresh.stdout = 'NAME STATE\ninfra1_utility_container-new RUNNING\n'
+    failed = mocker.Mock(spec=testinfra.backend.base.CommandResult)
+    failed.rc = 1
+    failed.stderr = 'lxc-attach: Failed to get init pid.'
+    succeeded = mocker.Mock(spec=testinfra.backend.base.CommandResult)
+    succeeded.rc = 0
+    succeeded.stderr = ''
+    mocker.patch('testinfra.host.Host.run',
+                 side_effect=[stale, failed, fresh, succeeded])
+
+    result = pytest_rpc.helpers.run_on_container('ls',
+                                                 'utility',
+                                                 myhost,
+                                                 use_inventory=True)
+    # noinspection PyUnresolvedReferences
+    myhost.run.assert_called_with(
+        "lxc-attach -n infra1_utility_container-new -- bash -c 'ls'"
+    )
+    assert result == succeeded
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'run_on_container_batch' and 'run_on_swift_batch'
+helper functions."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import re
+import subprocess
+import pytest_rpc.helpers
+import testinfra.backend.base
+import testinfra.host
+
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+def _local_host(mocker):
+    """Build a testinfra host which runs the command given to 'lxc-attach'
+    with the local bash instead of attaching to a container.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        testinfra.Host: A host with a mocked backend.
+    """
+
+    def _run(command):
+        inner = re.match(r"^lxc-attach -n \S+ -- bash -c '(.*)'$",
+                         command,
+                         re.S).group(1)
+        process = subprocess.Popen(['bash', '-c', inner],
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE,
+                                   universal_newlines=True)
+        stdout, stderr = process.communicate()
+        cr = mocker.Mock(spec=testinfra.backend.base.CommandResult)
+        cr.rc = process.returncode
+        cr.stdout = stdout
+        cr.stderr = stderr
+
+        return cr
+
+    fake_backend = mocker.Mock(spec=testinfra.backend.base.BaseBackend)
+    myhost = testinfra.host.Host(fake_backend)
+    mocker.patch('testinfra.host.Host.run', side_effect=_run)
+
+    return myhost
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_single_attach(mocker):
+    """Verify that every command of the batch runs through a single attach
+    and gets its own output and exit status.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    myhost = _local_host(mocker)
+    commands = ['echo out; echo err >&2', "printf 'no newline'", 'true']
+
+    # Test
+    results = pytest_rpc.helpers.run_on_container_batch(
+        commands,
+        'utility',
+        myhost,
+        container_name='infra1_utility_container-9c5b8a2d'
+    )
+
+    assert [r.command for r in results] == commands
+    assert [r.rc for r in results] == [0, 0, 0]
+    assert [r.stdout for r in results] == ['out\n', 'no newline', '']
+    assert [r.stderr for r in results] == ['err\n', '', '']
+    # noinspection PyUnresolvedReferences
+    assert myhost.run.call_count == 1
+
+
+def test_non_ascii_commands(mocker):
+    """Verify that non-ASCII commands given as unicode or as UTF-8 byte
+    strings (a plain 'str' on Python 2) are run unchanged.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    myhost = _local_host(mocker)
+    commands = [u'echo caf\xe9', u'echo na\xefve'.encode('utf-8')]
+
+    # Test
+    results = pytest_rpc.helpers.run_on_container_batch(
+        commands,
+        'utility',
+        myhost,
+        setup=u'export WORD=\xfcber'.encode('utf-8'),
+        container_name='infra1_utility_container-9c5b8a2d'
+    )
+
+    assert [r.command for r in results] == commands
+    assert [r.rc for r in results] == [0, 0]
+
+
+def test_failure_does_not_hide_results(mocker):
+    """Verify that a failing or exiting command does not stop the commands
+    after it.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    myhost = _local_host(mocker)
+    commands = ['false', 'exit 3', "echo 'still running'"]
+
+    # Test
+    results = pytest_rpc.helpers.run_on_container_batch(
+        commands,
+        'utility',
+        myhost,
+        container_name='infra1_utility_container-9c5b8a2d'
+    )
+
+    assert [r.rc for r in results] == [1, 3, 0]
+    assert results[2].stdout == 'still running\n'
+
+
+def test_setup_runs_once(mocker):
+    """Verify that the setup command runs once and its environment is visible
+    to every command.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    myhost = _local_host(mocker)
+
+    # Test
+    results = pytest_rpc.helpers.run_on_container_batch(
+        ['echo $SETUP', 'echo $SETUP'],
+        'utility',
+        myhost,
+        setup='export SETUP=done',
+        container_name='infra1_utility_container-9c5b8a2d'
+    )
+
+    assert [r.stdout for r in results] == ['done\n', 'done\n']
+
+
+def test_attach_failure(mocker):
+    """Verify that commands which never ran have no exit status.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    fake_backend = mocker.Mock(spec=testinfra.backend.base.BaseBackend)
+    myhost = testinfra.host.Host(fake_backend)
+    command_result = mocker.Mock(spec=testinfra.backend.base.CommandResult)
+    command_result.rc = 1
+    command_result.stdout = ''
+    command_result.stderr = 'lxc-attach: Failed to get init pid.'
+    mocker.patch('testinfra.host.Host.run', return_value=command_result)
+
+    # Test
+    results = pytest_rpc.helpers.run_on_container_batch(['ls'],
+                                                        'utility',
+                                                        myhost)
+
+    assert results == [
+        pytest_rpc.helpers.ContainerCommandResult('ls', None, '', '')
+    ]
+
+
+def test_run_on_swift_batch(mocker):
+    """Verify that the swift batch prepares the swift environment once.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_batch = mocker.patch('pytest_rpc.helpers.run_on_container_batch')
+
+    # Test
+    pytest_rpc.helpers.run_on_swift_batch(['swift-recon -r'], 'host')
+
+    mock_batch.assert_called_once_with(
+        ['swift-recon -r'],
+        'swift',
+        'host',
+        setup=pytest_rpc.helpers.swift_env_setup
+    )
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'run_ssh_commands' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+from pytest_rpc.helpers import run_ssh_commands
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+class FakeChannel(object):
+    """A paramiko channel which returns canned output for a command."""
+
+    outputs = {
+        'hostname': (b'cirros\n', b'', 0),
+        'ip addr': (b'1: lo\n' * 1000, b'', 0),
+        'false': (b'', b'failed\n', 1),
+        'sleep 60': None,
+    }
+
+    def __init__(self):
+        self.stdout = []
+        self.stderr = []
+        self.status = None
+        self.closed = False
+
+    def exec_command(self, command):
+        output = self.outputs[command]
+        if output is not None:
+            stdout, stderr, self.status = output
+            self.stdout = [stdout[i:i + 100]
+                           for i in range(0, len(stdout), 100)]
+            self.stderr = [stderr] if stderr else []
+
+    def recv_ready(self):
+        return bool(self.stdout)
+
+    def recv(self, _):
+        return self.stdout.pop(0)
+
+    def recv_stderr_ready(self):
+        return bool(self.stderr)
+
+    def recv_stderr(self, _):
+        return self.stderr.pop(0)
+
+    def exit_status_ready(self):
+        return self.status is not None and not self.stdout and not self.stderr
+
+    def recv_exit_status(self):
+        return self.status
+
+    def close(self):
+        self.closed = True
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def fake_ssh_client(mocker):
+    """An SSH client whose transport opens fake channels.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        Mock: A fake SSH client.
+    """
+
+    client = mocker.Mock()
+    client.get_transport.return_value.open_session.side_effect = FakeChannel
+
+    return client
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_results_in_order(fake_ssh_client):
+    """Verify that results are returned in command order with exit status and
+    output.
+
+    Args:
+        fake_ssh_client (Mock): A fake SSH client.
+    """
+
+    # Test
+    results = run_ssh_commands(fake_ssh_client, ['hostname', 'false'])
+
+    assert [r.command for r in results] == ['hostname', 'false']
+    assert results[0].exit_status == 0
+    assert results[0].stdout == 'cirros\n'
+    assert results[1].exit_status == 1
+    assert results[1].stderr == 'failed\n'
+    assert fake_ssh_client.get_transport.return_value.open_session.call_count \
+        == 2
+
+
+def test_max_output(fake_ssh_client):
+    """Verify that output beyond the limit is discarded and flagged.
+
+    Args:
+        fake_ssh_client (Mock): A fake SSH client.
+    """
+
+    # Test
+    result, = run_ssh_commands(fake_ssh_client, ['ip addr'], max_output=250)
+
+    assert len(result.stdout) == 250
+    assert result.truncated
+    assert result.exit_status == 0
+
+
+def test_timeout(mocker, fake_ssh_client):
+    """Verify that a command which does not finish in time is abandoned
+    without hiding the results of other commands.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_ssh_client (Mock): A fake SSH client.
+    """
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.ssh_poll_interval', 0)
+
+    # Test
+    results = run_ssh_commands(fake_ssh_client,
+                               ['sleep 60', 'hostname'],
+                               timeout=0.1)
+
+    assert results[0].timed_out
+    assert results[0].exit_status == -1
+    assert results[1].exit_status == 0
+
+
+def test_channel_failure(fake_ssh_client):
+    """Verify that a channel which cannot be opened is reported as a failed
+    command.
+
+    Args:
+        fake_ssh_client (Mock): A fake SSH client.
+    """
+
+    # Setup
+    open_session = fake_ssh_client.get_transport.return_value.open_session
+    open_session.side_effect = EOFError('Transport closed!')
+
+    # Test
+    result, = run_ssh_commands(fake_ssh_client, ['hostname'])
+
+    assert result.exit_status == -1
+    assert 'Transport closed!' in result.stderr
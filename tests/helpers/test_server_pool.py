@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'ServerPool' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+import itertools
+from collections import namedtuple
+from pytest_rpc.helpers import ServerPool
+
+
+# ==============================================================================
+# Globals
+# ==============================================================================
+FakeServer = namedtuple('FakeServer', ('id',))
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def fake_create():
+    """A function which creates uniquely identified fake servers.
+
+    Returns:
+        def: A server creation function.
+    """
+
+    counter = itertools.count(1)
+
+    return lambda: FakeServer(id='server-{}'.format(next(counter)))
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_lease_and_release(mocker, fake_create):
+    """Verify that a released server is reset and leased again.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_create (def): A server creation function.
+    """
+
+    # Mock
+    mock_reset = mocker.Mock(return_value=True)
+    mock_discard = mocker.Mock()
+
+    # Test
+    pool = ServerPool(fake_create, mock_reset, mock_discard, 1)
+    pool.start()
+
+    server = pool.lease(timeout=5)
+    pool.release(server)
+
+    assert pool.lease(timeout=5) is server
+    mock_reset.assert_called_once_with(server)
+    assert not mock_discard.called
+    assert pool.close() == [server]
+
+
+def test_failed_reset_replaces_server(mocker, fake_create):
+    """Verify that a server which fails to reset is discarded and replaced.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_create (def): A server creation function.
+    """
+
+    # Mock
+    mock_reset = mocker.Mock(side_effect=RuntimeError('Reset failed!'))
+    mock_discard = mocker.Mock()
+
+    # Test
+    pool = ServerPool(fake_create, mock_reset, mock_discard, 1)
+    pool.start()
+
+    server = pool.lease(timeout=5)
+    pool.release(server)
+    replacement = pool.lease(timeout=5)
+
+    assert replacement.id != server.id
+    mock_discard.assert_called_once_with(server)
+    assert len(pool.errors) == 1
+    assert pool.close() == [replacement]
+
+
+def test_create_failure(mocker):
+    """Verify that leasing fails when the pool cannot create any servers.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Mock
+    mock_create = mocker.Mock(side_effect=RuntimeError('Boot failed!'))
+
+    # Test
+    pool = ServerPool(mock_create, mocker.Mock(), mocker.Mock(), 2)
+    pool.start()
+
+    with pytest.raises(RuntimeError):
+        pool.lease(timeout=5)
+
+    assert pool.close() == []
+
+
+def test_lease_after_close(mocker, fake_create):
+    """Verify that leasing from a closed pool raises the correct exception.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_create (def): A server creation function.
+    """
+
+    # Test
+    pool = ServerPool(fake_create, mocker.Mock(), mocker.Mock(), 1)
+    pool.close()
+
+    with pytest.raises(RuntimeError):
+        pool.lease()
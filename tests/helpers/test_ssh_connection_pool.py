@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'SshConnectionPool' helper class."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+from pytest_rpc.helpers import SshConnectionPool
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def fake_client(mocker):
+    """A function which creates fake SSH clients with a live transport.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+
+    Returns:
+        def: A fake client creation function.
+    """
+
+    def _create():
+        client = mocker.Mock()
+        client.get_transport.return_value.is_active.return_value = True
+        return client
+
+    return _create
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_reuse(fake_client):
+    """Verify that a live connection is handed back for the same key only.
+
+    Args:
+        fake_client (def): A fake client creation function.
+    """
+
+    # Setup
+    client = fake_client()
+    pool = SshConnectionPool()
+
+    # Test
+    assert pool.get('host', 'user', 'key') is None
+
+    pool.put('host', 'user', 'key', client)
+
+    assert pool.get('host', 'user', 'key') is client
+    assert pool.get('host', 'other', 'key') is None
+    assert client.get_transport.return_value.send_ignore.called
+
+
+def test_dead_connection(fake_client):
+    """Verify that a connection failing the keepalive is closed and dropped.
+
+    Args:
+        fake_client (def): A fake client creation function.
+    """
+
+    # Setup
+    client = fake_client()
+    client.get_transport.return_value.open_session.side_effect = EOFError()
+    pool = SshConnectionPool()
+    pool.put('host', 'user', ['key1', 'key2'], client)
+
+    # Test
+    assert pool.get('host', 'user', ['key1', 'key2']) is None
+    assert client.close.called
+    assert len(pool) == 0
+
+
+def test_lru_eviction(fake_client):
+    """Verify that the least recently used connection is closed when the pool
+    exceeds its size.
+
+    Args:
+        fake_client (def): A fake client creation function.
+    """
+
+    # Setup
+    first, second, third = fake_client(), fake_client(), fake_client()
+    pool = SshConnectionPool(max_size=2)
+
+    # Test
+    pool.put('first', 'user', 'key', first)
+    pool.put('second', 'user', 'key', second)
+    pool.get('first', 'user', 'key')  # Mark 'first' as recently used.
+    pool.put('third', 'user', 'key', third)
+
+    assert second.close.called
+    assert not first.close.called
+    assert len(pool) == 2
+
+
+def test_idle_eviction(mocker, fake_client):
+    """Verify that connections idle for too long are closed.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_client (def): A fake client creation function.
+    """
+
+    # Setup
+    client = fake_client()
+    mock_time = mocker.patch('pytest_rpc.helpers.time', return_value=0)
+    pool = SshConnectionPool(max_idle=60)
+    pool.put('host', 'user', 'key', client)
+
+    # Test
+    mock_time.return_value = 61
+
+    assert pool.get('host', 'user', 'key') is None
+    assert client.close.called
+
+
+def test_close(fake_client):
+    """Verify that closing the pool closes every connection.
+
+    Args:
+        fake_client (def): A fake client creation function.
+    """
+
+    # Setup
+    clients = [fake_client() for _ in range(3)]
+    pool = SshConnectionPool()
+    for index, client in enumerate(clients):
+        pool.put('host{}'.format(index), 'user', 'key', client)
+
+    # Test
+    pool.close()
+
+    assert all(c.close.called for c in clients)
+    assert len(pool) == 0
+
+
+def test_evict(fake_client):
+    """Verify that every connection to an evicted host is closed while other
+    hosts stay pooled.
+
+    Args:
+        fake_client (def): A fake client creation function.
+    """
+
+    # Setup
+    stale = [fake_client(), fake_client()]
+    other = fake_client()
+    pool = SshConnectionPool()
+    pool.put('10.0.0.5', 'cirros', 'key', stale[0])
+    pool.put('10.0.0.5', 'ubuntu', 'key', stale[1])
+    pool.put('10.0.0.6', 'cirros', 'key', other)
+
+    # Test
+    assert pool.evict(['10.0.0.5', '10.0.0.7']) == 2
+    assert all(c.close.called for c in stale)
+    assert not other.close.called
+    assert pool.get('10.0.0.5', 'cirros', 'key') is None
+    assert pool.get('10.0.0.6', 'cirros', 'key') is other
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'wait_for_guest_ready' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+import socket
+import threading
+import pytest_rpc.helpers
+from pytest_rpc.helpers import RetryPolicy, wait_for_guest_ready
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def fake_ssh_server():
+    """A local TCP server which sends an SSH banner to every connection.
+
+    Returns:
+        int: The port the server is listening on.
+    """
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(5)
+
+    def _serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.error:
+                return
+            conn.sendall(b'SSH-2.0-OpenSSH_7.2p2\r\n')
+            conn.close()
+
+    thread = threading.Thread(target=_serve)
+    thread.daemon = True
+    thread.start()
+
+    yield server.getsockname()[1]
+
+    server.close()
+
+
+@pytest.fixture
+def closed_port():
+    """A local TCP port which refuses connections.
+
+    Returns:
+        int: The closed port.
+    """
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    return port
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_ssh_banner(fake_ssh_server):
+    """Verify that the helper returns True once an SSH banner is received.
+
+    Args:
+        fake_ssh_server (int): The port of a local fake SSH server.
+    """
+
+    assert wait_for_guest_ready('127.0.0.1', port=fake_ssh_server, timeout=5)
+
+
+def test_port_closed(mocker, closed_port):
+    """Verify that the helper returns False when the port never opens.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        closed_port (int): A local port which refuses connections.
+    """
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.sleep', autospec=True)
+
+    # Test
+    assert not wait_for_guest_ready('127.0.0.1',
+                                    port=closed_port,
+                                    retry_policy=RetryPolicy(retries=2))
+
+
+def test_console_marker(mocker, fake_ssh_server):
+    """Verify that the helper keeps scanning the console log until cloud-init
+    has finished, without probing the port again.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_ssh_server (int): The port of a local fake SSH server.
+    """
+
+    # Setup
+    booting = 'Starting kernel ...\n' * 100
+    finished = (booting + 'Cloud-init v. 0.7.9 finished at Thu, 19 Jul 2018 '
+                          '15:36:40 +0000. Up 25.63 seconds\n')
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.sleep', autospec=True)
+    mock_probe = mocker.patch('pytest_rpc.helpers.probe_ssh_banner',
+                              wraps=pytest_rpc.helpers.probe_ssh_banner)
+    mock_os_api_conn = mocker.Mock()
+    mock_os_api_conn.get_server_console.side_effect = [booting,
+                                                       booting,
+                                                       finished]
+
+    # Test
+    assert wait_for_guest_ready('127.0.0.1',
+                                port=fake_ssh_server,
+                                os_api_conn=mock_os_api_conn,
+                                server=mocker.Mock(),
+                                timeout=5)
+    assert mock_os_api_conn.get_server_console.call_count == 3
+    assert mock_probe.call_count == 1
+
+
+def test_tcp_only(closed_port, fake_ssh_server):
+    """Verify the TCP probe without requiring an SSH banner.
+
+    Args:
+        closed_port (int): A local port which refuses connections.
+        fake_ssh_server (int): The port of a local fake SSH server.
+    """
+
+    assert pytest_rpc.helpers.probe_tcp_port('127.0.0.1', fake_ssh_server)
+    assert not pytest_rpc.helpers.probe_tcp_port('127.0.0.1', closed_port)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'wait_for_os_objects' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import pytest
+import openstack.connection
+from collections import namedtuple
+from pytest_rpc.helpers import wait_for_os_objects
+
+
+# ==============================================================================
+# Fixtures
+# ==============================================================================
+@pytest.fixture
+def fake_os_objects():
+    """A list of objects that work like munch.Munch objects containing just an
+    ID property.
+
+    Returns:
+        list of namedtuple: Objects that respond to an attribute lookup.
+    """
+
+    FakeOsObject = namedtuple('FakeOsObject', ('id',))
+
+    return [FakeOsObject(id='fake-{}'.format(i)) for i in range(3)]
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_all_ready(mocker, fake_os_objects):
+    """Verify that the helper uses a single list call when every object is
+    already in the expected state.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_objects (list of namedtuple): Objects that respond to an
+            attribute lookup. ('id')
+    """
+
+    # Setup
+    listed = [{'id': o.id, 'status': 'ACTIVE'} for o in fake_os_objects]
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.list_servers.return_value = listed
+
+    # Test
+    results = wait_for_os_objects(os_api_conn=mock_os_api_conn,
+                                  os_service='server',
+                                  os_objects=fake_os_objects,
+                                  expected_props={'status': 'ACTIVE'})
+
+    assert list(results) == [o.id for o in fake_os_objects]
+    assert all(r.ready and r.attempts == 1 for r in results.values())
+    assert mock_os_api_conn.list_servers.call_count == 1
+    assert not mock_os_api_conn.get_server.called
+
+
+def test_objects_dropped_when_ready(mocker, fake_os_objects):
+    """Verify that objects are dropped from the pending set as they become
+    ready and that objects absent from the response are treated as pending.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_objects (list of namedtuple): Objects that respond to an
+            attribute lookup. ('id')
+    """
+
+    # Setup
+    first, second, third = [o.id for o in fake_os_objects]
+    responses = [
+        [{'id': first, 'status': 'ACTIVE'}, {'id': second, 'status': 'BUILD'}],
+        [{'id': first, 'status': 'ACTIVE'}, {'id': second, 'status': 'BUILD'},
+         {'id': third, 'status': 'ACTIVE'}],
+        [{'id': second, 'status': 'ACTIVE'}],
+    ]
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.sleep', autospec=True)
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.list_servers.side_effect = responses
+
+    # Test
+    results = wait_for_os_objects(os_api_conn=mock_os_api_conn,
+                                  os_service='server',
+                                  os_objects=fake_os_objects,
+                                  expected_props={'status': 'ACTIVE'},
+                                  filters={'name': 'test_server_'},
+                                  show_warnings=False)
+
+    assert [results[i].attempts for i in (first, second, third)] == [1, 3, 2]
+    assert all(r.ready for r in results.values())
+    assert mock_os_api_conn.list_servers.call_count == 3
+    mock_os_api_conn.list_servers.assert_called_with(
+        filters={'name': 'test_server_'}
+    )
+
+
+def test_not_ready(mocker, fake_os_objects):
+    """Verify that objects which never reach the expected state are reported
+    as not ready with their last observed state.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_objects (list of namedtuple): Objects that respond to an
+            attribute lookup. ('id')
+    """
+
+    # Setup
+    listed = [{'id': o.id, 'status': 'ERROR'} for o in fake_os_objects]
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.list_volumes.return_value = listed
+
+    # Test
+    results = wait_for_os_objects(os_api_conn=mock_os_api_conn,
+                                  os_service='volume',
+                                  os_objects=fake_os_objects,
+                                  expected_props={'status': 'available'},
+                                  show_warnings=False,
+                                  retries=1)
+
+    assert not any(r.ready for r in results.values())
+    assert all(r.state['status'] == 'ERROR' for r in results.values())
+
+
+def test_invalid_service_name(mocker, fake_os_objects):
+    """Verify that the helper raises the correct exception when the caller
+    provides an invalid OpenStack service name.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+        fake_os_objects (list of namedtuple): Objects that respond to an
+            attribute lookup. ('id')
+    """
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+
+    # Test
+    with pytest.raises(RuntimeError):
+        wait_for_os_objects(os_api_conn=mock_os_api_conn,
+                            os_service='oops',
+                            os_objects=fake_os_objects,
+                            expected_props={'status': 'ACTIVE'})
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Test cases for the 'wait_for_os_objects_deleted' helper function."""
+# ==============================================================================
+# Imports
+# ==============================================================================
+import openstack.connection
+from collections import namedtuple
+from pytest_rpc.helpers import wait_for_os_objects_deleted
+
+
+# ==============================================================================
+# Tests
+# ==============================================================================
+def test_deleted(mocker):
+    """Verify that objects are reported as ready once they are absent from the
+    list response.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    FakeOsObject = namedtuple('FakeOsObject', ('id',))
+    fake_os_objects = [FakeOsObject(id='one'), FakeOsObject(id='two')]
+    responses = [[{'id': 'one'}, {'id': 'two'}], [{'id': 'two'}], []]
+
+    # Mock
+    mocker.patch('pytest_rpc.helpers.sleep', autospec=True)
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.list_volumes.side_effect = responses
+
+    # Test
+    results = wait_for_os_objects_deleted(os_api_conn=mock_os_api_conn,
+                                          os_service='volume',
+                                          os_objects=fake_os_objects,
+                                          show_warnings=False)
+
+    assert results['one'].ready and results['one'].attempts == 2
+    assert results['two'].ready and results['two'].attempts == 3
+
+
+def test_not_deleted(mocker):
+    """Verify that objects still present when the retries are exhausted are
+    reported as not ready.
+
+    Args:
+        mocker (MockFixture): A wrapper to the Mock library.
+    """
+
+    # Setup
+    FakeOsObject = namedtuple('FakeOsObject', ('id',))
+    fake_os_objects = [FakeOsObject(id='one')]
+
+    # Mock
+    mocker.patch.object(openstack.connection, 'Connection', autospec=True)
+    mock_os_api_conn = openstack.connection.Connection()
+    mock_os_api_conn.list_servers.return_value = [{'id': 'one'}]
+
+    # Test
+    results = wait_for_os_objects_deleted(os_api_conn=mock_os_api_conn,
+                                          os_service='server',
+                                          os_objects=fake_os_objects,
+                                          show_warnings=False,
+                                          retries=1)
+
+    assert not results['one'].ready